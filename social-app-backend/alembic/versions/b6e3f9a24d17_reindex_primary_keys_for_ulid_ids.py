@@ -0,0 +1,49 @@
+"""reindex primary keys for ulid ids
+
+Revision ID: b6e3f9a24d17
+Revises: a8d4e1f7c625
+Create Date: 2026-10-18 21:14:37.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e3f9a24d17'
+down_revision: Union[str, None] = 'a8d4e1f7c625'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keys written as '<prefix>-' || uuid_generate_v4() before the ULID IDs.
+# Random inserts left these indexes full of half-empty pages, ULID inserts
+# append to the right edge and keep the rebuilt index packed. The
+# partitioned tables were copied into fresh partitions by e7b2a94c1d30.
+PRIMARY_KEYS = [
+    'users_pkey',
+    'posts_pkey',
+    'post_images_pkey',
+    'comments_pkey',
+    'likes_pkey',
+    'follows_pkey',
+    'conversations_pkey',
+    'participants_pkey',
+    'deleted_conversations_pkey',
+    'deleted_messages_pkey',
+    'device_tokens_pkey',
+    'reports_pkey',
+    'user_sessions_pkey',
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps reads and writes going, it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for index in PRIMARY_KEYS:
+            op.execute(f'REINDEX INDEX CONCURRENTLY {index}')
+
+
+def downgrade() -> None:
+    # Rebuilt indexes hold the same keys, nothing to undo
+    pass
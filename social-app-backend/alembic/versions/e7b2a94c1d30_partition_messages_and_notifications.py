@@ -0,0 +1,185 @@
+"""partition messages and notifications by month
+
+Revision ID: e7b2a94c1d30
+Revises: d1a6b3f05c28
+Create Date: 2026-10-18 16:40:12.508314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2a94c1d30'
+down_revision: Union[str, None] = 'd1a6b3f05c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created ahead of now, the maintenance task keeps the window moving
+PREMAKE_MONTHS = 3
+
+# Keys and indexes recreated on the rebuilt tables. Postgres needs the
+# partition key in every primary key and unique constraint, created_at is
+# appended to those of the partitioned layout.
+TABLES = {
+    'messages': {
+        'primary_key': ['message_id'],
+        'foreign_keys': [
+            ('messages_conversation_id_fkey', ['conversation_id'], 'conversations', ['conversation_id'], 'CASCADE'),
+            ('messages_sender_id_fkey', ['sender_id'], 'users', ['user_id'], 'CASCADE'),
+        ],
+        'indexes': [
+            ('ix_messages_conversation_id', ['conversation_id']),
+            ('ix_messages_sender_id', ['sender_id']),
+            ('ix_messages_conversation_id_created_at', ['conversation_id', 'created_at', 'message_id']),
+        ],
+    },
+    'message_statuses': {
+        'primary_key': ['id'],
+        'foreign_keys': [
+            ('message_statuses_user_id_fkey', ['user_id'], 'users', ['user_id'], 'CASCADE'),
+        ],
+        'indexes': [
+            ('ix_message_statuses_message_id', ['message_id']),
+            ('ix_message_statuses_user_id', ['user_id']),
+            ('ix_message_statuses_message_user', ['message_id', 'user_id']),
+        ],
+    },
+    'notifications': {
+        'primary_key': ['notification_id'],
+        'foreign_keys': [
+            ('notifications_sender_id_fkey', ['sender_id'], 'users', ['user_id'], 'SET NULL'),
+        ],
+        'indexes': [
+            ('ix_notifications_sender_id', ['sender_id']),
+            ('ix_notifications_created_at', ['created_at']),
+            ('ix_notifications_created_at_id', ['created_at', 'notification_id']),
+        ],
+    },
+    'notification_recipients': {
+        'primary_key': ['id'],
+        'unique': ('unique_notification_recipient', ['notification_id', 'recipient_id']),
+        'foreign_keys': [
+            ('notification_recipients_recipient_id_fkey', ['recipient_id'], 'users', ['user_id'], 'CASCADE'),
+        ],
+        'indexes': [
+            ('ix_notification_recipients_notification_id', ['notification_id']),
+            ('ix_notification_recipients_is_read', ['is_read']),
+        ],
+        'plain': {
+            'foreign_keys': [
+                ('notification_recipients_notification_id_fkey', ['notification_id'], 'notifications', ['notification_id'], 'CASCADE'),
+            ],
+            'indexes': [
+                ('ix_notification_recipients_recipient_id', ['recipient_id']),
+            ],
+        },
+        'partitioned': {
+            # Recipients live in their notification's partition month
+            'foreign_keys': [
+                ('notification_recipients_notification_id_fkey', ['notification_id', 'created_at'], 'notifications', ['notification_id', 'created_at'], 'CASCADE'),
+            ],
+            # Notification lists are read newest first per recipient
+            'indexes': [
+                ('ix_notification_recipients_recipient_id_created_at', ['recipient_id', 'created_at']),
+            ],
+        },
+    },
+}
+
+# Referenced tables are rebuilt before the tables pointing at them
+REBUILD_ORDER = ['messages', 'message_statuses', 'notifications', 'notification_recipients']
+
+
+def _add_keys(table: str, partitioned: bool) -> None:
+    spec = TABLES[table]
+    layout = spec.get('partitioned' if partitioned else 'plain', {})
+    key_columns = ['created_at'] if partitioned else []
+
+    op.create_primary_key(f'{table}_pkey', table, spec['primary_key'] + key_columns)
+    if 'unique' in spec:
+        name, columns = spec['unique']
+        op.create_unique_constraint(name, table, columns + key_columns)
+    for name, columns, referred_table, referred_columns, ondelete in spec['foreign_keys'] + layout.get('foreign_keys', []):
+        op.create_foreign_key(name, table, referred_table, columns, referred_columns, ondelete=ondelete)
+    for name, columns in spec['indexes'] + layout.get('indexes', []):
+        op.create_index(name, table, columns, unique=False)
+
+
+def _create_monthly_partitions(table: str) -> None:
+    """One partition of ``{table}_new`` per month from the oldest row of
+    ``table`` to PREMAKE_MONTHS months from now"""
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE((SELECT min(created_at) FROM {table}), now())),
+                    date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table}_new FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END $$;
+    """)
+
+
+def _rebuild_table(table: str, partitioned: bool) -> None:
+    """Copy ``table`` into a new (un)partitioned table of the same columns"""
+    partition_by = 'PARTITION BY RANGE (created_at)' if partitioned else ''
+    op.execute(f"""
+        CREATE TABLE {table}_new (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        {partition_by}
+    """)
+    if partitioned:
+        op.execute(f"ALTER TABLE {table}_new ALTER COLUMN created_at SET NOT NULL")
+        _create_monthly_partitions(table)
+    else:
+        op.execute(f"ALTER TABLE {table}_new ALTER COLUMN created_at DROP NOT NULL")
+    op.execute(f"INSERT INTO {table}_new SELECT * FROM {table}")
+    # Also drops the foreign keys pointing at the old table
+    op.execute(f"DROP TABLE {table} CASCADE")
+    op.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    _add_keys(table, partitioned)
+
+
+def upgrade() -> None:
+    # The partition key cannot be NULL
+    for table in REBUILD_ORDER:
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+
+    # Recipients move into their notification's partition month
+    op.execute("""
+        UPDATE notification_recipients r
+        SET created_at = n.created_at
+        FROM notifications n
+        WHERE r.notification_id = n.notification_id
+          AND r.created_at <> n.created_at
+    """)
+
+    # message_statuses and deleted_messages lose their foreign key to
+    # messages, message_id alone is no longer unique there
+    for table in REBUILD_ORDER:
+        _rebuild_table(table, partitioned=True)
+
+    # Recipients are always written with their notification's created_at
+    op.alter_column('notification_recipients', 'created_at', server_default=None)
+
+
+def downgrade() -> None:
+    for table in REBUILD_ORDER:
+        _rebuild_table(table, partitioned=False)
+
+    op.alter_column('notification_recipients', 'created_at', server_default=sa.text('now()'))
+    op.create_foreign_key('message_statuses_message_id_fkey', 'message_statuses', 'messages', ['message_id'], ['message_id'], ondelete='CASCADE')
+    op.create_foreign_key('deleted_messages_message_id_fkey', 'deleted_messages', 'messages', ['message_id'], ['message_id'], ondelete='CASCADE')
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 
 from app.core.settings import get_settings
 
@@ -13,7 +14,14 @@ celery_app = Celery(
     "app",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["app.tasks.notification_tasks"],
+    include=[
+        "app.tasks.notification_tasks",
+        "app.tasks.counter_tasks",
+        "app.tasks.partition_tasks",
+        "app.tasks.search_tasks",
+        "app.tasks.stats_tasks",
+        "app.tasks.timeline_tasks",
+    ],
 )
 
 # Cấu hình Celery
@@ -26,5 +34,30 @@ celery_app.conf.update(
     broker_connection_retry_on_startup=True,
     worker_prefetch_multiplier=1,
     task_acks_late=True,
-    task_routes={"app.tasks.notification_tasks.*": {"queue": "notifications"}},
+    task_routes={
+        "app.tasks.notification_tasks.*": {"queue": "notifications"},
+        "app.tasks.counter_tasks.*": {"queue": "maintenance"},
+        "app.tasks.partition_tasks.*": {"queue": "maintenance"},
+        "app.tasks.search_tasks.*": {"queue": "maintenance"},
+        "app.tasks.stats_tasks.*": {"queue": "maintenance"},
+        "app.tasks.timeline_tasks.*": {"queue": "timelines"},
+    },
+    beat_schedule={
+        "reconcile-counters": {
+            "task": "app.tasks.counter_tasks.reconcile_counters",
+            "schedule": crontab(minute=0, hour=settings.COUNTER_RECONCILE_HOUR),
+        },
+        "maintain-partitions": {
+            "task": "app.tasks.partition_tasks.maintain_partitions",
+            "schedule": crontab(minute=0, hour=settings.PARTITION_MAINTENANCE_HOUR),
+        },
+        "rebuild-user-search-index": {
+            "task": "app.tasks.search_tasks.rebuild_user_search_index",
+            "schedule": crontab(minute=0, hour=settings.USER_SEARCH_INDEX_REBUILD_HOUR),
+        },
+        "rollup-daily-stats": {
+            "task": "app.tasks.stats_tasks.rollup_daily_stats",
+            "schedule": crontab(minute=f"*/{settings.STATS_ROLLUP_INTERVAL_MINUTES}"),
+        },
+    },
 )
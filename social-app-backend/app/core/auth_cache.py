@@ -0,0 +1,101 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.backplane import Backplane
+from app.core.database import get_redis_client
+from app.core.settings import get_settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+AUTH_INVALIDATE_CHANNEL = "auth:invalidate"
+
+
+class AuthStateCache:
+    """Ban and admin flags checked on every authenticated request.
+
+    Lookups go through an in-process LRU, then Redis, then Postgres. Ban
+    changes are broadcast on AUTH_INVALIDATE_CHANNEL so every worker drops
+    its local copy; the short local TTL bounds staleness if one is missed.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.redis_key_prefix = "auth:state:"
+        self.backplane: Optional[Backplane] = None
+
+    async def start(self, backplane: Backplane) -> None:
+        self.backplane = backplane
+        await backplane.start(self._handle_invalidation)
+        await backplane.subscribe(AUTH_INVALIDATE_CHANNEL)
+
+    async def stop(self) -> None:
+        if self.backplane:
+            await self.backplane.stop()
+
+    def _get_local(self, user_id: str) -> Optional[dict]:
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, state = entry
+        if expires_at < time.monotonic():
+            del self.entries[user_id]
+            return None
+        self.entries.move_to_end(user_id)
+        return state
+
+    def _set_local(self, user_id: str, state: dict) -> None:
+        self.entries[user_id] = (time.monotonic() + self.ttl, state)
+        self.entries.move_to_end(user_id)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    async def get(self, user_id: str, db: AsyncSession) -> dict:
+        """``{"is_banned": bool, "is_admin": bool}``, all False for unknown users"""
+        state = self._get_local(user_id)
+        if state is not None:
+            return state
+
+        redis = get_redis_client()
+        key = f"{self.redis_key_prefix}{user_id}"
+        cached = await redis.get(key)
+        if cached:
+            state = json.loads(cached)
+        else:
+            result = await db.execute(
+                select(User.is_banned, User.is_admin).where(User.user_id == user_id)
+            )
+            row = result.one_or_none()
+            state = {
+                "is_banned": bool(row and row.is_banned),
+                "is_admin": bool(row and row.is_admin),
+            }
+            await redis.setex(key, settings.AUTH_STATE_REDIS_TTL, json.dumps(state))
+
+        self._set_local(user_id, state)
+        return state
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop the user's cached state on every worker"""
+        self.entries.pop(user_id, None)
+        await get_redis_client().delete(f"{self.redis_key_prefix}{user_id}")
+        if self.backplane:
+            await self.backplane.publish(AUTH_INVALIDATE_CHANNEL, {"user_id": user_id})
+
+    async def _handle_invalidation(self, channel: str, data: dict) -> None:
+        self.entries.pop(data["user_id"], None)
+
+
+auth_state_cache = AuthStateCache(
+    settings.AUTH_STATE_CACHE_SIZE, settings.AUTH_STATE_LOCAL_TTL
+)
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Iterable, Optional, Set
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+MessageHandler = Callable[[str, dict], Awaitable[None]]
+
+PRESENCE_KEY_PREFIX = "presence:nodes:"
+
+
+class Backplane:
+    """Routes WebSocket traffic between the nodes serving the API.
+
+    A node subscribes only to the channels it has local listeners for
+    (its connected users and the conversations they joined), publishes
+    to any channel, and gets every message of its subscribed channels
+    passed to the handler given to ``start``.
+
+    It also tracks on how many nodes each user has a socket, so presence
+    changes are only broadcast by the first and the last node.
+    """
+
+    def __init__(self):
+        self.handler: Optional[MessageHandler] = None
+        # Called when messages may have been lost, e.g. after a reconnect
+        self.on_reconnect: Optional[Callable[[], None]] = None
+        self.channels: Set[str] = set()
+        # Users with a socket on this node
+        self.present: Set[str] = set()
+
+    async def start(
+        self,
+        handler: MessageHandler,
+        on_reconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.handler = handler
+        self.on_reconnect = on_reconnect
+
+    async def stop(self) -> None:
+        self.handler = None
+        self.on_reconnect = None
+        self.channels.clear()
+
+    async def subscribe(self, channel: str) -> None:
+        raise NotImplementedError
+
+    async def unsubscribe(self, channel: str) -> None:
+        raise NotImplementedError
+
+    async def publish(self, channel: str, message: dict) -> None:
+        raise NotImplementedError
+
+    async def publish_many(self, channels: Iterable[str], message: dict) -> None:
+        for channel in channels:
+            await self.publish(channel, message)
+
+    async def add_presence(self, user_id: str) -> int:
+        """Record the user's first socket on this node, return on how many
+        nodes the user is now connected"""
+        raise NotImplementedError
+
+    async def remove_presence(self, user_id: str) -> int:
+        """Record the user's last socket on this node closed, return on how
+        many nodes the user is still connected"""
+        raise NotImplementedError
+
+    async def presence_count(self, user_id: str) -> int:
+        raise NotImplementedError
+
+
+class LocalBackplane(Backplane):
+    """In-process delivery for a single worker, e.g. local development"""
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        if self.handler and channel in self.channels:
+            await self.handler(channel, message)
+
+    async def add_presence(self, user_id: str) -> int:
+        self.present.add(user_id)
+        return 1
+
+    async def remove_presence(self, user_id: str) -> int:
+        self.present.discard(user_id)
+        return 0
+
+    async def presence_count(self, user_id: str) -> int:
+        return int(user_id in self.present)
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub backplane shared by all workers and pods.
+
+    Presence is a sorted set per user of the nodes holding one of their
+    sockets, scored by the node's last heartbeat. Entries of a node that
+    died without cleaning up stop counting after PRESENCE_NODE_TTL.
+    """
+
+    def __init__(self, redis: Redis):
+        super().__init__()
+        # Shared app client, the subscription holds one pooled connection
+        self.redis = redis
+        self.pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        self.listener: Optional[asyncio.Task] = None
+        self.heartbeat: Optional[asyncio.Task] = None
+        self.node_id = uuid4().hex
+
+    async def start(
+        self,
+        handler: MessageHandler,
+        on_reconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        await super().start(handler, on_reconnect)
+        self.listener = asyncio.create_task(self._listen())
+        self.heartbeat = asyncio.create_task(self._refresh_presence())
+
+    async def stop(self) -> None:
+        for task in (self.listener, self.heartbeat):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.listener = self.heartbeat = None
+        await self.pubsub.aclose()
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id in self.present:
+                    pipe.zrem(self._presence_key(user_id), self.node_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error removing presence of node {self.node_id}: {str(e)}")
+        self.present.clear()
+        await super().stop()
+
+    async def subscribe(self, channel: str) -> None:
+        if channel not in self.channels:
+            self.channels.add(channel)
+            await self.pubsub.subscribe(channel)
+            # Runs after the pubsub resubscribed on a new connection,
+            # never for the first one
+            self.pubsub.connection.register_connect_callback(self._reconnected)
+
+    async def unsubscribe(self, channel: str) -> None:
+        if channel in self.channels:
+            self.channels.discard(channel)
+            await self.pubsub.unsubscribe(channel)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self.redis.publish(channel, json.dumps(message, default=str))
+
+    async def publish_many(self, channels: Iterable[str], message: dict) -> None:
+        payload = json.dumps(message, default=str)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.publish(channel, payload)
+            await pipe.execute()
+
+    async def _reconnected(self, connection) -> None:
+        logger.warning("Backplane reconnected, messages may have been lost")
+        if self.on_reconnect:
+            self.on_reconnect()
+
+    def _presence_key(self, user_id: str) -> str:
+        return f"{PRESENCE_KEY_PREFIX}{user_id}"
+
+    async def add_presence(self, user_id: str) -> int:
+        self.present.add(user_id)
+        key = self._presence_key(user_id)
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {self.node_id: now})
+            pipe.expire(key, settings.PRESENCE_NODE_TTL)
+            pipe.zcount(key, now - settings.PRESENCE_NODE_TTL, "+inf")
+            results = await pipe.execute()
+        return results[-1]
+
+    async def remove_presence(self, user_id: str) -> int:
+        self.present.discard(user_id)
+        key = self._presence_key(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(key, self.node_id)
+            pipe.zcount(key, time.time() - settings.PRESENCE_NODE_TTL, "+inf")
+            results = await pipe.execute()
+        return results[-1]
+
+    async def presence_count(self, user_id: str) -> int:
+        return await self.redis.zcount(
+            self._presence_key(user_id),
+            time.time() - settings.PRESENCE_NODE_TTL,
+            "+inf",
+        )
+
+    async def _refresh_presence(self) -> None:
+        while True:
+            await asyncio.sleep(settings.PRESENCE_NODE_TTL / 3)
+            try:
+                now = time.time()
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for user_id in self.present:
+                        key = self._presence_key(user_id)
+                        pipe.zadd(key, {self.node_id: now})
+                        pipe.expire(key, settings.PRESENCE_NODE_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Error refreshing presence: {str(e)}")
+
+    async def _listen(self) -> None:
+        while True:
+            # get_message returns immediately while nothing is subscribed
+            if not self.pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                data = await self.pubsub.get_message(timeout=1.0)
+                if data is None:
+                    continue
+                await self.handler(data["channel"], json.loads(data["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error handling backplane message: {str(e)}")
+
+
+def create_backplane(redis: Redis) -> Backplane:
+    if settings.WEBSOCKET_BACKPLANE == "local":
+        return LocalBackplane()
+    return RedisBackplane(redis)
@@ -1,12 +1,15 @@
 import os
 from contextlib import asynccontextmanager
+from typing import Optional
+from uuid import uuid4
 
 from dotenv import load_dotenv
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from app.core.pool_metrics import InstrumentedPool, pool_metrics
 from app.core.settings import get_settings
 
 load_dotenv()
@@ -18,11 +21,45 @@ SQLALCHEMY_DATABASE_URL = (
     f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
+
+def _connect_args() -> dict:
+    if settings.DB_PGBOUNCER_MODE:
+        # Transaction pooling hands each transaction to any server
+        # connection, named prepared statements would collide or be missing.
+        # PgBouncer also rejects server_settings in the startup packet, set
+        # statement_timeout on the database role instead.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+        },
+    }
+
+
+def create_engine(url: str, **kwargs):
+    """Async engine with the pool settings shared by primary and replicas"""
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+        **kwargs,
+    )
+
+
 # Create a new SQLAlchemy async engine instance without SSL
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=False,
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=InstrumentedPool)
 
 # Create a configured "AsyncSession" class
 SessionLocal = sessionmaker(
@@ -41,17 +78,65 @@ async def get_db():
         yield session
 
 
-async def get_redis() -> Redis:  # type: ignore
-    redis = Redis(
+# Application-wide Redis client, created in the app lifespan
+redis_client: Optional[Redis] = None
+
+
+async def init_redis() -> Redis:
+    """Create the pooled Redis client shared by the whole process.
+
+    Requests wait up to REDIS_TIMEOUT for a free connection once
+    REDIS_MAX_CONNECTIONS are in use instead of opening new ones.
+    """
+    global redis_client
+    pool = BlockingConnectionPool(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         password=settings.REDIS_PASSWORD,
         db=settings.REDIS_DB,
         decode_responses=True,
         encoding="utf-8",
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_TIMEOUT,
+        socket_timeout=settings.REDIS_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        retry_on_timeout=True,
     )
-    try:
-        await redis.ping()
-        yield redis
-    finally:
-        await redis.close()
+    redis_client = Redis(connection_pool=pool)
+    await redis_client.ping()
+    return redis_client
+
+
+async def close_redis() -> None:
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        await redis_client.connection_pool.disconnect()
+        redis_client = None
+
+
+def get_redis_client() -> Redis:
+    if redis_client is None:
+        raise RuntimeError("Redis client is not initialized")
+    return redis_client
+
+
+def get_redis_pool_stats() -> dict:
+    pool = get_redis_client().connection_pool
+    in_use = len(pool._in_use_connections)
+    idle = len(pool._available_connections)
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": round(in_use / pool.max_connections, 3),
+    }
+
+
+def get_db_pool_stats() -> dict:
+    return pool_metrics.snapshot(engine.sync_engine.pool)
+
+
+async def get_redis() -> Redis:
+    return get_redis_client()
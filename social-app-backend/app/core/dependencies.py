@@ -3,72 +3,29 @@ import logging
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
+from app.core.auth_cache import auth_state_cache
 from app.core.database import get_db
 from app.core.security import decode_access_token, http_bearer
 from app.core.settings import get_settings
-from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
 
-async def get_current_user(
-    token: HTTPAuthorizationCredentials = Depends(http_bearer),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    payload = decode_access_token(token.credentials)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user_id = payload.get("user_id")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    stmt = select(User).where(User.user_id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-
-    # Kiểm tra xem user có bị banned không
-    if user.is_banned:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Your account has been banned. Please contact support for more information.",
-        )
-
-    return user
-
-
 # Những Endpoints cần phải đăng nhập mới dùng được
 async def verify_token(
     token: HTTPAuthorizationCredentials = Depends(http_bearer),
     db: AsyncSession = Depends(get_db),
 ):
-    payload = decode_access_token(token.credentials)
+    payload = await decode_access_token(token.credentials)
     user_id = payload["user_id"]
 
-    # Kiểm tra trạng thái banned
-    stmt = select(User.is_banned).where(User.user_id == user_id)
-    result = await db.execute(stmt)
-    is_banned = result.scalar_one_or_none()
+    # Kiểm tra trạng thái banned (cache, không query DB trong đa số trường hợp)
+    auth_state = await auth_state_cache.get(user_id, db)
 
-    if is_banned:
+    if auth_state["is_banned"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Your account has been banned. Please contact support for more information.",
@@ -77,9 +34,17 @@ async def verify_token(
     return user_id
 
 
-async def verify_admin(user: User = Depends(get_current_user)):
-    if not user.is_admin:
+async def verify_admin(
+    user_id: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_db),
+) -> str:
+    # Same cached state verify_token just read, no DB query
+    auth_state = await auth_state_cache.get(user_id, db)
+
+    if not auth_state["is_admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required",
         )
+
+    return user_id
@@ -0,0 +1,126 @@
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from app.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+BASELINES_PATH = Path(__file__).resolve().parents[2] / "perf_baselines.json"
+
+
+class RouteStats:
+    __slots__ = ("requests", "latencies_ms", "sql_statements", "peak_memory_kb")
+
+    def __init__(self, sample_size: int):
+        self.requests = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=sample_size)
+        self.sql_statements: Deque[int] = deque(maxlen=sample_size)
+        self.peak_memory_kb = 0.0
+
+    def to_dict(self) -> dict:
+        latencies = list(self.latencies_ms)
+        statements = list(self.sql_statements)
+        return {
+            "requests": self.requests,
+            "sql_statements_p50": percentile(statements, 50),
+            "sql_statements_max": max(statements, default=0),
+            "latency_p50_ms": round(percentile(latencies, 50), 2),
+            "latency_p99_ms": round(percentile(latencies, 99), 2),
+            "peak_memory_kb": round(self.peak_memory_kb, 1),
+        }
+
+
+class EndpointMetrics:
+    """Per-route SQL statement counts, latency percentiles and peak memory.
+
+    Collected by the performance suite in ``tests/perf``, not by the app.
+    Latencies and statement counts keep the last ``sample_size`` requests of
+    each route. Observed values are compared against the committed
+    baselines in ``perf_baselines.json``: latency and memory may exceed
+    them by ``tolerance``, latencies by another ``latency_slack_ms`` for
+    the jitter of millisecond endpoints, statement counts not at all.
+    """
+
+    def __init__(
+        self,
+        sample_size: int,
+        baselines: Dict[str, dict],
+        tolerance: float = 0.2,
+        latency_slack_ms: float = 0.0,
+    ):
+        self.sample_size = sample_size
+        self.baselines = baselines
+        self.tolerance = tolerance
+        self.latency_slack_ms = latency_slack_ms
+        self.routes: Dict[str, RouteStats] = {}
+
+    def record(
+        self,
+        route: str,
+        latency_ms: float,
+        sql_statements: int,
+        peak_memory_kb: Optional[float] = None,
+    ):
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats(self.sample_size)
+
+        stats.requests += 1
+        stats.latencies_ms.append(latency_ms)
+        stats.sql_statements.append(sql_statements)
+        if peak_memory_kb is not None:
+            stats.peak_memory_kb = max(stats.peak_memory_kb, peak_memory_kb)
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            route: {**stats.to_dict(), "baseline": self.baselines.get(route)}
+            for route, stats in sorted(self.routes.items())
+        }
+
+    def regressions(self) -> List[dict]:
+        """Routes whose observed values exceed their baseline"""
+        tolerance = 1 + self.tolerance
+        slack = self.latency_slack_ms
+        regressions = []
+
+        for route, observed in self.snapshot().items():
+            baseline = observed["baseline"]
+            if not baseline:
+                continue
+
+            checks = [
+                ("sql_statements", observed["sql_statements_max"], 1, 0),
+                ("latency_p50_ms", observed["latency_p50_ms"], tolerance, slack),
+                ("latency_p99_ms", observed["latency_p99_ms"], tolerance, slack),
+                ("peak_memory_kb", observed["peak_memory_kb"], tolerance, 0),
+            ]
+            for metric, value, factor, extra in checks:
+                limit = baseline.get(metric)
+                if limit is not None and value > limit * factor + extra:
+                    regressions.append(
+                        {
+                            "route": route,
+                            "metric": metric,
+                            "observed": value,
+                            "baseline": limit,
+                        }
+                    )
+
+        return regressions
+
+    def reset(self):
+        self.routes.clear()
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> Dict[str, dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.error(f"Invalid baselines file {path}: {str(e)}")
+        return {}
@@ -0,0 +1,166 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.database import engine
+from app.core.settings import get_settings
+from app.utils.ids import id_timestamp
+
+settings = get_settings()
+
+# Tables range-partitioned by created_at month and the setting holding their
+# retention. Referencing tables come first so their partitions are detached
+# before the partitions they point to.
+PARTITIONED_TABLES = {
+    "notification_recipients": "NOTIFICATION_RETENTION_MONTHS",
+    "notifications": "NOTIFICATION_RETENTION_MONTHS",
+    "message_statuses": "MESSAGE_RETENTION_MONTHS",
+    "messages": "MESSAGE_RETENTION_MONTHS",
+}
+
+# created_at comes from the database clock, the ID timestamp from the app
+# server's, and TIMESTAMP columns follow the session time zone
+ID_CLOCK_SKEW = timedelta(days=1)
+
+LIST_PARTITIONS_QUERY = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    """
+)
+
+# Per-user deletions of messages whose partition was archived
+PURGE_DELETED_MESSAGES = text(
+    """
+    DELETE FROM deleted_messages d
+    WHERE NOT EXISTS (
+        SELECT 1 FROM messages m WHERE m.message_id = d.message_id
+    )
+    """
+)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    suffix = name[len(table) + 2 :]
+    try:
+        return datetime.strptime(suffix, "%Y%m").date()
+    except ValueError:
+        return None
+
+
+def created_at_window(column, item_id: str) -> list:
+    """Conditions keeping a lookup by ID on the partitions around the time
+    the ID was generated, empty for IDs without a timestamp"""
+    created_at = id_timestamp(item_id)
+    if created_at is None:
+        return []
+    return [column.between(created_at - ID_CLOCK_SKEW, created_at + ID_CLOCK_SKEW)]
+
+
+async def _list_partitions(conn: AsyncConnection, table: str) -> Dict[date, str]:
+    result = await conn.execute(LIST_PARTITIONS_QUERY, {"table": table})
+    partitions = {}
+    for (name,) in result.all():
+        month = partition_month(table, name)
+        if month is not None:
+            partitions[month] = name
+    return partitions
+
+
+async def create_partitions(
+    conn: AsyncConnection, table: str, today: date, months_ahead: int
+) -> List[str]:
+    """Partitions from the current month to ``months_ahead`` months out"""
+    existing = await _list_partitions(conn, table)
+    created = []
+    current = month_start(today)
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(table, month)
+        await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def archive_partitions(
+    conn: AsyncConnection, table: str, today: date, retention_months: int
+) -> List[str]:
+    """Detach partitions older than the retention window.
+
+    Detached partitions are moved to PARTITION_ARCHIVE_SCHEMA, where they can
+    be dumped or dropped, unless PARTITION_DROP_EXPIRED is set.
+    """
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(today), -retention_months)
+    archived = []
+    for month, name in sorted((await _list_partitions(conn, table)).items()):
+        if month >= cutoff:
+            break
+        # CONCURRENTLY only takes a SHARE UPDATE EXCLUSIVE lock on the parent,
+        # chat and notification writes keep going while it runs
+        await conn.execute(
+            text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+        )
+        if settings.PARTITION_DROP_EXPIRED:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        else:
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {name} SET SCHEMA {settings.PARTITION_ARCHIVE_SCHEMA}"
+                )
+            )
+        archived.append(name)
+    return archived
+
+
+async def maintain_partitions(today: Optional[date] = None) -> dict:
+    """Create upcoming partitions and archive expired ones for every table"""
+    today = today or datetime.utcnow().date()
+    report = {"created": [], "archived": []}
+
+    async with engine.connect() as conn:
+        # DETACH ... CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(
+            text(f"CREATE SCHEMA IF NOT EXISTS {settings.PARTITION_ARCHIVE_SCHEMA}")
+        )
+
+        for table, retention_setting in PARTITIONED_TABLES.items():
+            report["created"] += await create_partitions(
+                conn, table, today, settings.PARTITION_PREMAKE_MONTHS
+            )
+            report["archived"] += await archive_partitions(
+                conn, table, today, getattr(settings, retention_setting)
+            )
+
+        if any(name.startswith("messages_p") for name in report["archived"]):
+            await conn.execute(PURGE_DELETED_MESSAGES)
+
+    return report
@@ -0,0 +1,70 @@
+import time
+from collections import deque
+from typing import Deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.settings import get_settings
+from app.utils.stats import percentile
+
+settings = get_settings()
+
+
+class PoolMetrics:
+    """Checkout wait times of the SQLAlchemy pool.
+
+    Only the last ``METRICS_SAMPLE_SIZE`` checkouts are kept for the
+    percentiles; counters cover the whole process lifetime.
+    """
+
+    def __init__(self, sample_size: int):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+        self.waits_ms: Deque[float] = deque(maxlen=sample_size)
+
+    def record_checkout(self, wait_ms: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.timeouts += int(timed_out)
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.waits_ms.append(wait_ms)
+
+    def snapshot(self, pool) -> dict:
+        waits = list(self.waits_ms)
+        size = pool.size()
+        in_use = pool.checkedout()
+        return {
+            "pool_size": size,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            # Negative while the pool has not opened pool_size connections yet
+            "overflow": pool.overflow(),
+            "utilization": round(in_use / (size + settings.DB_MAX_OVERFLOW), 3),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.timeouts,
+            "checkout_wait_p50_ms": round(percentile(waits, 50), 2),
+            "checkout_wait_p99_ms": round(percentile(waits, 99), 2),
+            "checkout_wait_max_ms": round(self.max_wait_ms, 2),
+        }
+
+
+pool_metrics = PoolMetrics(settings.METRICS_SAMPLE_SIZE)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_checkout(
+                (time.perf_counter() - started) * 1000, timed_out
+            )
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import random
+import time
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.database import create_engine, engine, get_redis_client
+from app.core.security import decode_access_token
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+STICKY_KEY_PREFIX = "db:primary:"
+
+# Seconds the replica is behind; 0 when it replayed everything it received
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to ``read_engine`` and everything else, including
+    flushes and SELECT ... FOR UPDATE, to the primary"""
+
+    def __init__(self, *args, read_engine: Optional[AsyncEngine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_engine = read_engine
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.read_engine is not None
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return self.read_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+class ReplicaSet:
+    """Read replicas with a periodically refreshed replication lag"""
+
+    def __init__(self, urls: List[str]):
+        self.engines: List[AsyncEngine] = [create_engine(url) for url in urls]
+        self.lags: List[Optional[float]] = [None] * len(self.engines)
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        elapsed = time.monotonic() - self.checked_at
+        return elapsed >= settings.REPLICA_LAG_CHECK_INTERVAL
+
+    async def _check_lag(self, replica: AsyncEngine) -> Optional[float]:
+        try:
+            async with replica.connect() as conn:
+                return float(await conn.scalar(REPLICA_LAG_QUERY))
+        except Exception as e:
+            logger.warning(f"Replica {replica.url.host} unavailable: {str(e)}")
+            return None
+
+    async def refresh(self):
+        if not self._is_stale():
+            return
+        async with self.lock:
+            if not self._is_stale():
+                return
+            self.lags = await asyncio.gather(
+                *(self._check_lag(replica) for replica in self.engines)
+            )
+            self.checked_at = time.monotonic()
+
+    async def pick(self) -> Optional[AsyncEngine]:
+        """A replica within the lag limit, None to read from the primary"""
+        if not self.engines:
+            return None
+
+        await self.refresh()
+        healthy = [
+            replica
+            for replica, lag in zip(self.engines, self.lags)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        ]
+        return random.choice(healthy) if healthy else None
+
+    async def dispose(self):
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replica_set = ReplicaSet(settings.POSTGRES_REPLICA_URIS)
+
+ReadSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
+async def _request_user_id(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return (await decode_access_token(token)).get("user_id")
+    except HTTPException:
+        return None
+
+
+async def _is_sticky(user_id: Optional[str]) -> bool:
+    if user_id is None:
+        return False
+    try:
+        return bool(await get_redis_client().exists(f"{STICKY_KEY_PREFIX}{user_id}"))
+    except Exception as e:
+        # Cannot tell whether the user just wrote, stay on the primary
+        logger.warning(f"Read-your-writes check failed: {str(e)}")
+        return True
+
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints.
+
+    Reads go to a healthy replica unless none is configured or within the
+    lag limit, or the user wrote less than READ_YOUR_WRITES_WINDOW seconds
+    ago. Writes issued through it still reach the primary.
+    """
+    read_engine = None
+    if replica_set.engines and not await _is_sticky(await _request_user_id(request)):
+        read_engine = await replica_set.pick()
+
+    async with ReadSessionLocal(read_engine=read_engine) as session:
+        yield session
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Pin the user's reads to the primary for a short window after a write"""
+    response = await call_next(request)
+
+    if (
+        replica_set.engines
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        user_id = await _request_user_id(request)
+        if user_id:
+            await get_redis_client().setex(
+                f"{STICKY_KEY_PREFIX}{user_id}",
+                settings.READ_YOUR_WRITES_WINDOW,
+                "1",
+            )
+
+    return response
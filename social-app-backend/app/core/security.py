@@ -1,5 +1,11 @@
+import asyncio
 import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import uuid4
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
@@ -8,6 +14,8 @@ from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.settings import get_settings
+from app.core.token_revocation import token_revocation_list
+from app.utils.stats import percentile
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -18,21 +26,110 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with fewer rounds than configured are upgraded on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 http_bearer = HTTPBearer()
 
+# Decoded access tokens: token -> payload, reused until the token expires
+_decoded_tokens: "OrderedDict[str, dict]" = OrderedDict()
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+    bcrypt releases the GIL while hashing, so threads keep the event loop
+    free. At most ``workers + max_queue`` calls are in flight; callers past
+    that get a 503 instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+        self.workers = workers
+        self.max_pending = workers + max_queue
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.waits_ms = deque(maxlen=settings.METRICS_SAMPLE_SIZE)
+        self.runs_ms = deque(maxlen=settings.METRICS_SAMPLE_SIZE)
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+            )
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self.executor, timed)
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.waits_ms.append((started - submitted) * 1000)
+        self.runs_ms.append((finished - started) * 1000)
+        return result
+
+    def snapshot(self) -> dict:
+        waits = list(self.waits_ms)
+        runs = list(self.runs_ms)
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_p50_ms": round(percentile(waits, 50), 2),
+            "queue_wait_p99_ms": round(percentile(waits, 99), 2),
+            "hash_p50_ms": round(percentile(runs, 50), 2),
+            "hash_p99_ms": round(percentile(runs, 99), 2),
+        }
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+async def verify_password(plain_password, hashed_password) -> bool:
+    return await password_hasher.run(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password(
+    plain_password, hashed_password
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a new hash when the stored one uses
+    outdated cost parameters"""
+    return await password_hasher.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash(password) -> str:
+    return await password_hasher.run(pwd_context.hash, password)
 
 
 def create_access_token(user_id: str):
     to_encode = {
         "user_id": user_id,
+        "jti": uuid4().hex,
         "iat": datetime.now(timezone.utc),
         "exp": datetime.now(timezone.utc)
         + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
@@ -45,6 +142,7 @@ def create_access_token(user_id: str):
 def create_refresh_token(user_id: str, exp: int = None):
     to_encode = {
         "user_id": user_id,
+        "jti": uuid4().hex,
         "iat": datetime.now(timezone.utc),
         "token_type": "refresh",
     }
@@ -58,9 +156,43 @@ def create_refresh_token(user_id: str, exp: int = None):
     return encoded_jwt
 
 
-def decode_access_token(token: str):
+async def _check_not_revoked(payload: dict) -> None:
+    # Tokens issued before jti was added cannot be revoked
+    jti = payload.get("jti")
+    if jti and await token_revocation_list.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def revoke_token(payload: dict) -> None:
+    """Reject the token from now until it expires"""
+    if payload.get("jti"):
+        await token_revocation_list.revoke(payload["jti"], payload["exp"])
+
+
+async def decode_access_token(token: str):
+    payload = _verify_access_token(token)
+    await _check_not_revoked(payload)
+    return payload
+
+
+def _verify_access_token(token: str):
+    payload = _decoded_tokens.get(token)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            _decoded_tokens.move_to_end(token)
+            return payload
+        # Expired, let jwt.decode raise the usual error
+        del _decoded_tokens[token]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        _decoded_tokens[token] = payload
+        if len(_decoded_tokens) > settings.TOKEN_CACHE_SIZE:
+            _decoded_tokens.popitem(last=False)
         return payload
     except ExpiredSignatureError:
         raise HTTPException(
@@ -76,7 +208,13 @@ def decode_access_token(token: str):
         )
 
 
-def decode_refresh_token(token: str):
+async def decode_refresh_token(token: str):
+    payload = _verify_refresh_token(token)
+    await _check_not_revoked(payload)
+    return payload
+
+
+def _verify_refresh_token(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if payload["token_type"] != "refresh":
@@ -0,0 +1,95 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class StatementCounter:
+    """SQL statements issued while handling one request"""
+
+    __slots__ = ("count", "budget")
+
+    def __init__(self, budget: int):
+        self.count = 0
+        self.budget = budget
+
+    @property
+    def exceeded(self) -> bool:
+        return self.count > self.budget
+
+
+_current_counter: ContextVar[Optional[StatementCounter]] = ContextVar(
+    "sql_statement_counter", default=None
+)
+
+
+# Registered on the Engine class to count primary and replica statements
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def get_statement_counter() -> Optional[StatementCounter]:
+    return _current_counter.get()
+
+
+@contextmanager
+def count_statements(budget: int) -> Iterator[StatementCounter]:
+    """Count the SQL statements issued inside the block.
+
+    Nested blocks share the outer counter, so a test holding one sees the
+    statements of the requests it makes.
+    """
+    counter = _current_counter.get()
+    if counter is not None:
+        yield counter
+        return
+
+    counter = StatementCounter(budget)
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+def sql_budget(budget: int):
+    """Dependency overriding the statement budget of an endpoint.
+
+    Usage: ``@router.get(..., dependencies=[Depends(sql_budget(4))])``
+    """
+
+    async def set_budget():
+        counter = _current_counter.get()
+        if counter is not None:
+            counter.budget = budget
+
+    return set_budget
+
+
+async def sql_budget_middleware(request: Request, call_next):
+    """Log requests over their SQL statement budget.
+
+    Budgets are enforced by the test suite, production only reports them.
+    """
+    with count_statements(settings.SQL_STATEMENT_BUDGET) as counter:
+        response = await call_next(request)
+
+    if counter.exceeded:
+        logger.warning(
+            f"{request.method} {request.url.path} issued {counter.count} SQL "
+            f"statements (budget {counter.budget})"
+        )
+    return response
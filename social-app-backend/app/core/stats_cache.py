@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Set
+
+from app.core.database import get_redis_client
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+class StatsCache:
+    """Admin statistics cached in Redis with stale-while-revalidate.
+
+    Entries younger than the metric's TTL are served as is. Older entries are
+    still served, for up to STATS_CACHE_STALE_SECONDS, while the one request
+    holding the metric's Redis lock recomputes them in the background. Only a
+    cold miss waits, and concurrent misses wait for the lock holder instead
+    of all running the same queries.
+    """
+
+    def __init__(self, key_prefix: str = "stats:cache:"):
+        self.key_prefix = key_prefix
+        self.refreshing: Set[asyncio.Task] = set()
+
+    def _key(self, metric: str) -> str:
+        return f"{self.key_prefix}{metric}"
+
+    def _lock(self, metric: str):
+        return get_redis_client().lock(
+            f"{self._key(metric)}:lock",
+            timeout=settings.STATS_CACHE_LOCK_TIMEOUT,
+            blocking=False,
+        )
+
+    async def _read(self, metric: str) -> Optional[dict]:
+        cached = await get_redis_client().get(self._key(metric))
+        return json.loads(cached) if cached else None
+
+    async def _compute(
+        self, metric: str, ttl: int, compute: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        value = await compute()
+        entry = {"computed_at": time.time(), "value": value}
+        await get_redis_client().set(
+            self._key(metric),
+            json.dumps(entry, default=str),
+            ex=ttl + settings.STATS_CACHE_STALE_SECONDS,
+        )
+        return value
+
+    async def _refresh(
+        self, lock, metric: str, ttl: int, compute: Callable[[], Awaitable[dict]]
+    ) -> None:
+        try:
+            await self._compute(metric, ttl, compute)
+        except Exception as e:
+            logger.error(f"Error refreshing {metric} stats: {str(e)}")
+        finally:
+            await self._release(lock)
+
+    async def _release(self, lock) -> None:
+        try:
+            await lock.release()
+        except Exception:
+            # Lock đã hết hạn, request khác có thể đang giữ nó
+            pass
+
+    async def _wait_for_entry(self, metric: str) -> Optional[dict]:
+        """Poll for the entry the lock holder is computing, None if the lock
+        is released or times out without one"""
+        deadline = time.monotonic() + settings.STATS_CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.STATS_CACHE_WAIT_INTERVAL)
+            entry = await self._read(metric)
+            if entry is not None:
+                return entry
+            if not await self._lock(metric).locked():
+                return None
+        return None
+
+    async def get(
+        self, metric: str, ttl: int, compute: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Cached value of ``metric``, recomputed with ``compute`` when it is
+        older than ``ttl`` seconds"""
+        entry = await self._read(metric)
+        if entry is not None:
+            if time.time() - entry["computed_at"] >= ttl:
+                lock = self._lock(metric)
+                if await lock.acquire():
+                    task = asyncio.create_task(
+                        self._refresh(lock, metric, ttl, compute)
+                    )
+                    self.refreshing.add(task)
+                    task.add_done_callback(self.refreshing.discard)
+            return entry["value"]
+
+        lock = self._lock(metric)
+        if await lock.acquire():
+            try:
+                return await self._compute(metric, ttl, compute)
+            finally:
+                await self._release(lock)
+
+        entry = await self._wait_for_entry(metric)
+        if entry is not None:
+            return entry["value"]
+        # Request giữ lock bị lỗi, tự tính lại
+        return await compute()
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Optional, Set
+
+from app.core.backplane import Backplane
+from app.core.database import get_redis_client
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+TOKEN_REVOKED_CHANNEL = "auth:revoked"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings, no false negatives"""
+
+    __slots__ = ("size", "hash_count", "bits", "count")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenRevocationList:
+    """Revoked token IDs (``jti``) on the shared Redis pool.
+
+    Each revoked jti is stored until the token would have expired anyway.
+    Every worker keeps a Bloom filter of revoked jtis, filled from Redis on
+    start and kept in sync over TOKEN_REVOKED_CHANNEL, so tokens that were
+    never revoked are accepted without a network call. It is refilled when
+    the channel reconnects, revocations published meanwhile were missed.
+    """
+
+    def __init__(self):
+        self.key_prefix = "auth:revoked:"
+        self.bloom = self._new_filter()
+        self.backplane: Optional[Backplane] = None
+        # jtis revoked while a rebuild scans Redis, None when not rebuilding
+        self.rebuilding: Optional[Set[str]] = None
+        self.rebuild_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _new_filter() -> BloomFilter:
+        return BloomFilter(
+            settings.TOKEN_BLOOM_CAPACITY, settings.TOKEN_BLOOM_ERROR_RATE
+        )
+
+    async def start(self, backplane: Backplane) -> None:
+        self.backplane = backplane
+        await backplane.start(self._handle_revoked, self._rebuild_soon)
+        await backplane.subscribe(TOKEN_REVOKED_CHANNEL)
+        await self.rebuild()
+
+    async def stop(self) -> None:
+        if self.backplane:
+            await self.backplane.stop()
+
+    async def rebuild(self) -> None:
+        """Reload the filter from Redis, dropping jtis that have expired"""
+        if self.rebuilding is not None:
+            return
+
+        self.rebuilding = set()
+        try:
+            bloom = self._new_filter()
+            prefix_length = len(self.key_prefix)
+            async for key in get_redis_client().scan_iter(
+                match=f"{self.key_prefix}*", count=1000
+            ):
+                bloom.add(key[prefix_length:])
+            # The scan may have passed their keys already
+            for jti in self.rebuilding:
+                bloom.add(jti)
+            self.bloom = bloom
+        finally:
+            self.rebuilding = None
+        logger.info(f"Loaded {bloom.count} revoked tokens")
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        await get_redis_client().setex(f"{self.key_prefix}{jti}", ttl, "1")
+        self._add(jti)
+        if self.backplane:
+            await self.backplane.publish(TOKEN_REVOKED_CHANNEL, {"jti": jti})
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self.bloom:
+            return False
+        # Possible false positive, Redis has the final word
+        return bool(await get_redis_client().exists(f"{self.key_prefix}{jti}"))
+
+    def _add(self, jti: str) -> None:
+        self.bloom.add(jti)
+        if self.rebuilding is not None:
+            self.rebuilding.add(jti)
+        elif self.bloom.count > settings.TOKEN_BLOOM_CAPACITY:
+            # Past capacity the false positive rate climbs, start over
+            # from the jtis still stored in Redis
+            logger.info("Revoked token filter is full, rebuilding")
+            self.bloom.count = 0
+            self._rebuild_soon()
+
+    def _rebuild_soon(self) -> None:
+        self.rebuild_task = asyncio.create_task(self.rebuild())
+
+    async def _handle_revoked(self, channel: str, data: dict) -> None:
+        self._add(data["jti"])
+
+
+token_revocation_list = TokenRevocationList()
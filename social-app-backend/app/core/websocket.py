@@ -1,125 +1,312 @@
+import asyncio
+import json
 import logging
-from typing import Dict, Optional, Set
+from contextlib import suppress
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
+
+from app.core.backplane import Backplane
+from app.core.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+USER_CHANNEL_PREFIX = "ws:user:"
+CONVERSATION_CHANNEL_PREFIX = "ws:conversation:"
+
+
+class ClientConnection:
+    """One WebSocket with a bounded outbound queue drained by its own writer.
+
+    Broadcasts only enqueue, so a slow client never delays delivery to the
+    others or the sender's receive loop.
+    """
+
+    __slots__ = ("websocket", "user_id", "queue", "writer", "closing")
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(
+            maxsize=settings.WEBSOCKET_SEND_QUEUE_SIZE
+        )
+        self.writer: Optional[asyncio.Task] = None
+        self.closing = False
+
+    def start(self, on_failure: Callable[["ClientConnection"], Awaitable[None]]):
+        self.writer = asyncio.create_task(self._write(on_failure))
+
+    async def _write(self, on_failure) -> None:
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_text(text), settings.WEBSOCKET_SEND_TIMEOUT
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to user {self.user_id}: {str(e)}")
+            await on_failure(self)
+
+    async def close(self, code: int = status.WS_1000_NORMAL_CLOSURE) -> None:
+        self.closing = True
+        if self.writer and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        with suppress(Exception):
+            await self.websocket.close(code=code)
+
+
+class LocalUser:
+    """Sockets of a user on this node and the conversations they are in"""
+
+    __slots__ = ("connections", "conversations", "typing")
+
+    def __init__(self):
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # Reverse indexes of conversation_members and typing_status
+        self.conversations: Set[str] = set()
+        self.typing: Set[str] = set()
+
 
 class ConnectionManager:
+    """WebSocket connections of this node.
+
+    Outgoing traffic is published on the backplane and delivered by the
+    node(s) hosting the recipients, so users connected to different
+    workers can talk to each other.
+    """
+
     def __init__(self):
-        # Store active connections: user_id -> Set[WebSocket]
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.backplane: Optional[Backplane] = None
+        # Store connected users: user_id -> LocalUser
+        self.users: Dict[str, LocalUser] = {}
         # Store conversation connections: conversation_id -> Set[user_id]
         self.conversation_members: Dict[str, Set[str]] = {}
-        # Store user status: user_id -> bool
-        self.user_status: Dict[str, bool] = {}
         # Store typing status: conversation_id -> Set[user_id]
         self.typing_status: Dict[str, Set[str]] = {}
+        # Store presence audience: user_id -> contact user_ids
+        self.presence_contacts: Dict[str, List[str]] = {}
+        # Store delayed offline broadcasts: user_id -> Task
+        self.pending_offline: Dict[str, asyncio.Task] = {}
+        # Store cleanups of a user's last socket in progress: user_id -> Event
+        self.leaving: Dict[str, asyncio.Event] = {}
 
-    async def connect(self, websocket: WebSocket, user_id: str) -> None:
+    async def start(self, backplane: Backplane) -> None:
+        self.backplane = backplane
+        await backplane.start(self._handle_backplane_message)
+
+    async def stop(self) -> None:
+        for task in self.pending_offline.values():
+            task.cancel()
+        self.pending_offline.clear()
+        if self.backplane:
+            await self.backplane.stop()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        contact_ids: Optional[List[str]] = None,
+    ) -> None:
+        """Register a socket, ``contact_ids`` receive the user's presence"""
         try:
             await websocket.accept()
-            if user_id not in self.active_connections:
-                self.active_connections[user_id] = set()
-            self.active_connections[user_id].add(websocket)
-            self.user_status[user_id] = True
-
-            # Broadcast user online status
-            await self.broadcast_user_status(user_id, True)
-            logger.info(
-                f"User {user_id} connected. Total users: {len(self.active_connections)}"
-            )
+            leaving = self.leaving.get(user_id)
+            if leaving:
+                # Subscribe and record presence after the cleanup undid them
+                await leaving.wait()
+            user = self.users.get(user_id)
+            first_node = False
+            if user is None:
+                user = self.users[user_id] = LocalUser()
+                await self.backplane.subscribe(f"{USER_CHANNEL_PREFIX}{user_id}")
+                first_node = await self.backplane.add_presence(user_id) == 1
+            connection = ClientConnection(websocket, user_id)
+            connection.start(self._drop_connection)
+            user.connections[websocket] = connection
+            if contact_ids is not None:
+                self.presence_contacts[user_id] = contact_ids
+
+            pending = self.pending_offline.pop(user_id, None)
+            if pending:
+                # Reconnected within the flap window, contacts never saw
+                # the user go offline
+                pending.cancel()
+            elif first_node:
+                # Broadcast user online status, unless another node has
+                # a socket of the user
+                await self.broadcast_user_status(user_id, True)
+            logger.info(f"User {user_id} connected. Total users: {len(self.users)}")
         except Exception as e:
             logger.error(f"Error connecting user {user_id}: {str(e)}")
             raise
 
     async def disconnect(self, websocket: WebSocket, user_id: str) -> None:
         try:
-            if user_id in self.active_connections:
-                self.active_connections[user_id].remove(websocket)
-                if not self.active_connections[user_id]:
-                    del self.active_connections[user_id]
-                    self.user_status[user_id] = False
-
-                    # Cleanup user from all conversations
-                    for conv_id in list(self.conversation_members.keys()):
-                        if user_id in self.conversation_members[conv_id]:
-                            self.conversation_members[conv_id].remove(user_id)
-                            if not self.conversation_members[conv_id]:
-                                del self.conversation_members[conv_id]
-
-                    # Cleanup typing status
-                    for conv_id in list(self.typing_status.keys()):
-                        if user_id in self.typing_status[conv_id]:
-                            self.typing_status[conv_id].remove(user_id)
-                            if not self.typing_status[conv_id]:
-                                del self.typing_status[conv_id]
-
-                    # Broadcast user offline status
-                    await self.broadcast_user_status(user_id, False)
+            user = self.users.get(user_id)
+            if user and websocket in user.connections:
+                connection = user.connections.pop(websocket)
+                if connection.writer and not connection.closing:
+                    connection.writer.cancel()
+                if not user.connections:
+                    # Removed before the first await, a reconnect during the
+                    # cleanup gets a new LocalUser
+                    del self.users[user_id]
+                    leaving = self.leaving[user_id] = asyncio.Event()
+                    try:
+                        # Cleanup user from their conversations and typing status
+                        for conv_id in list(user.typing):
+                            self._set_typing(conv_id, user_id, False)
+                        await self.backplane.unsubscribe(
+                            f"{USER_CHANNEL_PREFIX}{user_id}"
+                        )
+                        await self.backplane.remove_presence(user_id)
+                        for conv_id in list(user.conversations):
+                            await self.leave_conversation(conv_id, user_id)
+                    finally:
+                        del self.leaving[user_id]
+                        leaving.set()
+
+                    # Broadcast user offline status unless they come back
+                    # within the flap window or are connected to another node
+                    self.pending_offline[user_id] = asyncio.create_task(
+                        self._broadcast_offline_later(user_id)
+                    )
                     logger.info(
-                        f"User {user_id} disconnected. Total users: {len(self.active_connections)}"
+                        f"User {user_id} disconnected. Total users: {len(self.users)}"
                     )
         except Exception as e:
             logger.error(f"Error disconnecting user {user_id}: {str(e)}")
             raise
 
     async def join_conversation(self, conversation_id: str, user_id: str) -> None:
+        user = self.users.get(user_id)
+        if user is None:
+            return
         if conversation_id not in self.conversation_members:
             self.conversation_members[conversation_id] = set()
+            await self.backplane.subscribe(
+                f"{CONVERSATION_CHANNEL_PREFIX}{conversation_id}"
+            )
         self.conversation_members[conversation_id].add(user_id)
+        user.conversations.add(conversation_id)
         logger.info(f"User {user_id} joined conversation {conversation_id}")
 
     async def leave_conversation(self, conversation_id: str, user_id: str) -> None:
+        user = self.users.get(user_id)
+        if user:
+            user.conversations.discard(conversation_id)
         if conversation_id in self.conversation_members:
             self.conversation_members[conversation_id].discard(user_id)
             if not self.conversation_members[conversation_id]:
                 del self.conversation_members[conversation_id]
+                await self.backplane.unsubscribe(
+                    f"{CONVERSATION_CHANNEL_PREFIX}{conversation_id}"
+                )
             logger.info(f"User {user_id} left conversation {conversation_id}")
 
     async def send_personal_message(self, message: dict, user_id: str) -> None:
-        if user_id in self.active_connections:
-            failed_connections = set()
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {str(e)}")
-                    failed_connections.add(connection)
-
-            # Remove failed connections
-            for failed in failed_connections:
-                self.active_connections[user_id].remove(failed)
+        await self.backplane.publish(
+            f"{USER_CHANNEL_PREFIX}{user_id}", {"message": message}
+        )
 
     async def broadcast_to_conversation(
         self, conversation_id: str, message: dict, exclude_user: Optional[str] = None
     ) -> None:
-        if conversation_id in self.conversation_members:
-            for user_id in self.conversation_members[conversation_id]:
-                if user_id != exclude_user:
-                    await self.send_personal_message(message, user_id)
+        await self.backplane.publish(
+            f"{CONVERSATION_CHANNEL_PREFIX}{conversation_id}",
+            {"message": message, "exclude_user": exclude_user},
+        )
 
     async def broadcast_user_status(self, user_id: str, is_online: bool) -> None:
+        """Send a presence change to the user's contacts only.
+
+        Contacts without a connected socket have no subscriber on their
+        channel and Redis drops the message.
+        """
+        contact_ids = self.presence_contacts.get(user_id)
+        if not contact_ids:
+            return
+
         message = {"type": "user_status", "user_id": user_id, "is_online": is_online}
-        for other_user_id in self.active_connections:
-            if other_user_id != user_id:
-                await self.send_personal_message(message, other_user_id)
+        await self.backplane.publish_many(
+            [f"{USER_CHANNEL_PREFIX}{contact_id}" for contact_id in contact_ids],
+            {"message": message},
+        )
+
+    async def _broadcast_offline_later(self, user_id: str) -> None:
+        await asyncio.sleep(settings.PRESENCE_FLAP_WINDOW)
+        self.pending_offline.pop(user_id, None)
+        try:
+            if await self.backplane.presence_count(user_id) == 0:
+                await self.broadcast_user_status(user_id, False)
+        except Exception as e:
+            logger.error(f"Error broadcasting offline status of {user_id}: {str(e)}")
+        finally:
+            if user_id not in self.users:
+                self.presence_contacts.pop(user_id, None)
+
+    async def _handle_backplane_message(self, channel: str, data: dict) -> None:
+        """Deliver a backplane message to the matching local connections"""
+        message = data["message"]
+        exclude_user = data.get("exclude_user")
+
+        if channel.startswith(USER_CHANNEL_PREFIX):
+            recipients = [channel[len(USER_CHANNEL_PREFIX) :]]
+        elif channel.startswith(CONVERSATION_CHANNEL_PREFIX):
+            conversation_id = channel[len(CONVERSATION_CHANNEL_PREFIX) :]
+            recipients = list(self.conversation_members.get(conversation_id, ()))
+        else:
+            return
+
+        # Serialize once per broadcast, not once per socket
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        droppable = message.get("type") in settings.WEBSOCKET_DROPPABLE_TYPES
+
+        for user_id in recipients:
+            user = self.users.get(user_id)
+            if user is None or user_id == exclude_user:
+                continue
+            for connection in list(user.connections.values()):
+                self._enqueue(connection, text, droppable)
+
+    def _enqueue(self, connection: ClientConnection, text: str, droppable: bool):
+        if connection.closing:
+            return
+        try:
+            connection.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            if droppable or settings.WEBSOCKET_SLOW_CONSUMER_POLICY == "drop":
+                logger.warning(
+                    f"Send queue full, dropped message to {connection.user_id}"
+                )
+                return
+
+            logger.warning(f"Disconnecting slow consumer {connection.user_id}")
+            connection.closing = True
+            asyncio.create_task(
+                self._drop_connection(connection, status.WS_1013_TRY_AGAIN_LATER)
+            )
+
+    async def _drop_connection(
+        self,
+        connection: ClientConnection,
+        code: int = status.WS_1011_INTERNAL_ERROR,
+    ) -> None:
+        """Unregister a failed or slow connection and close its socket"""
+        connection.closing = True
+        with suppress(Exception):
+            await self.disconnect(connection.websocket, connection.user_id)
+        await connection.close(code)
 
     async def broadcast_typing_status(
         self, conversation_id: str, user_id: str, is_typing: bool
     ) -> None:
         try:
-            if is_typing:
-                if conversation_id not in self.typing_status:
-                    self.typing_status[conversation_id] = set()
-                self.typing_status[conversation_id].add(user_id)
-            else:
-                if conversation_id in self.typing_status:
-                    self.typing_status[conversation_id].discard(user_id)
-                    if not self.typing_status[conversation_id]:
-                        del self.typing_status[conversation_id]
-
+            self._set_typing(conversation_id, user_id, is_typing)
             message = {
                 "type": "typing_status",
                 "conversation_id": conversation_id,
@@ -130,5 +317,21 @@ class ConnectionManager:
         except Exception as e:
             logger.error(f"Error broadcasting typing status: {str(e)}")
 
+    def _set_typing(self, conversation_id: str, user_id: str, is_typing: bool):
+        user = self.users.get(user_id)
+        if is_typing:
+            if user is None:
+                return
+            self.typing_status.setdefault(conversation_id, set()).add(user_id)
+            user.typing.add(conversation_id)
+            return
+
+        if user:
+            user.typing.discard(conversation_id)
+        if conversation_id in self.typing_status:
+            self.typing_status[conversation_id].discard(user_id)
+            if not self.typing_status[conversation_id]:
+                del self.typing_status[conversation_id]
+
 
 manager = ConnectionManager()
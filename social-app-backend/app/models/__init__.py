@@ -1,5 +1,6 @@
 from .comment import Comment
 from .conversation import Conversation
+from .daily_stats import DailyStats
 from .deleted_conversation import DeletedConversation
 from .deleted_message import DeletedMessage
 from .device_token import DeviceToken
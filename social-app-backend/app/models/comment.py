@@ -3,14 +3,13 @@ from sqlalchemy.orm import backref, relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Comment(Base):
     __tablename__ = "comments"
 
-    comment_id = Column(
-        String(50), primary_key=True, default="comment-" + func.uuid_generate_v4()
-    )
+    comment_id = Column(String(50), primary_key=True, default=generate_id("comment"))
     post_id = Column(String(50), ForeignKey("posts.post_id", ondelete="CASCADE"))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     content = Column(String, nullable=False)
@@ -25,14 +24,20 @@ class Comment(Base):
         Index("ix_comments_post_id", "post_id"),
         Index("ix_comments_user_id", "user_id"),
         Index("ix_comments_parent_id", "parent_id"),
+        Index("ix_comments_created_at", "created_at"),
+        Index("ix_comments_post_id_created_at", "post_id", "created_at", "comment_id"),
+        Index(
+            "ix_comments_parent_id_created_at", "parent_id", "created_at", "comment_id"
+        ),
     )
 
     # Relationships
-    user = relationship("User", back_populates="comments", lazy="selectin")
-    post = relationship("Post", back_populates="comments", lazy="selectin")
+    user = relationship("User", back_populates="comments", lazy="raise")
+    post = relationship("Post", back_populates="comments", lazy="raise")
     replies = relationship(
         "Comment",
-        backref=backref("parent", remote_side=[comment_id]),
+        backref=backref("parent", remote_side=[comment_id], lazy="raise"),
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
@@ -5,13 +5,14 @@ from sqlalchemy.orm import Mapped, relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Conversation(Base):
     __tablename__ = "conversations"
 
     conversation_id: Mapped[str] = Column(
-        String(50), primary_key=True, default="conversation-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("conversation")
     )
     title: Mapped[str] = Column(String(255), nullable=True)
     creator_id: Mapped[str] = Column(
@@ -22,10 +23,15 @@ class Conversation(Base):
         TIMESTAMP, server_default=func.now(), onupdate=func.now()
     )
     deleted_at: Mapped[datetime] = Column(TIMESTAMP, nullable=True)
+    # Pointer to the newest message, maintained by ChatService.create_message
+    last_message_id: Mapped[str] = Column(String(50), nullable=True)
+    last_message_at: Mapped[datetime] = Column(TIMESTAMP, nullable=True)
 
-    messages = relationship("Message", back_populates="conversation", lazy="selectin", cascade="all, delete-orphan")
+    messages = relationship(
+        "Message", back_populates="conversation", lazy="raise", cascade="all, delete-orphan", passive_deletes=True
+    )
     participants = relationship(
-        "Participant", back_populates="conversation", lazy="selectin", cascade="all, delete-orphan"
+        "Participant", back_populates="conversation", lazy="raise", cascade="all, delete-orphan", passive_deletes=True
     )
 
     __table_args__ = (Index("ix_conversations_creator_id", "creator_id"),)
@@ -0,0 +1,30 @@
+from sqlalchemy import TIMESTAMP, Column, Date, Integer
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class DailyStats(Base):
+    """Per-day activity counters for the admin dashboard.
+
+    Filled by the rollup task, ``*_total`` columns are running totals at the
+    end of the day.
+    """
+
+    __tablename__ = "daily_stats"
+
+    date = Column(Date, primary_key=True)
+    new_users = Column(Integer, nullable=False, default=0, server_default="0")
+    users_total = Column(Integer, nullable=False, default=0, server_default="0")
+    posts = Column(Integer, nullable=False, default=0, server_default="0")
+    posts_total = Column(Integer, nullable=False, default=0, server_default="0")
+    comments = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_total = Column(Integer, nullable=False, default=0, server_default="0")
+    likes = Column(Integer, nullable=False, default=0, server_default="0")
+    likes_total = Column(Integer, nullable=False, default=0, server_default="0")
+    messages = Column(Integer, nullable=False, default=0, server_default="0")
+    active_conversations = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    notifications = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class DeletedConversation(Base):
@@ -11,7 +12,7 @@ class DeletedConversation(Base):
     id = Column(
         String(50),
         primary_key=True,
-        default="conversation-" + func.uuid_generate_v4(),
+        default=generate_id("conversation"),
     )
     conversation_id = Column(
         String(50), ForeignKey("conversations.conversation_id", ondelete="CASCADE")
@@ -19,5 +20,5 @@ class DeletedConversation(Base):
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     deleted_at = Column(TIMESTAMP, server_default=func.now())
 
-    conversation = relationship("Conversation", lazy="selectin")
-    user = relationship("User", lazy="selectin")
+    conversation = relationship("Conversation", lazy="raise")
+    user = relationship("User", lazy="raise")
@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class DeletedMessage(Base):
@@ -11,13 +12,18 @@ class DeletedMessage(Base):
     id = Column(
         String(50),
         primary_key=True,
-        default="deleted-message-" + func.uuid_generate_v4(),
-    )
-    message_id = Column(
-        String(50), ForeignKey("messages.message_id", ondelete="CASCADE")
+        default=generate_id("deleted-message"),
     )
+    # No foreign key, messages is partitioned and its key includes created_at.
+    # Rows of archived messages are purged by the partition maintenance task
+    message_id = Column(String(50))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     deleted_at = Column(TIMESTAMP, server_default=func.now())
 
-    message = relationship("Message", lazy="selectin")
-    user = relationship("User", lazy="selectin")
+    message = relationship(
+        "Message",
+        primaryjoin="foreign(DeletedMessage.message_id) == Message.message_id",
+        viewonly=True,
+        lazy="raise",
+    )
+    user = relationship("User", lazy="raise")
@@ -11,14 +11,13 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class DeviceToken(Base):
     __tablename__ = "device_tokens"
 
-    id = Column(
-        String(50), primary_key=True, default="device-" + func.uuid_generate_v4()
-    )
+    id = Column(String(50), primary_key=True, default=generate_id("device"))
     user_id = Column(
         String(50), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
     )
@@ -30,7 +29,7 @@ class DeviceToken(Base):
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
-    user = relationship("User", back_populates="device_tokens")
+    user = relationship("User", back_populates="device_tokens", lazy="raise")
 
     __table_args__ = (
         Index(
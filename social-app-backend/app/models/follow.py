@@ -3,14 +3,13 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Follow(Base):
     __tablename__ = "follows"
 
-    follow_id = Column(
-        String(50), primary_key=True, default="follow-" + func.uuid_generate_v4()
-    )
+    follow_id = Column(String(50), primary_key=True, default=generate_id("follow"))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     following_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -22,8 +21,8 @@ class Follow(Base):
     )
 
     follower = relationship(
-        "User", back_populates="following", foreign_keys=[user_id], lazy="selectin"
+        "User", back_populates="following", foreign_keys=[user_id], lazy="raise"
     )
     following = relationship(
-        "User", back_populates="followers", foreign_keys=[following_id], lazy="selectin"
+        "User", back_populates="followers", foreign_keys=[following_id], lazy="raise"
     )
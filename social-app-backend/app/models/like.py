@@ -3,14 +3,13 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Like(Base):
     __tablename__ = "likes"
 
-    like_id = Column(
-        String(50), primary_key=True, default="like-" + func.uuid_generate_v4()
-    )
+    like_id = Column(String(50), primary_key=True, default=generate_id("like"))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     post_id = Column(String(50), ForeignKey("posts.post_id", ondelete="CASCADE"))
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -19,7 +18,8 @@ class Like(Base):
         UniqueConstraint("user_id", "post_id", name="unique_user_post_like"),
         Index("ix_likes_user_id", "user_id"),
         Index("ix_likes_post_id", "post_id"),
+        Index("ix_likes_created_at", "created_at"),
     )
 
-    post = relationship("Post", back_populates="likes", lazy="selectin")
-    user = relationship("User", back_populates="likes", lazy="selectin")
+    post = relationship("Post", back_populates="likes", lazy="raise")
+    user = relationship("User", back_populates="likes", lazy="raise")
@@ -13,6 +13,7 @@ from sqlalchemy.orm import Mapped, relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class MessageType(PyEnum):
@@ -26,7 +27,7 @@ class Message(Base):
     __tablename__ = "messages"
 
     message_id: Mapped[str] = Column(
-        String(50), primary_key=True, default="message-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("message")
     )
     conversation_id: Mapped[str] = Column(
         String(50), ForeignKey("conversations.conversation_id", ondelete="CASCADE")
@@ -39,17 +40,27 @@ class Message(Base):
     updated_at: Mapped[datetime] = Column(
         TIMESTAMP, server_default=func.now(), onupdate=func.now()
     )
-    created_at: Mapped[datetime] = Column(TIMESTAMP, server_default=func.now())
+    # Partition key, part of the primary key as Postgres requires
+    created_at: Mapped[datetime] = Column(
+        TIMESTAMP, primary_key=True, nullable=False, server_default=func.now()
+    )
 
-    conversation = relationship("Conversation", back_populates="messages")
+    conversation = relationship("Conversation", back_populates="messages", lazy="raise")
     sender = relationship(
         "User",
         back_populates="sent_messages",
         foreign_keys=[sender_id],
-        lazy="selectin",
+        lazy="raise",
     )
 
     __table_args__ = (
         Index("ix_messages_conversation_id", "conversation_id"),
         Index("ix_messages_sender_id", "sender_id"),
+        Index(
+            "ix_messages_conversation_id_created_at",
+            "conversation_id",
+            "created_at",
+            "message_id",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
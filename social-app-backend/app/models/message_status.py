@@ -3,29 +3,39 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class MessageStatus(Base):
+    """Legacy per-message read receipts, replaced by participant watermarks"""
+
     __tablename__ = "message_statuses"
 
     id = Column(
         String(100),
         primary_key=True,
-        default="message-status-" + func.uuid_generate_v4(),
-    )
-    message_id = Column(
-        String(50), ForeignKey("messages.message_id", ondelete="CASCADE")
+        default=generate_id("message-status"),
     )
+    # No foreign key, messages is partitioned and its key includes created_at
+    message_id = Column(String(50))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     is_read = Column(Boolean, default=False)
     read_at = Column(TIMESTAMP, nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(
+        TIMESTAMP, primary_key=True, nullable=False, server_default=func.now()
+    )
 
-    message = relationship("Message", lazy="selectin")
-    user = relationship("User", lazy="selectin")
+    message = relationship(
+        "Message",
+        primaryjoin="foreign(MessageStatus.message_id) == Message.message_id",
+        viewonly=True,
+        lazy="raise",
+    )
+    user = relationship("User", lazy="raise")
 
     __table_args__ = (
         Index("ix_message_statuses_message_id", "message_id"),
         Index("ix_message_statuses_user_id", "user_id"),
         Index("ix_message_statuses_message_user", "message_id", "user_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -6,13 +6,14 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Notification(Base):
     __tablename__ = "notifications"
 
     notification_id = Column(
-        String(50), primary_key=True, default="notification-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("notification")
     )
     type = Column(String(50), nullable=False)
     title = Column(String(255), nullable=False)
@@ -21,19 +22,25 @@ class Notification(Base):
         String(50), ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
     )
     data = Column(Text, nullable=True)  # JSON data as string
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    # Partition key, part of the primary key as Postgres requires
+    created_at = Column(
+        TIMESTAMP, primary_key=True, nullable=False, server_default=func.now()
+    )
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     # Relationships
-    sender = relationship("User", foreign_keys=[sender_id], lazy="selectin")
+    sender = relationship("User", foreign_keys=[sender_id], lazy="raise")
     recipients = relationship(
         "NotificationRecipient",
         back_populates="notification",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     __table_args__ = (
         Index("ix_notifications_sender_id", "sender_id"),
         Index("ix_notifications_created_at", "created_at"),
+        Index("ix_notifications_created_at_id", "created_at", "notification_id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
@@ -3,6 +3,7 @@ from sqlalchemy import (
     Boolean,
     Column,
     ForeignKey,
+    ForeignKeyConstraint,
     Index,
     String,
     UniqueConstraint,
@@ -11,6 +12,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class NotificationRecipient(Base):
@@ -19,32 +21,45 @@ class NotificationRecipient(Base):
     id = Column(
         String(50),
         primary_key=True,
-        default="noti-rec-" + func.uuid_generate_v4(),
-    )
-    notification_id = Column(
-        String(50),
-        ForeignKey("notifications.notification_id", ondelete="CASCADE"),
-        nullable=False,
+        default=generate_id("noti-rec"),
     )
+    notification_id = Column(String(50), nullable=False)
     recipient_id = Column(
         String(50), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
     )
     is_read = Column(Boolean, default=False)
     read_at = Column(TIMESTAMP, nullable=True)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    # Always the notification's created_at, so both rows share a partition month
+    # and expire together
+    created_at = Column(TIMESTAMP, primary_key=True, nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     notification = relationship(
-        "Notification", back_populates="recipients", lazy="selectin"
+        "Notification", back_populates="recipients", lazy="raise"
     )
-    recipient = relationship("User", foreign_keys=[recipient_id], lazy="selectin")
+    recipient = relationship("User", foreign_keys=[recipient_id], lazy="raise")
 
     __table_args__ = (
+        ForeignKeyConstraint(
+            ["notification_id", "created_at"],
+            ["notifications.notification_id", "notifications.created_at"],
+            ondelete="CASCADE",
+        ),
+        # created_at follows notification_id, so this is still one row per
+        # notification and recipient
         UniqueConstraint(
-            "notification_id", "recipient_id", name="unique_notification_recipient"
+            "notification_id",
+            "recipient_id",
+            "created_at",
+            name="unique_notification_recipient",
         ),
         Index("ix_notification_recipients_notification_id", "notification_id"),
-        Index("ix_notification_recipients_recipient_id", "recipient_id"),
+        Index(
+            "ix_notification_recipients_recipient_id_created_at",
+            "recipient_id",
+            "created_at",
+        ),
         Index("ix_notification_recipients_is_read", "is_read"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
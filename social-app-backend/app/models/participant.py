@@ -1,10 +1,19 @@
 from enum import Enum as PyEnum
 
-from sqlalchemy import TIMESTAMP, Column, Enum, ForeignKey, Index, String
+from sqlalchemy import (
+    TIMESTAMP,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class ParticipantType(PyEnum):
@@ -16,20 +25,29 @@ class Participant(Base):
     __tablename__ = "participants"
 
     participant_id = Column(
-        String(50), primary_key=True, default="participant-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("participant")
     )
     conversation_id = Column(
         String(50), ForeignKey("conversations.conversation_id", ondelete="CASCADE")
     )
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     type = Column(Enum(ParticipantType), nullable=False)
+    # Read watermark: newest message when the user last caught up, and when.
+    # A message is seen by this user if it was created at or before last_read_at
+    last_read_message_id = Column(String(50), nullable=True)
+    last_read_at = Column(TIMESTAMP, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     __table_args__ = (
+        UniqueConstraint(
+            "conversation_id", "user_id", name="unique_conversation_participant"
+        ),
         Index("ix_participants_conversation_id", "conversation_id"),
         Index("ix_participants_user_id", "user_id"),
     )
 
-    conversation = relationship("Conversation", back_populates="participants")
-    user = relationship("User", lazy="selectin")
+    conversation = relationship(
+        "Conversation", back_populates="participants", lazy="raise"
+    )
+    user = relationship("User", lazy="raise")
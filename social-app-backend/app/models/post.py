@@ -1,15 +1,24 @@
-from sqlalchemy import TIMESTAMP, CheckConstraint, Column, ForeignKey, Index, String
+from sqlalchemy import (
+    TIMESTAMP,
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class Post(Base):
     __tablename__ = "posts"
 
     post_id = Column(
-        String(50), primary_key=True, default="post-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("post")
     )
     user_id = Column(
         String(50), 
@@ -18,28 +27,36 @@ class Post(Base):
     content = Column(String, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    # Denormalized counters, kept in sync by the services
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comments_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     __table_args__ = (
         CheckConstraint("length(content) > 0", name="posts_content_check"),
         Index("ix_posts_user_id", "user_id"),
+        Index("ix_posts_created_at_post_id", "created_at", "post_id"),
+        Index("ix_posts_user_id_created_at", "user_id", "created_at", "post_id"),
     )
 
-    user = relationship("User", back_populates="posts", lazy="selectin")
+    user = relationship("User", back_populates="posts", lazy="raise")
     post_images = relationship(
         "PostImage", 
         back_populates="post", 
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     comments = relationship(
         "Comment", 
         back_populates="post", 
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     likes = relationship(
         "Like", 
         back_populates="post", 
-        lazy="selectin",
-        cascade="all, delete-orphan"
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
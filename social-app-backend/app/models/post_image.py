@@ -1,15 +1,15 @@
 from sqlalchemy import Column, ForeignKey, String
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class PostImage(Base):
     __tablename__ = "post_images"
 
     image_id = Column(
-        String(50), primary_key=True, default="post-image-" + func.uuid_generate_v4()
+        String(50), primary_key=True, default=generate_id("post-image")
     )
     post_id = Column(
         String(50), 
@@ -20,5 +20,5 @@ class PostImage(Base):
     post = relationship(
         "Post", 
         back_populates="post_images", 
-        lazy="selectin"
+        lazy="raise"
     )
@@ -5,6 +5,7 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class ReportType(PyEnum):
@@ -21,9 +22,7 @@ class ReportStatus(PyEnum):
 class Report(Base):
     __tablename__ = "reports"
 
-    report_id = Column(
-        String(50), primary_key=True, default="report-" + func.uuid_generate_v4()
-    )
+    report_id = Column(String(50), primary_key=True, default=generate_id("report"))
     reporter_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     reported_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     type = Column(Enum(ReportType), nullable=False)
@@ -36,8 +35,8 @@ class Report(Base):
     resolved_at = Column(TIMESTAMP, nullable=True)
 
     # Relationships
-    reporter = relationship("User", foreign_keys=[reporter_id], lazy="selectin")
-    reported_user = relationship("User", foreign_keys=[reported_id], lazy="selectin")
+    reporter = relationship("User", foreign_keys=[reporter_id], lazy="raise")
+    reported_user = relationship("User", foreign_keys=[reported_id], lazy="raise")
 
     __table_args__ = (
         Index("ix_reports_reporter_id", "reporter_id"),
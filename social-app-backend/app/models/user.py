@@ -1,16 +1,25 @@
-from sqlalchemy import TIMESTAMP, Boolean, CheckConstraint, Column, Index, String
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    CheckConstraint,
+    Column,
+    Computed,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class User(Base):
     __tablename__ = "users"
 
-    user_id = Column(
-        String(50), primary_key=True, default="user-" + func.uuid_generate_v4()
-    )
+    user_id = Column(String(50), primary_key=True, default=generate_id("user"))
     email = Column(String(255), unique=True, nullable=False)
     password = Column(String(255), nullable=False)
     username = Column(String(50), nullable=False)
@@ -21,67 +30,102 @@ class User(Base):
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     full_name = Column(String(255), nullable=False, default="")
     is_banned = Column(Boolean, default=False)
+    # Denormalized counters, kept in sync by the services
+    followers_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+    posts_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Lowercase, accent-free names for trigram search, see normalize_search_text
+    search_name = Column(
+        Text,
+        Computed("lower(f_unaccent(username || ' ' || full_name))", persisted=True),
+    )
 
     __table_args__ = (
         CheckConstraint("length(username) >= 3", name="users_username_check"),
         Index("ix_users_email", "email"),
         Index("ix_users_username", "username"),
         Index("ix_users_is_admin", "is_admin"),
+        Index("ix_users_created_at", "created_at"),
+        Index(
+            "ix_users_search_name_trgm",
+            "search_name",
+            postgresql_using="gin",
+            postgresql_ops={"search_name": "gin_trgm_ops"},
+        ),
     )
 
     posts = relationship(
-        "Post", back_populates="user", lazy="selectin", cascade="all, delete-orphan"
+        "Post",
+        back_populates="user",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     comments = relationship(
-        "Comment", back_populates="user", lazy="selectin", cascade="all, delete-orphan"
+        "Comment",
+        back_populates="user",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     likes = relationship(
-        "Like", back_populates="user", lazy="selectin", cascade="all, delete-orphan"
+        "Like",
+        back_populates="user",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     sessions = relationship(
         "UserSession",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     sent_messages = relationship(
         "Message",
         back_populates="sender",
         foreign_keys="Message.sender_id",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     followers = relationship(
         "Follow",
         back_populates="following",
         foreign_keys="Follow.following_id",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     following = relationship(
         "Follow",
         back_populates="follower",
         foreign_keys="Follow.user_id",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     device_tokens = relationship(
         "DeviceToken",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     notifications_received = relationship(
         "NotificationRecipient",
         foreign_keys="NotificationRecipient.recipient_id",
         back_populates="recipient",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     notifications_sent = relationship(
         "Notification",
         foreign_keys="Notification.sender_id",
         back_populates="sender",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -5,19 +5,18 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.utils.ids import generate_id
 
 
 class UserSession(Base):
     __tablename__ = "user_sessions"
 
-    session_id = Column(
-        String(50), primary_key=True, default="session-" + func.uuid_generate_v4()
-    )
+    session_id = Column(String(50), primary_key=True, default=generate_id("session"))
     user_id = Column(String(50), ForeignKey("users.user_id", ondelete="CASCADE"))
     created_at = Column(TIMESTAMP, server_default=func.now())
     expires_at = Column(TIMESTAMP)
 
-    user = relationship("User", back_populates="sessions", lazy="selectin")
+    user = relationship("User", back_populates="sessions", lazy="raise")
 
     @property
     def is_expired(self) -> bool:
@@ -3,11 +3,10 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user, verify_admin
-from app.core.security import get_password_hash
+from app.core.database import get_db, get_db_pool_stats, get_redis_pool_stats
+from app.core.dependencies import verify_admin, verify_token
+from app.core.security import get_password_hash, password_hasher
 from app.models.follow import Follow
-from app.models.user import User
 from app.schemas.user import AdminUserCreate, AdminUserResponse, UserResponse
 from app.services.admin_service import AdminService
 
@@ -42,14 +41,14 @@ async def delete_comment(comment_id: str, db: AsyncSession = Depends(get_db)):
 
 @router.get("/users", response_model=List[AdminUserResponse])
 async def get_all_users(
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
 ):
     """Get all users (Admin only)"""
     admin_service = AdminService(db)
-    users = await admin_service.get_all_users(current_user.user_id, skip, limit)
+    users = await admin_service.get_all_users(current_user_id, skip, limit)
 
     # Format response with full user information
     return [
@@ -61,8 +60,8 @@ async def get_all_users(
             bio=user.bio,
             profile_picture_url=user.profile_picture_url,
             created_at=user.created_at,
-            followers_count=len(user.followers),
-            following_count=len(user.following),
+            followers_count=user.followers_count,
+            following_count=user.following_count,
             is_following=False,
             is_followed_by=False,
             is_admin=user.is_admin,
@@ -110,3 +109,21 @@ async def create_user(user_data: AdminUserCreate, db: AsyncSession = Depends(get
         "is_admin": user.is_admin,
         "is_banned": user.is_banned,
     }
+
+
+@router.get("/metrics/db-pool")
+async def get_db_pool_metrics():
+    """Connections in use, overflow and checkout waits of the DB pool (Admin only)"""
+    return get_db_pool_stats()
+
+
+@router.get("/metrics/password-hashing")
+async def get_password_hashing_metrics():
+    """Queue depth and timings of the bcrypt thread pool (Admin only)"""
+    return password_hasher.snapshot()
+
+
+@router.get("/metrics/redis-pool")
+async def get_redis_pool_metrics():
+    """Utilization of the shared Redis connection pool (Admin only)"""
+    return get_redis_pool_stats()
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 
 from dotenv import load_dotenv
 from fastapi import APIRouter, Body, Cookie, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,8 +13,11 @@ from app.core.dependencies import verify_token
 from app.core.security import (
     create_access_token,
     create_refresh_token,
+    decode_access_token,
     decode_refresh_token,
-    verify_password,
+    http_bearer,
+    revoke_token,
+    verify_and_update_password,
 )
 from app.schemas.auth import (
     RegisterResponse,
@@ -74,12 +78,26 @@ async def signin(
 
     # Kiểm tra email và password
     user_db = await auth_service.get_user_by_email(user.email)
-    if not user_db or not verify_password(user.password, user_db.password):
+    if not user_db:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
+    is_valid, new_hash = await verify_and_update_password(
+        user.password, user_db.password
+    )
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+        )
+
+    # Hash dùng cost cũ, cập nhật lại với cost hiện tại
+    if new_hash:
+        user_db.password = new_hash
+        await db.commit()
+
     # Kiểm tra user có bị banned không
     if user_db.is_banned:
         raise HTTPException(
@@ -150,7 +168,7 @@ async def refresh_token(
 
     auth_service = AuthService(db)
 
-    payload = decode_refresh_token(refresh_token)
+    payload = await decode_refresh_token(refresh_token)
     if not payload or not payload.get("user_id"):
         raise HTTPException(
             status_code=401,
@@ -193,12 +211,22 @@ async def refresh_token(
 async def logout(
     response: Response,
     user_id: str = Depends(verify_token),
+    token: HTTPAuthorizationCredentials = Depends(http_bearer),
     session_id: str = Cookie(None),
+    refresh_token: str = Cookie(None),
     db: AsyncSession = Depends(get_db),
     redis: Redis = Depends(get_redis),
 ):
     session_service = SessionService(db)
 
+    # Revoke the tokens so they stop working before they expire
+    await revoke_token(await decode_access_token(token.credentials))
+    if refresh_token:
+        try:
+            await revoke_token(await decode_refresh_token(refresh_token))
+        except HTTPException:
+            pass
+
     # Delete session if exists
     if session_id:
         await session_service.delete_session(session_id)
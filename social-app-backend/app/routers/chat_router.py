@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 from redis.asyncio import Redis
@@ -6,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, get_redis
 from app.core.dependencies import verify_token
+from app.core.read_replicas import get_read_db
 from app.schemas.chat import (
     ConversationCreate,
     ConversationMessagesResponse,
@@ -35,7 +37,7 @@ async def create_conversation(
 @router.get("/conversations", response_model=ConversationsResponse)
 async def get_conversations(
     user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     redis: Redis = Depends(get_redis),
 ):
     chat_service = ChatService(db, redis)
@@ -61,13 +63,14 @@ async def get_conversation_messages(
     conversation_id: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
     redis: Redis = Depends(get_redis),
 ):
     chat_service = ChatService(db, redis)
     return await chat_service.get_conversation_messages(
-        conversation_id, user_id, limit, offset
+        conversation_id, user_id, limit, offset, cursor
     )
 
 
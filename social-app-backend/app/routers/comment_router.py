@@ -1,11 +1,12 @@
 import logging
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user, verify_token
-from app.models.user import User
+from app.core.dependencies import verify_token
+from app.core.sql_budget import sql_budget
 from app.schemas.comment import (
     CommentCreate,
     CommentListResponse,
@@ -16,35 +17,62 @@ from app.schemas.comment import (
 from app.services.comment_service import CommentService
 from app.services.post_notification_service import PostNotificationService
 from app.services.post_service import PostService
+from app.services.user_service import UserService
+from app.utils.pagination import encode_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _build_comment_page(comments, total_count, page: int, limit: int, cursor):
+    next_cursor = (
+        encode_cursor(comments[-1]["created_at"], comments[-1]["comment_id"])
+        if len(comments) == limit
+        else None
+    )
+
+    if cursor:
+        return CommentListResponse(
+            comments=comments, has_more=next_cursor is not None, next_cursor=next_cursor
+        )
+
+    total_pages = (total_count + limit - 1) // limit
+
+    return CommentListResponse(
+        comments=comments,
+        total_count=total_count,
+        page=page,
+        total_pages=total_pages,
+        has_more=page < total_pages,
+        next_cursor=next_cursor,
+    )
+
+
 @router.post("", response_model=CommentResponse)
 async def create_comment(
     comment_data: CommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new comment"""
     comment_service = CommentService(db)
     try:
         comment = await comment_service.create_comment(
-            user_id=current_user.user_id,
+            user_id=current_user_id,
             comment_data=comment_data,
         )
 
         # Gửi thông báo cho chủ post
         post = await PostService(db).get_post_by_id(
-            comment_data.post_id, current_user.user_id
+            comment_data.post_id, current_user_id
         )
+        current_user = await UserService(db).get_user_by_id(current_user_id)
         notification_service = PostNotificationService(db)
         await notification_service.notify_new_comment(
             post_id=comment_data.post_id,
             post_author_id=post["user_id"],
-            commenter_id=current_user.user_id,
+            commenter_id=current_user_id,
             commenter_name=current_user.username,
             comment_content=comment_data.content,
         )
@@ -61,55 +89,41 @@ async def create_comment(
 @router.get(
     "/post/{post_id}",
     response_model=CommentListResponse,
-    dependencies=[Depends(verify_token)],
+    dependencies=[Depends(verify_token), Depends(sql_budget(4))],
 )
 async def get_post_comments(
     post_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
     comment_service = CommentService(db)
     comments, total_count = await comment_service.get_post_comments(
-        post_id, page, limit
+        post_id, page, limit, cursor
     )
 
-    total_pages = (total_count + limit - 1) // limit
-
-    return CommentListResponse(
-        comments=comments,
-        total_count=total_count,
-        page=page,
-        total_pages=total_pages,
-        has_more=page < total_pages,
-    )
+    return _build_comment_page(comments, total_count, page, limit, cursor)
 
 
 @router.get(
     "/{comment_id}/replies",
     response_model=CommentListResponse,
-    dependencies=[Depends(verify_token)],
+    dependencies=[Depends(verify_token), Depends(sql_budget(4))],
 )
 async def get_comment_replies(
     comment_id: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
     comment_service = CommentService(db)
     replies, total_count = await comment_service.get_comment_replies(
-        comment_id, page, limit
+        comment_id, page, limit, cursor
     )
 
-    total_pages = (total_count + limit - 1) // limit
-
-    return CommentListResponse(
-        comments=replies,
-        total_count=total_count,
-        page=page,
-        total_pages=total_pages,
-        has_more=page < total_pages,
-    )
+    return _build_comment_page(replies, total_count, page, limit, cursor)
 
 
 @router.put("/{comment_id}", response_model=CommentResponse)
@@ -139,7 +153,7 @@ async def delete_comment(
 @router.get(
     "/{comment_id}",
     response_model=CommentResponse,
-    dependencies=[Depends(verify_token)],
+    dependencies=[Depends(verify_token), Depends(sql_budget(3))],
 )
 async def get_comment_by_id(
     comment_id: str,
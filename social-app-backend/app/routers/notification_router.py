@@ -1,10 +1,11 @@
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.dependencies import verify_token
+from app.core.read_replicas import get_read_db
 from app.schemas.notification import (
     DeviceTokenCreate,
     DeviceTokenResponse,
@@ -70,8 +71,9 @@ async def get_notifications(
     page: int = 1,
     size: int = 20,
     is_report: bool = None,
+    cursor: Optional[str] = None,
     user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Lấy danh sách thông báo của user với phân trang.
@@ -79,10 +81,11 @@ async def get_notifications(
     - **page**: Số trang (bắt đầu từ 1)
     - **size**: Số lượng item mỗi trang
     - **is_report**: Lọc thông báo theo type REPORT (True) hoặc không phải REPORT (False)
+    - **cursor**: Giá trị `next_cursor` của trang trước, dùng thay cho `page`
     """
     notification_service = NotificationService(db)
     return await notification_service.get_notifications(
-        user_id=user_id, page=page, size=size, is_report=is_report
+        user_id=user_id, page=page, size=size, is_report=is_report, cursor=cursor
     )
 
 
@@ -106,7 +109,7 @@ async def mark_as_read(
 
 @router.get("/counts", response_model=NotificationCount)
 async def get_notification_counts(
-    user_id: str = Depends(verify_token), db: AsyncSession = Depends(get_db)
+    user_id: str = Depends(verify_token), db: AsyncSession = Depends(get_read_db)
 ):
     """Lấy số lượng thông báo và số chưa đọc"""
     notification_service = NotificationService(db)
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Optional
 
 from fastapi import (
     APIRouter,
@@ -11,21 +11,51 @@ from fastapi import (
     UploadFile,
     status,
 )
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user, verify_token
-from app.models.user import User
+from app.core.database import get_db, get_redis
+from app.core.dependencies import verify_token
+from app.core.read_replicas import get_read_db
+from app.core.sql_budget import sql_budget
 from app.schemas.like import LikeResponse
 from app.schemas.post import PostCreateResponse, PostDetailResponse, PostListResponse
 from app.services.like_service import LikeService
 from app.services.post_notification_service import PostNotificationService
 from app.services.post_service import PostService
+from app.services.user_service import UserService
+from app.utils.pagination import encode_cursor
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _build_post_page(posts, total_count, page: int, limit: int, cursor):
+    next_cursor = (
+        encode_cursor(posts[-1]["created_at"], posts[-1]["post_id"])
+        if len(posts) == limit
+        else None
+    )
+
+    if cursor:
+        return {
+            "posts": posts,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+        }
+
+    total_pages = (total_count + limit - 1) // limit
+
+    return {
+        "posts": posts,
+        "page": page,
+        "total_pages": total_pages,
+        "total_posts": total_count,
+        "has_more": page < total_pages,
+        "next_cursor": next_cursor,
+    }
+
+
 # @router.get("", response_model=PostListResponse)
 # async def get_posts(
 #     db: AsyncSession = Depends(get_db),
@@ -50,28 +80,28 @@ router = APIRouter()
 #     }
 
 
-@router.get("/feed", response_model=PostListResponse)
+@router.get(
+    "/feed",
+    response_model=PostListResponse,
+    dependencies=[Depends(sql_budget(6))],
+)
 async def get_feed_posts(
     user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
 ):
     """
-    Get paginated list of posts from friends and self for homepage feed
+    Get paginated list of posts from friends and self for homepage feed.
+    Pass `next_cursor` from the previous response as `cursor` to scroll
+    without page numbers.
     """
-    post_service = PostService(db)
-    posts, total_count = await post_service.get_feed_posts(user_id, page, limit)
+    post_service = PostService(db, redis)
+    posts, total_count = await post_service.get_feed_posts(user_id, page, limit, cursor)
 
-    total_pages = (total_count + limit - 1) // limit
-
-    return {
-        "posts": posts,
-        "page": page,
-        "total_pages": total_pages,
-        "total_posts": total_count,
-        "has_more": page < total_pages,
-    }
+    return _build_post_page(posts, total_count, page, limit, cursor)
 
 
 @router.post(
@@ -81,13 +111,14 @@ async def create_post(
     content: str = Form(...),
     files: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
     user_id: str = Depends(verify_token),
 ):
     """
     Create a new post with text content and optional images
     """
     try:
-        post_service = PostService(db)
+        post_service = PostService(db, redis)
         new_post = await post_service.create_post(content, user_id, files)
         logger.info(f"Post created: {new_post.post_id}")
 
@@ -115,13 +146,18 @@ async def create_post(
         )
 
 
-@router.get("/user/{target_user_id}", response_model=PostListResponse)
+@router.get(
+    "/user/{target_user_id}",
+    response_model=PostListResponse,
+    dependencies=[Depends(sql_budget(5))],
+)
 async def get_user_posts(
     target_user_id: str,
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
 ):
     post_service = PostService(db)
     posts, total_count = await post_service.get_user_posts(
@@ -129,27 +165,20 @@ async def get_user_posts(
         current_user_id=current_user_id,
         page=page,
         limit=limit,
+        cursor=cursor,
     )
 
-    total_pages = (total_count + limit - 1) // limit
-
-    return {
-        "posts": posts,
-        "page": page,
-        "total_pages": total_pages,
-        "total_posts": total_count,
-        "has_more": page < total_pages,
-    }
+    return _build_post_page(posts, total_count, page, limit, cursor)
 
 
 @router.get(
     "/{post_id}",
     response_model=PostDetailResponse,
-    dependencies=[Depends(verify_token)],
+    dependencies=[Depends(verify_token), Depends(sql_budget(4))],
 )
 async def get_post_detail(
     post_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user_id: str = Depends(verify_token),
 ):
     """
@@ -170,12 +199,13 @@ async def get_post_detail(
 async def delete_post(
     post_id: str,
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
     user_id: str = Depends(verify_token),
 ):
     """
     Delete a post (only by post owner)
     """
-    post_service = PostService(db)
+    post_service = PostService(db, redis)
     deleted_post = await post_service.delete_post(post_id, user_id)
 
     if not deleted_post:
@@ -191,23 +221,22 @@ async def delete_post(
 @router.post("/{post_id}/like", response_model=LikeResponse)
 async def toggle_like_post(
     post_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
 ):
     """Toggle like/unlike a post"""
     like_service = LikeService(db)
     try:
-        is_liked, likes_count = await like_service.toggle_like(
-            current_user.user_id, post_id
-        )
+        is_liked, likes_count = await like_service.toggle_like(current_user_id, post_id)
 
         if is_liked:  # Only notify when liking, not unliking
-            post = await PostService(db).get_post_by_id(post_id, current_user.user_id)
+            post = await PostService(db).get_post_by_id(post_id, current_user_id)
+            current_user = await UserService(db).get_user_by_id(current_user_id)
             notification_service = PostNotificationService(db)
             await notification_service.notify_post_like(
                 post_id=post_id,
                 post_author_id=post["user_id"],
-                liker_id=current_user.user_id,
+                liker_id=current_user_id,
                 liker_name=current_user.username,
             )
 
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user, verify_admin
+from app.core.dependencies import verify_admin, verify_token
 from app.models.report import ReportStatus
 from app.schemas.report import ReportCreate, ReportResponse, ReportUpdate
 from app.services.report_service import ReportService
@@ -15,12 +15,12 @@ router = APIRouter(prefix="/reports", tags=["reports"])
 @router.post("", response_model=ReportResponse)
 async def create_report(
     report_data: ReportCreate,
-    current_user=Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new report"""
     report_service = ReportService(db)
-    return await report_service.create_report(current_user.user_id, report_data.dict())
+    return await report_service.create_report(current_user_id, report_data.dict())
 
 
 @router.get("", response_model=List[ReportResponse])
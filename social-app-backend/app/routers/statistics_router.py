@@ -4,8 +4,8 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
 from app.core.dependencies import verify_admin
+from app.core.read_replicas import get_read_db
 from app.schemas.statistics import (
     DashboardStats,
     InteractionStats,
@@ -28,7 +28,7 @@ router = APIRouter(
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_statistics(
-    days: Optional[int] = 30, db: AsyncSession = Depends(get_db)
+    days: Optional[int] = 30, db: AsyncSession = Depends(get_read_db)
 ):
     """Get dashboard statistics"""
     stats_service = StatisticsService(db)
@@ -62,7 +62,9 @@ async def get_dashboard_statistics(
 
 
 @router.get("/users/growth", response_model=List[UserGrowthStats])
-async def get_user_growth(days: Optional[int] = 30, db: AsyncSession = Depends(get_db)):
+async def get_user_growth(
+    days: Optional[int] = 30, db: AsyncSession = Depends(get_read_db)
+):
     """Get user growth statistics"""
     stats_service = StatisticsService(db)
     result = await stats_service.get_user_growth_stats(days)
@@ -74,7 +76,7 @@ async def get_user_growth(days: Optional[int] = 30, db: AsyncSession = Depends(g
 
 @router.get("/posts/activity", response_model=List[PostStats])
 async def get_post_activity(
-    days: Optional[int] = 30, db: AsyncSession = Depends(get_db)
+    days: Optional[int] = 30, db: AsyncSession = Depends(get_read_db)
 ):
     """Get post activity statistics"""
     stats_service = StatisticsService(db)
@@ -87,7 +89,7 @@ async def get_post_activity(
 
 @router.get("/interactions", response_model=List[InteractionStats])
 async def get_interaction_statistics(
-    days: Optional[int] = 30, db: AsyncSession = Depends(get_db)
+    days: Optional[int] = 30, db: AsyncSession = Depends(get_read_db)
 ):
     """Get interaction statistics"""
     stats_service = StatisticsService(db)
@@ -99,21 +101,21 @@ async def get_interaction_statistics(
 
 
 @router.get("/users/details", response_model=UserDetailStats)
-async def get_user_details(db: AsyncSession = Depends(get_db)):
+async def get_user_details(db: AsyncSession = Depends(get_read_db)):
     """Get detailed user statistics"""
     stats_service = StatisticsService(db)
     return await stats_service.get_user_detail_stats()
 
 
 @router.get("/posts/details", response_model=PostDetailStats)
-async def get_post_details(db: AsyncSession = Depends(get_db)):
+async def get_post_details(db: AsyncSession = Depends(get_read_db)):
     """Get detailed post statistics"""
     stats_service = StatisticsService(db)
     return await stats_service.get_post_detail_stats()
 
 
 @router.get("/messages/details", response_model=MessageDetailStats)
-async def get_message_details(db: AsyncSession = Depends(get_db)):
+async def get_message_details(db: AsyncSession = Depends(get_read_db)):
     """Get detailed message statistics"""
     stats_service = StatisticsService(db)
     return await stats_service.get_message_detail_stats()
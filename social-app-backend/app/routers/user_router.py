@@ -16,7 +16,8 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, get_redis
-from app.core.dependencies import get_current_user, verify_token
+from app.core.dependencies import verify_token
+from app.core.read_replicas import get_read_db
 from app.core.security import get_password_hash, verify_password
 from app.models.follow import Follow
 from app.models.user import User
@@ -24,12 +25,14 @@ from app.schemas.user import (
     CurrentUserResponse,
     PasswordChange,
     SuggestedUsersResponse,
+    TypeaheadResponse,
     UserListItem,
     UserListResponse,
     UserResponse,
     UserUpdate,
 )
 from app.services.follow_notification_service import FollowNotificationService
+from app.services.timeline_service import TimelineService
 from app.services.user_service import UserService
 from app.services.user_status_service import UserStatusService
 from app.utils.cloudinary_helper import upload_profile_image, upload_single_post_image
@@ -38,35 +41,63 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _build_user_list(
+    user_service: UserService, viewer_id: str, users: List[User]
+) -> List[UserListItem]:
+    """Attach the viewer's follow state to a page of users"""
+    states = await user_service.get_follow_states(
+        viewer_id, [user.user_id for user in users]
+    )
+    return [
+        UserListItem(
+            user_id=user.user_id,
+            username=user.username,
+            full_name=user.full_name,
+            profile_picture_url=user.profile_picture_url,
+            **states[user.user_id],
+        )
+        for user in users
+    ]
+
+
 @router.get("/search", response_model=UserListResponse)
 async def search_users(
     query: str,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Search for users by username or full name"""
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     offset = (page - 1) * limit
 
-    users, total_count = await user_service.search_users(
+    users, has_more = await user_service.search_users(
         query, current_user_id, offset, limit
     )
 
-    user_list = []
-    for user in users:
-        is_following = await user_service.get_follow(current_user_id, user.user_id)
-        user_list.append(
-            UserListItem(
-                user_id=user.user_id,
-                username=user.username,
-                full_name=user.full_name,
-                profile_picture_url=user.profile_picture_url,
-                is_following=bool(is_following),
-            )
-        )
-    return UserListResponse(users=user_list, total_count=total_count)
+    user_list = await _build_user_list(user_service, current_user_id, users)
+    # Lower bound only, counting every match would cost another index scan
+    return UserListResponse(
+        users=user_list,
+        total_count=offset + len(user_list) + int(has_more),
+        has_more=has_more,
+    )
+
+
+@router.get("/typeahead", response_model=TypeaheadResponse)
+async def typeahead_users(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=20),
+    current_user_id: str = Depends(verify_token),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+):
+    """Suggest users while a name is being typed"""
+    user_service = UserService(db, redis)
+    users = await user_service.typeahead_users(q, current_user_id, limit)
+    return TypeaheadResponse(users=users)
 
 
 @router.get("/me", response_model=CurrentUserResponse)
@@ -93,8 +124,8 @@ async def get_current_user_profile(
         bio=user.bio,
         profile_picture_url=user.profile_picture_url,
         created_at=user.created_at,
-        followers_count=len(user.followers),
-        following_count=len(user.following),
+        followers_count=user.followers_count,
+        following_count=user.following_count,
     )
 
 
@@ -128,8 +159,8 @@ async def update_profile_picture(
             bio=updated_user.bio,
             profile_picture_url=updated_user.profile_picture_url,
             created_at=updated_user.created_at,
-            followers_count=len(updated_user.followers),
-            following_count=len(updated_user.following),
+            followers_count=updated_user.followers_count,
+            following_count=updated_user.following_count,
         )
 
     except Exception as e:
@@ -164,8 +195,8 @@ async def update_user_profile(
             bio=updated_user.bio,
             profile_picture_url=updated_user.profile_picture_url,
             created_at=updated_user.created_at,
-            followers_count=len(updated_user.followers),
-            following_count=len(updated_user.following),
+            followers_count=updated_user.followers_count,
+            following_count=updated_user.following_count,
         )
 
     except Exception as e:
@@ -180,7 +211,7 @@ async def update_user_profile(
 async def get_suggested_users(
     limit: int = Query(5, ge=1, le=20),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get suggested users to follow"""
     user_service = UserService(db)
@@ -192,7 +223,7 @@ async def get_suggested_users(
 async def get_user_profile(
     user_id: str,
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get user profile by user_id"""
     user_service = UserService(db)
@@ -212,8 +243,8 @@ async def get_user_profile(
         bio=user.bio,
         profile_picture_url=user.profile_picture_url,
         created_at=user.created_at,
-        followers_count=len(user.followers),
-        following_count=len(user.following),
+        followers_count=user.followers_count,
+        following_count=user.following_count,
         is_following=follow_status["is_following"],
         is_followed_by=follow_status["is_followed_by"],
     )
@@ -222,14 +253,15 @@ async def get_user_profile(
 @router.post("/{user_id}/toggle-follow")
 async def toggle_follow(
     user_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Toggle follow/unfollow a user"""
-    if user_id == current_user.user_id:
+    if user_id == current_user_id:
         raise HTTPException(status_code=400, detail="You cannot follow yourself")
 
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     follow_notification_service = FollowNotificationService(db)
 
     # Check if target user exists
@@ -238,7 +270,7 @@ async def toggle_follow(
         raise HTTPException(status_code=404, detail="User not found")
 
     # Get current user info for notification
-    current_user = await user_service.get_user_by_id(current_user.user_id)
+    current_user = await user_service.get_user_by_id(current_user_id)
     if not current_user:
         raise HTTPException(status_code=404, detail="Current user not found")
 
@@ -262,6 +294,9 @@ async def toggle_follow(
         )
         message = "Successfully followed user"
 
+    # The follower's materialized feed no longer matches their follow graph
+    await TimelineService(db, redis).invalidate(current_user.user_id)
+
     return {"message": message, "target_user_id": user_id}
 
 
@@ -271,30 +306,17 @@ async def get_followers(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Get user's followers"""
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     offset = (page - 1) * limit
 
     followers, total_count = await user_service.get_followers(user_id, offset, limit)
 
     # Format response
-    user_list = []
-    for follower in followers:
-        is_following = (
-            await user_service.get_follow(current_user_id, follower.user_id) is not None
-        )
-
-        user_list.append(
-            UserListItem(
-                user_id=follower.user_id,
-                username=follower.username,
-                full_name=follower.full_name,
-                profile_picture_url=follower.profile_picture_url,
-                is_following=is_following,
-            )
-        )
+    user_list = await _build_user_list(user_service, current_user_id, followers)
 
     return UserListResponse(users=user_list, total_count=total_count)
 
@@ -305,26 +327,16 @@ async def get_following(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Get list of users that the specified user is following"""
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     offset = (page - 1) * limit
 
     following, total_count = await user_service.get_following(user_id, offset, limit)
 
-    user_list = []
-    for user in following:
-        is_following = await user_service.get_follow(current_user_id, user.user_id)
-        user_list.append(
-            UserListItem(
-                user_id=user.user_id,
-                username=user.username,
-                full_name=user.full_name,
-                profile_picture_url=user.profile_picture_url,
-                is_following=bool(is_following),
-            )
-        )
+    user_list = await _build_user_list(user_service, current_user_id, following)
 
     return UserListResponse(users=user_list, total_count=total_count)
 
@@ -335,28 +347,18 @@ async def get_mutual_followers(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
 ):
     """Get mutual followers between current user and target user"""
-    user_service = UserService(db)
+    user_service = UserService(db, redis)
     offset = (page - 1) * limit
 
     mutual_followers, total_count = await user_service.get_mutual_followers(
         current_user_id, user_id, offset, limit
     )
 
-    user_list = []
-    for user in mutual_followers:
-        is_following = await user_service.get_follow(current_user_id, user.user_id)
-        user_list.append(
-            UserListItem(
-                user_id=user.user_id,
-                username=user.username,
-                full_name=user.full_name,
-                profile_picture_url=user.profile_picture_url,
-                is_following=bool(is_following),
-            )
-        )
+    user_list = await _build_user_list(user_service, current_user_id, mutual_followers)
 
     return UserListResponse(users=user_list, total_count=total_count)
 
@@ -367,7 +369,7 @@ async def get_user_activity(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     current_user_id: str = Depends(verify_token),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get user's recent activity"""
     if user_id != current_user_id:
@@ -388,22 +390,25 @@ async def get_user_activity(
 @router.put("/me/password")
 async def change_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(verify_token),
     db: AsyncSession = Depends(get_db),
 ):
     """Change user password"""
+    user_service = UserService(db)
+    current_user = await user_service.get_user_by_id(current_user_id)
+    if not current_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.password):
+    if not await verify_password(password_data.old_password, current_user.password):
         logger.warning(f"Invalid old password attempt for user {current_user.user_id}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid old password"
         )
 
     try:
-        user_service = UserService(db)
-
         # Update password
-        current_user.password = get_password_hash(password_data.new_password)
+        current_user.password = await get_password_hash(password_data.new_password)
         await user_service.update_password(current_user)
 
         logger.info(f"Password changed successfully for user {current_user.user_id}")
@@ -1,14 +1,13 @@
 import logging
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
-from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from app.core.database import get_db, get_redis
+from app.core.database import SessionLocal, get_redis_client
 from app.core.security import decode_access_token
 from app.core.websocket import manager
 from app.schemas.chat import MessageCreate
 from app.services.chat_service import ChatService
+from app.services.presence_service import PresenceService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -18,29 +17,28 @@ router = APIRouter()
 async def test_websocket(websocket: WebSocket):
     try:
         await websocket.accept()
-        print("Connection accepted")
+        logger.info("Connection accepted")
         await websocket.send_text("Connected to test socket")
         await websocket.close()
     except Exception as e:
-        print(f"WebSocket error: {str(e)}")
+        logger.error(f"WebSocket error: {str(e)}")
         raise
 
 
 @router.websocket("/ws/{token}")
-async def websocket_endpoint(
-    websocket: WebSocket,
-    token: str,
-    db: AsyncSession = Depends(get_db),
-    redis: Redis = Depends(get_redis),
-):
+async def websocket_endpoint(websocket: WebSocket, token: str):
+    # No session is held between frames, an idle socket must not pin
+    # a pool connection
+    redis = get_redis_client()
     try:
         # Verify token
-        payload = decode_access_token(token)
+        payload = await decode_access_token(token)
         user_id = payload["user_id"]
 
         # Connect to WebSocket
-        await manager.connect(websocket, user_id)
-        chat_service = ChatService(db, redis)
+        async with SessionLocal() as db:
+            contact_ids = await PresenceService(db, redis).get_contact_ids(user_id)
+        await manager.connect(websocket, user_id, contact_ids)
 
         try:
             while True:
@@ -62,7 +60,10 @@ async def websocket_endpoint(
                         content=data["content"],
                         message_type=data["message_type"],
                     )
-                    message = await chat_service.create_message(user_id, message_data)
+                    async with SessionLocal() as db:
+                        message = await ChatService(db, redis).create_message(
+                            user_id, message_data
+                        )
 
                     # Broadcast to conversation participants
                     await manager.broadcast_to_conversation(
@@ -102,7 +103,10 @@ async def websocket_endpoint(
 
                 elif data["type"] == "read_messages":
                     conversation_id = data["conversation_id"]
-                    await chat_service.mark_messages_as_read(user_id, conversation_id)
+                    async with SessionLocal() as db:
+                        await ChatService(db, redis).mark_messages_as_read(
+                            user_id, conversation_id
+                        )
 
                     # Broadcast read status
                     await manager.broadcast_to_conversation(
@@ -117,9 +121,10 @@ async def websocket_endpoint(
                     )
 
         except WebSocketDisconnect:
+            pass
+        finally:
             await manager.disconnect(websocket, user_id)
 
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
-        print(f"WebSocket error: {str(e)}")
         await websocket.close()
@@ -127,7 +127,7 @@ class ConversationInfo(BaseModel):
 
 
 class PaginationInfo(BaseModel):
-    total_messages: int
+    total_messages: Optional[int] = None
     limit: int
     offset: int
     has_more: bool
@@ -42,7 +42,8 @@ class CommentWithReplies(CommentResponse):
 
 class CommentListResponse(BaseModel):
     comments: List[CommentResponse]
-    total_count: int
-    page: int
-    total_pages: int
+    total_count: Optional[int] = None
+    page: Optional[int] = None
+    total_pages: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
@@ -55,10 +55,11 @@ class NotificationCount(BaseModel):
 
 class PaginatedNotifications(BaseModel):
     items: List[NotificationResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class NotificationType(str, Enum):
@@ -35,7 +35,8 @@ class PostDetailResponse(PostBase):
 
 class PostListResponse(BaseModel):
     posts: List[PostBase]
-    page: int
-    total_pages: int
-    total_posts: int
+    page: Optional[int] = None
+    total_pages: Optional[int] = None
+    total_posts: Optional[int] = None  # Không tính khi phân trang bằng cursor
     has_more: bool
+    next_cursor: Optional[str] = None
@@ -48,11 +48,26 @@ class UserListItem(BaseModel):
     full_name: Optional[str]
     profile_picture_url: Optional[str]
     is_following: bool
+    is_followed_by: bool = False
 
 
 class UserListResponse(BaseModel):
     users: List[UserListItem]
     total_count: int
+    has_more: bool = False
+
+
+# Schema cho gợi ý tìm kiếm (typeahead)
+class TypeaheadUser(BaseModel):
+    user_id: str
+    username: str
+    full_name: Optional[str]
+    profile_picture_url: Optional[str]
+    is_following: bool = False
+
+
+class TypeaheadResponse(BaseModel):
+    users: List[TypeaheadUser]
 
 
 class AdminUserCreate(BaseModel):
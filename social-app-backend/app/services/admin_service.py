@@ -1,10 +1,11 @@
 from typing import List
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.core.auth_cache import auth_state_cache
 from app.core.security import get_password_hash
 from app.models.comment import Comment
 from app.models.follow import Follow
@@ -12,6 +13,7 @@ from app.models.notification import Notification
 from app.models.notification_recipient import NotificationRecipient
 from app.models.post import Post
 from app.models.user import User
+from app.services.user_search_index import user_search_index
 
 
 class AdminService:
@@ -40,9 +42,12 @@ class AdminService:
                 delete(Notification).where(Notification.sender_id == user_id)
             )
 
-            # Delete the user (this will cascade delete other related records)
+            # Delete the user (this will cascade delete other related records).
+            # Counters of other users/posts are fixed by the reconciliation task
             await self.db.delete(user)
             await self.db.commit()
+            await auth_state_cache.invalidate(user_id)
+            await user_search_index.remove(user_id)
 
         except Exception as e:
             await self.db.rollback()
@@ -60,6 +65,11 @@ class AdminService:
             )
 
         await self.db.delete(post)
+        await self.db.execute(
+            update(User)
+            .where(User.user_id == post.user_id)
+            .values(posts_count=User.posts_count - 1)
+        )
         await self.db.commit()
 
     async def delete_comment(self, comment_id: str):
@@ -70,7 +80,19 @@ class AdminService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
             )
 
+        # Replies are removed together with the comment
+        replies_count = await self.db.scalar(
+            select(func.count(Comment.comment_id)).where(
+                Comment.parent_id == comment_id
+            )
+        )
+
         await self.db.delete(comment)
+        await self.db.execute(
+            update(Post)
+            .where(Post.post_id == comment.post_id)
+            .values(comments_count=Post.comments_count - (replies_count + 1))
+        )
         await self.db.commit()
 
     async def get_all_users(
@@ -97,6 +119,7 @@ class AdminService:
         user.is_banned = True
         await self.db.commit()
         await self.db.refresh(user)
+        await auth_state_cache.invalidate(user_id)
 
     async def unban_user(self, user_id: str):
         """Unban a user"""
@@ -109,6 +132,7 @@ class AdminService:
         user.is_banned = False
         await self.db.commit()
         await self.db.refresh(user)
+        await auth_state_cache.invalidate(user_id)
 
     async def create_user(self, user_data: dict):
         """Create a new user without OTP verification"""
@@ -126,7 +150,7 @@ class AdminService:
         new_user = User(
             username=user_data["username"],
             email=user_data["email"],
-            password=get_password_hash(user_data["password"]),
+            password=await get_password_hash(user_data["password"]),
             full_name=user_data.get("full_name", ""),
             is_admin=user_data.get("is_admin", False),
         )
@@ -134,4 +158,5 @@ class AdminService:
         self.db.add(new_user)
         await self.db.commit()
         await self.db.refresh(new_user)
+        await user_search_index.add(new_user)
         return new_user
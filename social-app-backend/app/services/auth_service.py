@@ -12,6 +12,7 @@ from app.core.email_config import mail_config
 from app.core.security import get_password_hash
 from app.models import User
 from app.schemas.auth import UserCreate
+from app.services.user_search_index import user_search_index
 
 
 class AuthService:
@@ -39,11 +40,12 @@ class AuthService:
         db_user = User(
             username=user_data.username,
             email=user_data.email,
-            password=get_password_hash(user_data.password),
+            password=await get_password_hash(user_data.password),
         )
         self.db.add(db_user)
         await self.db.commit()
         await self.db.refresh(db_user)
+        await user_search_index.add(db_user)
         return db_user
 
     # Các methods cần redis
@@ -1,15 +1,20 @@
-from typing import List
+import json
+import logging
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException
 from redis.asyncio import Redis
-from sqlalchemy import and_, case, func, or_, select
+from redis.exceptions import WatchError
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased
 
+from app.core.settings import get_settings
 from app.models.conversation import Conversation
 from app.models.deleted_conversation import DeletedConversation
 from app.models.message import Message
-from app.models.message_status import MessageStatus
 from app.models.participant import Participant, ParticipantType
 from app.models.user import User
 from app.schemas.chat import (
@@ -26,7 +31,13 @@ from app.schemas.chat import (
     ParticipantInfo,
     ParticipantResponse,
 )
+from app.services.presence_service import PresenceService
 from app.services.user_status_service import UserStatusService
+from app.utils.pagination import encode_cursor, keyset_condition
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
 
 
 class ChatService:
@@ -34,6 +45,12 @@ class ChatService:
         self.db = db
         self.redis = redis
         self.user_status_service = UserStatusService(redis)
+        self.recent_messages_key_prefix = "chat:recent:"
+        self.recent_version_key_prefix = "chat:recent-version:"
+        self.recent_messages_size = settings.CHAT_RECENT_MESSAGES_SIZE
+        self.recent_messages_expiry = timedelta(
+            seconds=settings.CHAT_RECENT_MESSAGES_TTL
+        )
 
     async def create_conversation(
         self, creator_id: str, conversation_data: ConversationCreate
@@ -95,133 +112,114 @@ class ChatService:
             self.db.add(participant)
 
         await self.db.commit()
+        await PresenceService(self.db, self.redis).invalidate(creator_id, other_user_id)
         return conversation
 
     async def get_user_conversations(
         self, user_id: str
     ) -> List[ConversationListResponse]:
-        # Get latest message for each conversation using window function
-        latest_messages_subquery = select(
-            Message.conversation_id,
-            Message.message_id,
-            Message.content,
-            Message.created_at,
-            Message.sender_id,
-            Message.message_type,
-            func.row_number()
-            .over(
-                partition_by=Message.conversation_id, order_by=Message.created_at.desc()
+        latest_message = aliased(Message)
+
+        # Messages from others newer than the user's read watermark, or than
+        # the conversation itself if the user never read it. Served by the
+        # (conversation_id, created_at) index on the partitions past that point
+        unread_count = (
+            select(func.count(Message.message_id))
+            .where(
+                Message.conversation_id == Conversation.conversation_id,
+                Message.sender_id != user_id,
+                Message.created_at
+                > func.coalesce(Participant.last_read_at, Conversation.created_at),
             )
-            .label("rn"),
-        ).subquery()
+            .correlate(Conversation, Participant)
+            .scalar_subquery()
+            .label("unread_count")
+        )
 
-        # Main query
         query = (
-            select(
-                Conversation,
-                latest_messages_subquery.c.message_id,
-                latest_messages_subquery.c.content,
-                latest_messages_subquery.c.message_type,
-                latest_messages_subquery.c.sender_id,
-                latest_messages_subquery.c.created_at.label("message_created_at"),
-                func.count(
-                    case(
-                        (
-                            and_(
-                                Message.sender_id != user_id,
-                                or_(
-                                    MessageStatus.is_read.is_(False),
-                                    MessageStatus.is_read.is_(None),
-                                ),
-                            ),
-                            1,
-                        )
-                    )
-                ).label("unread_count"),
-            )
+            select(Conversation, latest_message, unread_count)
             .join(
                 Participant, Conversation.conversation_id == Participant.conversation_id
             )
             .outerjoin(
-                latest_messages_subquery,
+                latest_message,
                 and_(
-                    Conversation.conversation_id
-                    == latest_messages_subquery.c.conversation_id,
-                    latest_messages_subquery.c.rn == 1,
-                ),
-            )
-            .outerjoin(Message, Conversation.conversation_id == Message.conversation_id)
-            .outerjoin(
-                MessageStatus,
-                and_(
-                    Message.message_id == MessageStatus.message_id,
-                    MessageStatus.user_id == user_id,
+                    latest_message.message_id == Conversation.last_message_id,
+                    # Partition key of the latest message
+                    latest_message.created_at == Conversation.last_message_at,
                 ),
             )
             .filter(Participant.user_id == user_id, Conversation.deleted_at.is_(None))
-            .group_by(
-                Conversation.conversation_id,
-                latest_messages_subquery.c.message_id,
-                latest_messages_subquery.c.content,
-                latest_messages_subquery.c.message_type,
-                latest_messages_subquery.c.sender_id,
-                latest_messages_subquery.c.created_at,
+            .order_by(
+                Conversation.last_message_at.desc().nulls_last(),
+                Conversation.created_at.desc(),
             )
-            .order_by(latest_messages_subquery.c.created_at.desc())
         )
 
         result = await self.db.execute(query)
         conversations = result.all()
 
-        # Get participants info including online status
-
-        response_conversations = []
-        for conv in conversations:
-            # Get participants
+        # Participants of every listed conversation in one query
+        conversation_ids = [conv.Conversation.conversation_id for conv in conversations]
+        participants_by_conversation = {
+            conversation_id: [] for conversation_id in conversation_ids
+        }
+        if conversation_ids:
             participants_query = (
-                select(User)
-                .join(Participant, User.user_id == Participant.user_id)
-                .filter(
-                    Participant.conversation_id == conv.Conversation.conversation_id
-                )
+                select(Participant.conversation_id, User)
+                .join(User, User.user_id == Participant.user_id)
+                .filter(Participant.conversation_id.in_(conversation_ids))
             )
-            participants = (await self.db.execute(participants_query)).scalars().all()
-
-            # Get online status for each participant
-            participant_responses = []
-            for p in participants:
-                is_online = await self.user_status_service.is_user_online(p.user_id)
-                participant_responses.append(
-                    ParticipantResponse(
-                        user_id=p.user_id,
-                        username=p.username,
-                        full_name=p.full_name,
-                        profile_picture_url=p.profile_picture_url,
-                        is_online=is_online,
-                    )
+            for conversation_id, user in (
+                await self.db.execute(participants_query)
+            ).all():
+                participants_by_conversation[conversation_id].append(user)
+
+        # Presence of all participants in one round trip
+        online_statuses = await self.user_status_service.get_online_statuses(
+            list(
+                {
+                    user.user_id
+                    for users in participants_by_conversation.values()
+                    for user in users
+                }
+            )
+        )
+
+        response_conversations = []
+        for conversation, message, unread in conversations:
+            participant_responses = [
+                ParticipantResponse(
+                    user_id=p.user_id,
+                    username=p.username,
+                    full_name=p.full_name,
+                    profile_picture_url=p.profile_picture_url,
+                    is_online=online_statuses.get(p.user_id, False),
                 )
+                for p in participants_by_conversation[conversation.conversation_id]
+            ]
 
             response_conversations.append(
                 ConversationListResponse(
-                    conversation_id=conv.Conversation.conversation_id,
-                    title=conv.Conversation.title,
-                    creator_id=conv.Conversation.creator_id,
-                    created_at=conv.Conversation.created_at,
-                    updated_at=conv.Conversation.updated_at,
+                    conversation_id=conversation.conversation_id,
+                    title=conversation.title,
+                    creator_id=conversation.creator_id,
+                    created_at=conversation.created_at,
+                    updated_at=conversation.updated_at,
                     participants=participant_responses,
                     latest_message=(
                         LatestMessage(
-                            message_id=conv.message_id,
-                            content=conv.content,
-                            message_type=conv.message_type,
-                            sender_id=conv.sender_id,
-                            created_at=conv.message_created_at,
-                            is_read=True if conv.unread_count == 0 else False,
+                            message_id=message.message_id,
+                            content=message.content,
+                            message_type=message.message_type,
+                            sender_id=message.sender_id,
+                            created_at=message.created_at,
+                            is_read=unread == 0,
                         )
-                        if conv.message_id
+                        if message
                         else None
                     ),
-                    unread_count=conv.unread_count,
+                    unread_count=unread,
                 )
             )
 
@@ -254,169 +252,285 @@ class ChatService:
         )
 
         self.db.add(message)
+        await self.db.flush()
+
+        # Move the conversation pointer, the sender has read their own message
+        await self.db.execute(
+            update(Conversation)
+            .where(Conversation.conversation_id == message.conversation_id)
+            .values(
+                last_message_id=message.message_id,
+                last_message_at=message.created_at,
+            )
+        )
+        await self.db.execute(
+            update(Participant)
+            .where(
+                Participant.conversation_id == message.conversation_id,
+                Participant.user_id == sender_id,
+            )
+            .values(
+                last_read_message_id=message.message_id,
+                last_read_at=message.created_at,
+            )
+        )
+
         await self.db.commit()
+
+        try:
+            await self._cache_new_message(message)
+        except Exception as e:
+            logger.error(f"Error caching message {message.message_id}: {str(e)}")
+            # Drop the cached page rather than serve it without this message
+            with suppress(Exception):
+                await self.redis.delete(
+                    self._recent_messages_key(message.conversation_id)
+                )
+
         return message
 
-    async def get_conversation_messages(
-        self, conversation_id: str, user_id: str, limit: int = 50, offset: int = 0
-    ) -> ConversationMessagesResponse:
-        # Verify user is participant
-        query = select(Participant).filter(
-            Participant.conversation_id == conversation_id,
-            Participant.user_id == user_id,
-        )
-        result = await self.db.execute(query)
-        participant = result.scalar_one_or_none()
+    def _recent_messages_key(self, conversation_id: str) -> str:
+        return f"{self.recent_messages_key_prefix}{conversation_id}"
 
-        if not participant:
-            raise HTTPException(
-                status_code=403, detail="User is not a participant in this conversation"
-            )
+    def _recent_version_key(self, conversation_id: str) -> str:
+        return f"{self.recent_version_key_prefix}{conversation_id}"
 
-        # Get conversation info with participants
-        conv_query = (
-            select(Conversation)
-            .options(joinedload(Conversation.participants).joinedload(Participant.user))
-            .filter(Conversation.conversation_id == conversation_id)
-        )
-        result = await self.db.execute(conv_query)
-        conversation = result.unique().scalar_one()
+    @staticmethod
+    def _serialize_message(message: Message) -> dict:
+        return {
+            "message_id": message.message_id,
+            "sender_id": message.sender_id,
+            "content": message.content,
+            "message_type": getattr(
+                message.message_type, "value", message.message_type
+            ),
+            "created_at": message.created_at.isoformat(),
+            "updated_at": message.updated_at.isoformat(),
+        }
 
-        # Get participants info including online status and last seen
-        participants_info = []
-        for p in conversation.participants:
-            is_online = await self.user_status_service.is_user_online(p.user.user_id)
+    @staticmethod
+    def _deserialize_message(data: dict) -> dict:
+        return {
+            **data,
+            "created_at": datetime.fromisoformat(data["created_at"]),
+            "updated_at": datetime.fromisoformat(data["updated_at"]),
+        }
 
-            # Get last read message time for this participant
-            last_seen_query = (
-                select(MessageStatus.read_at)
+    async def _cache_new_message(self, message: Message) -> None:
+        """Write-through: prepend to the recent list if it is cached.
+
+        Bumping the version aborts a fill that read the database before
+        this message was committed.
+        """
+        key = self._recent_messages_key(message.conversation_id)
+        version_key = self._recent_version_key(message.conversation_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpushx(key, json.dumps(self._serialize_message(message)))
+            pipe.ltrim(key, 0, self.recent_messages_size)
+            pipe.incr(version_key)
+            pipe.expire(version_key, self.recent_messages_expiry)
+            await pipe.execute()
+
+    async def _get_recent_messages(
+        self, conversation_id: str, since: datetime
+    ) -> List[dict]:
+        """Newest messages first, at most ``recent_messages_size + 1`` of them.
+
+        The extra message tells whether older history exists. ``since`` is
+        the conversation's creation time, no message can be older.
+        """
+        key = self._recent_messages_key(conversation_id)
+        cached = await self.redis.lrange(key, 0, -1)
+        if cached:
+            return [self._deserialize_message(json.loads(item)) for item in cached]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # A message sent from here on aborts the fill, its lpushx was
+            # a no-op while the list is missing
+            await pipe.watch(self._recent_version_key(conversation_id))
+            result = await self.db.execute(
+                select(Message)
                 .filter(
-                    MessageStatus.user_id == p.user.user_id,
-                    MessageStatus.is_read == True,
+                    Message.conversation_id == conversation_id,
+                    Message.created_at >= since,
                 )
-                .order_by(MessageStatus.read_at.desc())
-                .limit(1)
+                .order_by(Message.created_at.desc(), Message.message_id.desc())
+                .limit(self.recent_messages_size + 1)
             )
-            last_seen_result = await self.db.execute(last_seen_query)
-            last_seen = last_seen_result.scalar_one_or_none()
-
-            participants_info.append(
-                ParticipantInfo(
-                    user_id=p.user.user_id,
-                    username=p.user.username,
-                    full_name=p.user.full_name,
-                    profile_picture_url=p.user.profile_picture_url,
-                    is_online=is_online,
-                    last_seen=last_seen,
-                    role=p.type.value,
-                )
+            serialized = [self._serialize_message(m) for m in result.scalars().all()]
+
+            if serialized:
+                pipe.multi()
+                pipe.delete(key)
+                pipe.rpush(key, *[json.dumps(item) for item in serialized])
+                pipe.expire(key, self.recent_messages_expiry)
+                try:
+                    await pipe.execute()
+                except WatchError:
+                    # The next read fills it
+                    pass
+
+        return [self._deserialize_message(item) for item in serialized]
+
+    async def _get_messages_page(
+        self,
+        conversation_id: str,
+        since: datetime,
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+    ) -> Tuple[List[dict], bool, Optional[int]]:
+        """One page of messages (newest first), has_more and the total if known.
+
+        Months before ``since``, the conversation's creation, are pruned.
+        """
+        # Opening a chat is served from the recent messages cache
+        if not cursor and offset == 0 and limit <= self.recent_messages_size:
+            recent = await self._get_recent_messages(conversation_id, since)
+            total_messages = (
+                len(recent) if len(recent) <= self.recent_messages_size else None
             )
-            # Get total message count
-            count_query = select(func.count(Message.message_id)).filter(
-                Message.conversation_id == conversation_id
+            return recent[:limit], len(recent) > limit, total_messages
+
+        # Keyset/offset page over the (conversation_id, created_at) index
+        messages_query = (
+            select(Message)
+            .filter(
+                Message.conversation_id == conversation_id,
+                Message.created_at >= since,
             )
-            total_count = await self.db.execute(count_query)
-            total_messages = total_count.scalar()
-
-            # Get messages with pagination and related data
-            messages_query = (
-                select(Message, User, MessageStatus)
-                .join(User, Message.sender_id == User.user_id)
-                .outerjoin(
-                    MessageStatus,
-                    and_(
-                        Message.message_id == MessageStatus.message_id,
-                        MessageStatus.user_id == user_id,
-                    ),
-                )
-                .filter(Message.conversation_id == conversation_id)
-                .order_by(Message.created_at.desc())
-                .offset(offset)
-                .limit(limit)
+            .order_by(Message.created_at.desc(), Message.message_id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            messages_query = messages_query.filter(
+                keyset_condition(Message.created_at, Message.message_id, cursor)
             )
+        else:
+            messages_query = messages_query.offset(offset)
+
+        result = await self.db.execute(messages_query)
+        messages = [
+            self._deserialize_message(self._serialize_message(m))
+            for m in result.scalars().all()
+        ]
 
-            result = await self.db.execute(messages_query)
-            messages_data = result.all()
-
-            # Process messages
-            detailed_messages = []
-            for message, user, status in messages_data:
-                # Get seen_by information for each message
-                seen_by_query = (
-                    select(MessageStatus, User)
-                    .join(User, MessageStatus.user_id == User.user_id)
-                    .filter(
-                        MessageStatus.message_id == message.message_id,
-                        MessageStatus.is_read == True,
-                    )
+        # Total message count (skipped for cursor pages)
+        total_messages = None
+        if not cursor:
+            total_messages = await self.db.scalar(
+                select(func.count(Message.message_id)).filter(
+                    Message.conversation_id == conversation_id,
+                    Message.created_at >= since,
                 )
-                seen_by_result = await self.db.execute(seen_by_query)
-                seen_by_data = seen_by_result.all()
+            )
 
-                seen_by = [
-                    {"user_id": user.user_id, "seen_at": status.read_at}
-                    for status, user in seen_by_data
-                ]
+        # The extra row only tells whether another page exists
+        return messages[:limit], len(messages) > limit, total_messages
 
-                message_status = MessageDeliveryStatus(
-                    sent=True, delivered=True, seen_by=seen_by
-                )
+    async def get_conversation_messages(
+        self,
+        conversation_id: str,
+        user_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> ConversationMessagesResponse:
+        # Conversation metadata only, never its message history
+        conversation = await self.db.scalar(
+            select(Conversation).filter(Conversation.conversation_id == conversation_id)
+        )
+        if not conversation:
+            raise HTTPException(status_code=404, detail="Conversation not found")
 
-                detailed_message = DetailedMessageResponse(
-                    message_id=message.message_id,
-                    sender_id=message.sender_id,
-                    content=message.content,
-                    message_type=message.message_type,
-                    media_url=(
-                        message.media_url if hasattr(message, "media_url") else None
-                    ),
-                    thumbnail_url=(
-                        message.thumbnail_url
-                        if hasattr(message, "thumbnail_url")
-                        else None
-                    ),
-                    created_at=message.created_at,
-                    updated_at=message.updated_at,
-                    deleted_at=(
-                        message.deleted_at if hasattr(message, "deleted_at") else None
-                    ),
-                    edited=message.edited if hasattr(message, "edited") else False,
-                    status=message_status,
-                )
-                detailed_messages.append(detailed_message)
+        # Participants with their user info, membership is checked in memory
+        result = await self.db.execute(
+            select(Participant, User)
+            .join(User, User.user_id == Participant.user_id)
+            .filter(Participant.conversation_id == conversation_id)
+        )
+        participants = result.all()
 
-            # Calculate pagination info
-            has_more = total_messages > (offset + limit)
-            next_cursor = str(messages_data[-1][0].message_id) if has_more else None
+        current_participant = next(
+            (p for p, _ in participants if p.user_id == user_id), None
+        )
+        if not current_participant:
+            raise HTTPException(
+                status_code=403, detail="User is not a participant in this conversation"
+            )
 
-            # Get conversation type
-            conv_type = (
-                ConversationType.GROUP
-                if len(participants_info) > 2
-                else ConversationType.PRIVATE
+        online_statuses = await self.user_status_service.get_online_statuses(
+            [user.user_id for _, user in participants]
+        )
+        participants_info = [
+            ParticipantInfo(
+                user_id=user.user_id,
+                username=user.username,
+                full_name=user.full_name,
+                profile_picture_url=user.profile_picture_url,
+                is_online=online_statuses.get(user.user_id, False),
+                # The read watermark is the last time this participant caught up
+                last_seen=p.last_read_at,
+                role=p.type.value,
             )
+            for p, user in participants
+        ]
 
-            return ConversationMessagesResponse(
-                conversation_info=ConversationInfo(
-                    conversation_id=conversation.conversation_id,
-                    title=conversation.title,
-                    type=conv_type,
-                    created_at=conversation.created_at,
-                    participants=participants_info,
-                ),
-                messages=detailed_messages,
-                pagination=PaginationInfo(
-                    total_messages=total_messages,
-                    limit=limit,
-                    offset=offset,
-                    has_more=has_more,
-                    next_cursor=next_cursor,
-                ),
-                meta={
-                    "last_read_message_id": None  # You can implement this based on your needs
-                },
+        messages, has_more, total_messages = await self._get_messages_page(
+            conversation_id, conversation.created_at, limit, offset, cursor
+        )
+
+        detailed_messages = []
+        for message in messages:
+            # Seen by every other participant whose watermark is past it
+            seen_by = [
+                {"user_id": reader.user_id, "seen_at": reader.last_read_at}
+                for reader, _ in participants
+                if reader.user_id != message["sender_id"]
+                and reader.last_read_at is not None
+                and reader.last_read_at >= message["created_at"]
+            ]
+
+            detailed_messages.append(
+                DetailedMessageResponse(
+                    **message,
+                    status=MessageDeliveryStatus(
+                        sent=True, delivered=True, seen_by=seen_by
+                    ),
+                )
             )
 
+        next_cursor = (
+            encode_cursor(messages[-1]["created_at"], messages[-1]["message_id"])
+            if has_more
+            else None
+        )
+
+        conv_type = (
+            ConversationType.GROUP
+            if len(participants_info) > 2
+            else ConversationType.PRIVATE
+        )
+
+        return ConversationMessagesResponse(
+            conversation_info=ConversationInfo(
+                conversation_id=conversation.conversation_id,
+                title=conversation.title,
+                type=conv_type,
+                created_at=conversation.created_at,
+                participants=participants_info,
+            ),
+            messages=detailed_messages,
+            pagination=PaginationInfo(
+                total_messages=total_messages,
+                limit=limit,
+                offset=offset,
+                has_more=has_more,
+                next_cursor=next_cursor,
+            ),
+            meta={"last_read_message_id": current_participant.last_read_message_id},
+        )
+
     async def delete_conversation(self, user_id: str, conversation_id: str) -> None:
         # Verify user is participant
         query = select(Participant).filter(
@@ -458,33 +572,36 @@ class ChatService:
         return conversation
 
     async def mark_messages_as_read(self, user_id: str, conversation_id: str) -> None:
-        # Get unread messages
-        query = (
-            select(Message)
-            .outerjoin(
-                MessageStatus,
-                and_(
-                    Message.message_id == MessageStatus.message_id,
-                    MessageStatus.user_id == user_id,
-                ),
+        """Move the reader's watermark to the newest message in one statement"""
+        in_conversation = Conversation.conversation_id == conversation_id
+        result = await self.db.execute(
+            update(Participant)
+            .where(
+                Participant.conversation_id == conversation_id,
+                Participant.user_id == user_id,
             )
-            .filter(
-                Message.conversation_id == conversation_id,
-                Message.sender_id != user_id,
-                or_(MessageStatus.is_read.is_(False), MessageStatus.is_read.is_(None)),
+            .values(
+                # Both columns point at the newest message, unchanged if none
+                last_read_message_id=func.coalesce(
+                    select(Conversation.last_message_id)
+                    .where(in_conversation)
+                    .scalar_subquery(),
+                    Participant.last_read_message_id,
+                ),
+                last_read_at=func.coalesce(
+                    select(Conversation.last_message_at)
+                    .where(in_conversation)
+                    .scalar_subquery(),
+                    Participant.last_read_at,
+                ),
             )
+            .returning(Participant.participant_id)
         )
-        result = await self.db.execute(query)
-        unread_messages = result.scalars().all()
 
-        # Mark messages as read
-        for message in unread_messages:
-            status = MessageStatus(
-                message_id=message.message_id,
-                user_id=user_id,
-                is_read=True,
-                read_at=func.now(),
+        if result.scalar_one_or_none() is None:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=403, detail="User is not a participant in this conversation"
             )
-            self.db.add(status)
 
         await self.db.commit()
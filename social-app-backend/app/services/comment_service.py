@@ -1,22 +1,32 @@
 from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload
 
 from app.models.comment import Comment
 from app.models.post import Post
 from app.schemas.comment import CommentCreate
+from app.utils.pagination import keyset_condition
 
 
 class CommentService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_comment(
-        self, user_id: str, comment_data: CommentCreate
-    ) -> Comment:
+    def _select_comments(self):
+        """Base query for comments with author and number of replies"""
+        reply = aliased(Comment)
+        replies_count = (
+            select(func.count(reply.comment_id))
+            .where(reply.parent_id == Comment.comment_id)
+            .scalar_subquery()
+            .label("replies_count")
+        )
+        return select(Comment, replies_count).options(joinedload(Comment.user))
+
+    async def create_comment(self, user_id: str, comment_data: CommentCreate) -> dict:
         # Verify post exists
         post = await self.db.get(Post, comment_data.post_id)
         if not post:
@@ -50,78 +60,104 @@ class CommentService:
             parent_id=comment_data.parent_id,
         )
         self.db.add(comment)
+        await self.db.execute(
+            update(Post)
+            .where(Post.post_id == comment_data.post_id)
+            .values(comments_count=Post.comments_count + 1)
+        )
         await self.db.commit()
-        await self.db.refresh(comment)
-        return comment
+        return await self.get_comment_by_id(comment.comment_id)
 
     async def get_post_comments(
-        self, post_id: str, page: int = 1, limit: int = 20
-    ) -> Tuple[List[dict], int]:
+        self, post_id: str, page: int = 1, limit: int = 20, cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[int]]:
         # Get only top-level comments (no parent_id)
         offset = (page - 1) * limit
 
-        # Get total count
-        total_count = await self.db.scalar(
-            select(func.count(Comment.comment_id))
-            .where(Comment.post_id == post_id)
-            .where(Comment.parent_id.is_(None))
-        )
-
         # Get comments with user info and replies
         stmt = (
-            select(Comment)
-            .options(joinedload(Comment.user), joinedload(Comment.replies))
+            self._select_comments()
             .where(Comment.post_id == post_id)
             .where(Comment.parent_id.is_(None))
-            .order_by(Comment.created_at.desc())
-            .offset(offset)
+            .order_by(Comment.created_at.desc(), Comment.comment_id.desc())
             .limit(limit)
         )
 
+        if cursor:
+            stmt = stmt.where(
+                keyset_condition(Comment.created_at, Comment.comment_id, cursor)
+            )
+        else:
+            stmt = stmt.offset(offset)
+
         result = await self.db.execute(stmt)
-        comments = result.unique().scalars().all()
 
         # Format comments
-        formatted_comments = [self._format_comment(comment) for comment in comments]
+        formatted_comments = [
+            self._format_comment(comment, replies_count)
+            for comment, replies_count in result.all()
+        ]
+
+        if cursor:
+            return formatted_comments, None
+
+        # Get total count
+        total_count = await self.db.scalar(
+            select(func.count(Comment.comment_id))
+            .where(Comment.post_id == post_id)
+            .where(Comment.parent_id.is_(None))
+        )
 
         return formatted_comments, total_count
 
     async def get_comment_replies(
-        self, comment_id: str, page: int = 1, limit: int = 20
-    ) -> Tuple[List[dict], int]:
+        self,
+        comment_id: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[int]]:
         offset = (page - 1) * limit
 
-        # Get total count of replies
-        total_count = await self.db.scalar(
-            select(func.count(Comment.comment_id)).where(
-                Comment.parent_id == comment_id
-            )
-        )
-
         # Get replies with user info and parent info
         stmt = (
-            select(Comment)
-            .options(
-                joinedload(Comment.user),
-                joinedload(Comment.replies),  # Thêm joinedload cho replies
-            )
+            self._select_comments()
             .where(Comment.parent_id == comment_id)
-            .order_by(Comment.created_at)
-            .offset(offset)
+            .order_by(Comment.created_at, Comment.comment_id)
             .limit(limit)
         )
 
+        # Replies are shown oldest first
+        if cursor:
+            stmt = stmt.where(
+                keyset_condition(
+                    Comment.created_at, Comment.comment_id, cursor, descending=False
+                )
+            )
+        else:
+            stmt = stmt.offset(offset)
+
         result = await self.db.execute(stmt)
-        replies = result.unique().scalars().all()
 
         # Format replies
-        formatted_replies = [self._format_comment(reply) for reply in replies]
+        formatted_replies = [
+            self._format_comment(reply, replies_count)
+            for reply, replies_count in result.all()
+        ]
+
+        if cursor:
+            return formatted_replies, None
+
+        # Get total count of replies
+        total_count = await self.db.scalar(
+            select(func.count(Comment.comment_id)).where(
+                Comment.parent_id == comment_id
+            )
+        )
 
         return formatted_replies, total_count
 
-    async def update_comment(
-        self, comment_id: str, user_id: str, content: str
-    ) -> Comment:
+    async def update_comment(self, comment_id: str, user_id: str, content: str) -> dict:
         comment = await self.db.get(Comment, comment_id)
         if not comment:
             raise HTTPException(
@@ -136,8 +172,7 @@ class CommentService:
 
         comment.content = content
         await self.db.commit()
-        await self.db.refresh(comment)
-        return comment
+        return await self.get_comment_by_id(comment_id)
 
     async def delete_comment(self, comment_id: str, user_id: str):
         comment = await self.db.get(Comment, comment_id)
@@ -160,10 +195,27 @@ class CommentService:
                 detail="Not authorized to delete this comment",
             )
 
+        # Replies are removed together with the comment
+        deleted_count = await self.count_comment_with_replies(comment_id)
+
         await self.db.delete(comment)
+        await self.db.execute(
+            update(Post)
+            .where(Post.post_id == comment.post_id)
+            .values(comments_count=Post.comments_count - deleted_count)
+        )
         await self.db.commit()
 
-    def _format_comment(self, comment: Comment) -> dict:
+    async def count_comment_with_replies(self, comment_id: str) -> int:
+        """Number of rows removed when deleting a comment"""
+        replies_count = await self.db.scalar(
+            select(func.count(Comment.comment_id)).where(
+                Comment.parent_id == comment_id
+            )
+        )
+        return replies_count + 1
+
+    def _format_comment(self, comment: Comment, replies_count: int) -> dict:
         return {
             "comment_id": comment.comment_id,
             "post_id": comment.post_id,
@@ -171,7 +223,7 @@ class CommentService:
             "created_at": comment.created_at,
             "updated_at": comment.updated_at,
             "parent_id": comment.parent_id,
-            "replies_count": len(comment.replies) if comment.replies else 0,
+            "replies_count": replies_count,
             "user": {
                 "user_id": comment.user.user_id,
                 "username": comment.user.username,
@@ -181,18 +233,15 @@ class CommentService:
 
     async def get_comment_by_id(self, comment_id: str) -> dict:
         """Get a specific comment by its ID"""
-        stmt = (
-            select(Comment)
-            .options(joinedload(Comment.user), joinedload(Comment.replies))
-            .where(Comment.comment_id == comment_id)
-        )
+        stmt = self._select_comments().where(Comment.comment_id == comment_id)
 
         result = await self.db.execute(stmt)
-        comment = result.unique().scalar_one_or_none()
+        comment_data = result.first()
 
-        if not comment:
+        if not comment_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found"
             )
 
-        return self._format_comment(comment)
+        comment, replies_count = comment_data
+        return self._format_comment(comment, replies_count)
@@ -1,7 +1,7 @@
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Like
+from app.models import Like, Post
 
 
 class LikeService:
@@ -26,11 +26,14 @@ class LikeService:
             self.db.add(new_like)
             is_liked = True
 
-        await self.db.commit()
-
-        # Get updated likes count
+        # Update the stored counter in the same transaction
         likes_count = await self.db.scalar(
-            select(func.count(Like.like_id)).where(Like.post_id == post_id)
+            update(Post)
+            .where(Post.post_id == post_id)
+            .values(likes_count=Post.likes_count + (1 if is_liked else -1))
+            .returning(Post.likes_count)
         )
 
+        await self.db.commit()
+
         return is_liked, likes_count
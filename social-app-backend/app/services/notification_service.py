@@ -7,6 +7,7 @@ from typing import List, Optional
 from sqlalchemy import and_, func, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.partitions import created_at_window
 from app.models.device_token import DeviceToken
 from app.models.notification import Notification
 from app.models.notification_recipient import NotificationRecipient
@@ -16,6 +17,7 @@ from app.tasks.notification_tasks import (
     create_notification_task,
     send_push_notification_task,
 )
+from app.utils.pagination import encode_cursor, keyset_condition
 
 logger = logging.getLogger(__name__)
 
@@ -82,34 +84,18 @@ class NotificationService:
             raise
 
     async def get_notifications(
-        self, user_id: str, page: int = 1, size: int = 20, is_report: bool = None
+        self,
+        user_id: str,
+        page: int = 1,
+        size: int = 20,
+        is_report: bool = None,
+        cursor: Optional[str] = None,
     ) -> dict:
-        """Lấy danh sách thông báo của user với phân trang"""
-        try:
-            # Base query
-            base_query = select(NotificationRecipient).where(
-                NotificationRecipient.recipient_id == user_id
-            )
-
-            # Add report filter if specified
-            if is_report is not None:
-                if is_report:
-                    base_query = base_query.join(Notification).where(
-                        Notification.type == "REPORT"
-                    )
-                else:
-                    base_query = base_query.join(Notification).where(
-                        Notification.type != "REPORT"
-                    )
-
-            # Get total count
-            total = await self.db.scalar(
-                select(func.count()).select_from(base_query.subquery())
-            )
-
-            offset = (page - 1) * size
-            total_pages = ceil(total / size)
+        """Lấy danh sách thông báo của user với phân trang.
 
+        Có cursor thì phân trang theo keyset và bỏ qua việc đếm tổng số.
+        """
+        try:
             # Get notifications with sender info
             query = (
                 select(
@@ -121,8 +107,11 @@ class NotificationService:
                 .select_from(NotificationRecipient)
                 .join(
                     Notification,
-                    Notification.notification_id
-                    == NotificationRecipient.notification_id,
+                    and_(
+                        Notification.notification_id
+                        == NotificationRecipient.notification_id,
+                        Notification.created_at == NotificationRecipient.created_at,
+                    ),
                 )
                 .outerjoin(User, User.user_id == Notification.sender_id)
                 .where(NotificationRecipient.recipient_id == user_id)
@@ -135,12 +124,23 @@ class NotificationService:
                 else:
                     query = query.where(Notification.type != "REPORT")
 
-            # Add ordering and pagination
-            query = (
-                query.order_by(Notification.created_at.desc())
-                .offset(offset)
-                .limit(size)
-            )
+            # Add ordering and pagination. Recipient rows share the
+            # notification's created_at, seeking on them prunes both tables
+            query = query.order_by(
+                NotificationRecipient.created_at.desc(),
+                NotificationRecipient.notification_id.desc(),
+            ).limit(size)
+
+            if cursor:
+                query = query.where(
+                    keyset_condition(
+                        NotificationRecipient.created_at,
+                        NotificationRecipient.notification_id,
+                        cursor,
+                    )
+                )
+            else:
+                query = query.offset((page - 1) * size)
 
             result = await self.db.execute(query)
             notifications = result.all()
@@ -161,12 +161,43 @@ class NotificationService:
                 for notif, is_read, read_at, profile_picture_url in notifications
             ]
 
+            next_cursor = (
+                encode_cursor(items[-1]["created_at"], items[-1]["notification_id"])
+                if len(items) == size
+                else None
+            )
+
+            if cursor:
+                return {"items": items, "size": size, "next_cursor": next_cursor}
+
+            # Base query
+            base_query = select(NotificationRecipient).where(
+                NotificationRecipient.recipient_id == user_id
+            )
+
+            # Add report filter if specified
+            if is_report is not None:
+                if is_report:
+                    base_query = base_query.join(Notification).where(
+                        Notification.type == "REPORT"
+                    )
+                else:
+                    base_query = base_query.join(Notification).where(
+                        Notification.type != "REPORT"
+                    )
+
+            # Get total count
+            total = await self.db.scalar(
+                select(func.count()).select_from(base_query.subquery())
+            )
+
             return {
                 "items": items,
                 "total": total,
                 "page": page,
                 "size": size,
-                "pages": total_pages,
+                "pages": ceil(total / size),
+                "next_cursor": next_cursor,
             }
         except Exception as e:
             logger.error(f"Error getting notifications: {str(e)}")
@@ -181,6 +212,9 @@ class NotificationService:
                     NotificationRecipient.notification_id == notification_id,
                     NotificationRecipient.recipient_id == user_id,
                     NotificationRecipient.is_read == False,
+                    *created_at_window(
+                        NotificationRecipient.created_at, notification_id
+                    ),
                 )
             )
             .values(is_read=True, read_at=func.now())
@@ -280,6 +314,7 @@ class NotificationService:
     ) -> Optional[Notification]:
         """Tìm thông báo gần nhất của cùng loại"""
         try:
+            since = func.now() - text(f"interval '{minutes} minutes'")
             query = (
                 select(Notification)
                 .join(NotificationRecipient)
@@ -288,8 +323,8 @@ class NotificationService:
                         Notification.type == notification_type,
                         NotificationRecipient.recipient_id == recipient_id,
                         Notification.data.like(f'%"post_id": "{reference_id}"%'),
-                        Notification.created_at
-                        >= func.now() - text(f"interval '{minutes} minutes'"),
+                        Notification.created_at >= since,
+                        NotificationRecipient.created_at >= since,
                     )
                 )
                 .order_by(Notification.created_at.desc())
@@ -309,7 +344,12 @@ class NotificationService:
     ) -> None:
         """Cập nhật thông báo gom nhóm"""
         try:
-            notification = await self.db.get(Notification, notification_id)
+            notification = await self.db.scalar(
+                select(Notification).where(
+                    Notification.notification_id == notification_id,
+                    *created_at_window(Notification.created_at, notification_id),
+                )
+            )
             if not notification:
                 return
 
@@ -1,30 +1,47 @@
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, UploadFile, status
-from sqlalchemy import delete, func, or_, select
+from redis.asyncio import Redis
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.follow import Follow
 from app.models.like import Like
 from app.models.post import Post
 from app.models.post_image import PostImage
+from app.models.user import User
+from app.services.timeline_service import TimelineService
+from app.tasks.timeline_tasks import fan_out_post_task
 from app.utils.cloudinary_helper import (
     delete_post_images_from_cloudinary,
     upload_multiple_images,
 )
+from app.utils.pagination import keyset_condition
 
 logger = logging.getLogger(__name__)
 
 
 class PostService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, redis: Redis = None):
         self.db = db
+        self.redis = redis
+        self.timeline_service = TimelineService(db, redis) if redis else None
+
+    def _select_posts(self, user_id: str):
+        """Base query for posts with author, images and the viewer's like state"""
+        is_liked = (
+            select(Like.like_id)
+            .where(Like.post_id == Post.post_id, Like.user_id == user_id)
+            .exists()
+            .label("is_liked_by_me")
+        )
+        return select(Post, is_liked).options(
+            joinedload(Post.user), selectinload(Post.post_images)
+        )
 
-    async def _format_post(
-        self, post: Post, likes_count: int, is_liked: bool
-    ) -> Dict[str, Any]:
+    async def _format_post(self, post: Post, is_liked: bool) -> Dict[str, Any]:
         """Helper method to format post data consistently"""
         return {
             "post_id": post.post_id,
@@ -34,8 +51,8 @@ class PostService:
             "image_urls": [image.image_url for image in post.post_images],
             "user_username": post.user.username,
             "user_profile_picture_url": post.user.profile_picture_url,
-            "comments_count": len(post.comments),
-            "likes_count": likes_count,
+            "comments_count": post.comments_count,
+            "likes_count": post.likes_count,
             "is_liked_by_me": is_liked,
         }
 
@@ -46,18 +63,7 @@ class PostService:
 
         # Optimized query with all needed information in one go
         stmt = (
-            select(
-                Post,
-                func.count(Like.like_id).label("likes_count"),
-                func.bool_or(Like.user_id == user_id).label("is_liked_by_me"),
-            )
-            .outerjoin(Like)
-            .options(
-                joinedload(Post.user),
-                joinedload(Post.post_images),
-                joinedload(Post.comments),
-            )
-            .group_by(Post.post_id)
+            self._select_posts(user_id)
             .order_by(Post.created_at.desc())
             .offset(offset)
             .limit(limit)
@@ -68,8 +74,7 @@ class PostService:
 
         # Format posts using helper method
         formatted_posts = [
-            await self._format_post(post, likes_count, is_liked)
-            for post, likes_count, is_liked in posts_data
+            await self._format_post(post, is_liked) for post, is_liked in posts_data
         ]
 
         # Get total count
@@ -78,10 +83,75 @@ class PostService:
         return formatted_posts, total_count
 
     async def get_feed_posts(
-        self, user_id: str, page: int = 1, limit: int = 10
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        self,
+        user_id: str,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get feed posts by page number or, when ``cursor`` is given, by keyset.
+
+        Cursor pages skip the exact total count and return ``None`` instead.
+        """
         offset = (page - 1) * limit
 
+        if self.timeline_service and (
+            cursor or self.timeline_service.can_serve(offset, limit)
+        ):
+            try:
+                posts, total_count = await self._get_feed_posts_from_timeline(
+                    user_id, offset, limit, cursor
+                )
+                # Capped timeline exhausted, older posts only exist in the DB
+                if not (
+                    cursor
+                    and len(posts) < limit
+                    and total_count >= self.timeline_service.max_length
+                ):
+                    return posts, None if cursor else total_count
+            except Exception as e:
+                logger.error(f"Error reading timeline, falling back to DB: {str(e)}")
+
+        return await self._get_feed_posts_from_db(user_id, offset, limit, cursor)
+
+    async def _get_feed_posts_from_timeline(
+        self, user_id: str, offset: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Read a feed page from the materialized timeline"""
+        post_ids, total_count = await self.timeline_service.get_page(
+            user_id, offset, limit, cursor
+        )
+        formatted_posts = await self._get_posts_by_ids(post_ids, user_id)
+
+        # Posts deleted since fan-out are dropped from the timeline lazily
+        found_ids = {post["post_id"] for post in formatted_posts}
+        stale_ids = [post_id for post_id in post_ids if post_id not in found_ids]
+        if stale_ids:
+            await self.timeline_service.discard(user_id, stale_ids)
+            total_count -= len(stale_ids)
+
+        return formatted_posts, total_count
+
+    async def _get_posts_by_ids(
+        self, post_ids: List[str], user_id: str
+    ) -> List[Dict[str, Any]]:
+        """Load posts by ID, keeping the order of ``post_ids``"""
+        if not post_ids:
+            return []
+
+        stmt = self._select_posts(user_id).where(Post.post_id.in_(post_ids))
+
+        result = await self.db.execute(stmt)
+        posts_by_id = {
+            post.post_id: await self._format_post(post, is_liked)
+            for post, is_liked in result.unique().all()
+        }
+
+        return [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+
+    async def _get_feed_posts_from_db(
+        self, user_id: str, offset: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         # Get following users' IDs
         following_subquery = select(Follow.following_id).where(
             Follow.user_id == user_id
@@ -89,33 +159,28 @@ class PostService:
 
         # Optimized query combining all needed data
         stmt = (
-            select(
-                Post,
-                func.count(Like.like_id).label("likes_count"),
-                func.bool_or(Like.user_id == user_id).label("is_liked_by_me"),
-            )
-            .outerjoin(Like)
+            self._select_posts(user_id)
             .where(or_(Post.user_id == user_id, Post.user_id.in_(following_subquery)))
-            .options(
-                joinedload(Post.user),
-                joinedload(Post.post_images),
-                joinedload(Post.comments),
-            )
-            .group_by(Post.post_id)
-            .order_by(Post.created_at.desc())
-            .offset(offset)
+            .order_by(Post.created_at.desc(), Post.post_id.desc())
             .limit(limit)
         )
 
+        if cursor:
+            stmt = stmt.where(keyset_condition(Post.created_at, Post.post_id, cursor))
+        else:
+            stmt = stmt.offset(offset)
+
         result = await self.db.execute(stmt)
         posts_data = result.unique().all()
 
         # Format posts using helper method
         formatted_posts = [
-            await self._format_post(post, likes_count, is_liked)
-            for post, likes_count, is_liked in posts_data
+            await self._format_post(post, is_liked) for post, is_liked in posts_data
         ]
 
+        if cursor:
+            return formatted_posts, None
+
         # Get total count for feed posts
         total_count = await self.db.scalar(
             select(func.count(Post.post_id)).where(
@@ -126,40 +191,40 @@ class PostService:
         return formatted_posts, total_count
 
     async def get_user_posts(
-        self, target_user_id: str, current_user_id: str, page: int = 1, limit: int = 10
-    ) -> Tuple[List[Dict[str, Any]], int]:
+        self,
+        target_user_id: str,
+        current_user_id: str,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """Get all posts from a specific user with pagination"""
         offset = (page - 1) * limit
 
         # Query to get posts with likes info
         stmt = (
-            select(
-                Post,
-                func.count(Like.like_id).label("likes_count"),
-                func.bool_or(Like.user_id == current_user_id).label("is_liked_by_me"),
-            )
-            .outerjoin(Like)
+            self._select_posts(current_user_id)
             .where(Post.user_id == target_user_id)
-            .options(
-                joinedload(Post.user),
-                joinedload(Post.post_images),
-                joinedload(Post.comments),
-            )
-            .group_by(Post.post_id)
-            .order_by(Post.created_at.desc())
-            .offset(offset)
+            .order_by(Post.created_at.desc(), Post.post_id.desc())
             .limit(limit)
         )
 
+        if cursor:
+            stmt = stmt.where(keyset_condition(Post.created_at, Post.post_id, cursor))
+        else:
+            stmt = stmt.offset(offset)
+
         result = await self.db.execute(stmt)
         posts_data = result.unique().all()
 
         # Format posts using helper method
         formatted_posts = [
-            await self._format_post(post, likes_count, is_liked or False)
-            for post, likes_count, is_liked in posts_data
+            await self._format_post(post, is_liked) for post, is_liked in posts_data
         ]
 
+        if cursor:
+            return formatted_posts, None
+
         # Get total count of user's posts
         total_count = await self.db.scalar(
             select(func.count(Post.post_id)).where(Post.user_id == target_user_id)
@@ -191,10 +256,21 @@ class PostService:
                 post_image = PostImage(post_id=new_post.post_id, image_url=image_url)
                 self.db.add(post_image)
 
+            await self.db.execute(
+                update(User)
+                .where(User.user_id == user_id)
+                .values(posts_count=User.posts_count + 1)
+            )
+
             await self.db.commit()
-            await self.db.refresh(new_post)
 
-            return new_post
+            # Reload with the author and images the router responds with
+            new_post = await self.db.scalar(
+                select(Post)
+                .options(joinedload(Post.user), selectinload(Post.post_images))
+                .where(Post.post_id == new_post.post_id)
+                .execution_options(populate_existing=True)
+            )
 
         except Exception as e:
             await self.db.rollback()
@@ -203,25 +279,24 @@ class PostService:
                 detail=str(e),
             )
 
+        if self.timeline_service:
+            try:
+                await self.timeline_service.push_post(
+                    new_post.post_id, user_id, new_post.created_at
+                )
+                fan_out_post_task.delay(
+                    new_post.post_id, user_id, new_post.created_at.isoformat()
+                )
+            except Exception as e:
+                logger.error(f"Error fanning out post {new_post.post_id}: {str(e)}")
+
+        return new_post
+
     async def get_post_by_id(
         self, post_id: str, current_user_id: str
     ) -> Dict[str, Any]:
         """Get a single post by ID with complete information"""
-        stmt = (
-            select(
-                Post,
-                func.count(Like.like_id).label("likes_count"),
-                func.bool_or(Like.user_id == current_user_id).label("is_liked_by_me"),
-            )
-            .outerjoin(Like)
-            .where(Post.post_id == post_id)
-            .options(
-                joinedload(Post.user),
-                joinedload(Post.post_images),
-                joinedload(Post.comments),
-            )
-            .group_by(Post.post_id)
-        )
+        stmt = self._select_posts(current_user_id).where(Post.post_id == post_id)
 
         result = await self.db.execute(stmt)
         post_data = result.unique().first()
@@ -229,8 +304,8 @@ class PostService:
         if not post_data:
             return None
 
-        post, likes_count, is_liked = post_data
-        return await self._format_post(post, likes_count, is_liked or False)
+        post, is_liked = post_data
+        return await self._format_post(post, is_liked)
 
     async def delete_post(self, post_id: str, user_id: str):
         try:
@@ -249,8 +324,19 @@ class PostService:
 
             # Delete post (will cascade delete post_images automatically)
             await self.db.delete(post)
+            await self.db.execute(
+                update(User)
+                .where(User.user_id == user_id)
+                .values(posts_count=User.posts_count - 1)
+            )
             await self.db.commit()
 
+            if self.timeline_service:
+                try:
+                    await self.timeline_service.remove_post(post_id, user_id)
+                except Exception as e:
+                    logger.error(f"Error removing post {post_id} from timeline: {e}")
+
             return {"message": "Post deleted successfully"}
 
         except Exception as e:
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from typing import List
+
+from redis.asyncio import Redis
+from sqlalchemy import select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import get_settings
+from app.models.follow import Follow
+from app.models.participant import Participant
+
+settings = get_settings()
+
+
+class PresenceService:
+    """Who gets a user's online/offline changes.
+
+    A user's contacts are the people sharing a conversation with them and
+    their followers. The set is cached in Redis so reconnects do not hit
+    the database.
+    """
+
+    def __init__(self, db: AsyncSession, redis: Redis):
+        self.db = db
+        self.redis = redis
+        self.contacts_key_prefix = "presence:contacts:"
+        self.ready_key_prefix = "presence:ready:"
+        self.expiry = timedelta(seconds=settings.PRESENCE_CONTACTS_TTL)
+
+    async def get_contact_ids(self, user_id: str) -> List[str]:
+        key = f"{self.contacts_key_prefix}{user_id}"
+        ready_key = f"{self.ready_key_prefix}{user_id}"
+
+        if await self.redis.exists(ready_key):
+            return list(await self.redis.smembers(key))
+
+        conversation_ids = select(Participant.conversation_id).where(
+            Participant.user_id == user_id
+        )
+        contacts = union(
+            select(Participant.user_id).where(
+                Participant.conversation_id.in_(conversation_ids),
+                Participant.user_id != user_id,
+            ),
+            select(Follow.user_id).where(Follow.following_id == user_id),
+        ).limit(settings.PRESENCE_MAX_CONTACTS)
+
+        result = await self.db.execute(contacts)
+        contact_ids = result.scalars().all()
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if contact_ids:
+                pipe.sadd(key, *contact_ids)
+                pipe.expire(key, self.expiry)
+            pipe.setex(ready_key, self.expiry, "1")
+            await pipe.execute()
+
+        return list(contact_ids)
+
+    async def invalidate(self, *user_ids: str) -> None:
+        """Drop cached contact sets after follows or conversations change"""
+        keys = [
+            f"{prefix}{user_id}"
+            for user_id in user_ids
+            for prefix in (self.ready_key_prefix, self.contacts_key_prefix)
+        ]
+        if keys:
+            await self.redis.delete(*keys)
@@ -1,165 +1,86 @@
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, time, timedelta
 from typing import Dict, List
 
-from sqlalchemy import and_, distinct, func, select, text
+from sqlalchemy import distinct, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.comment import Comment
-from app.models.conversation import Conversation
-from app.models.like import Like
-from app.models.message import Message
-from app.models.notification import Notification
+from app.core.read_replicas import ReadSessionLocal, replica_set
+from app.core.settings import get_settings
+from app.core.stats_cache import stats_cache
+from app.models.daily_stats import DailyStats
 from app.models.post import Post
-from app.models.user import User
 from app.models.user_session import UserSession
 
+settings = get_settings()
+
 
 class StatisticsService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_user_growth_stats(self, days: int = 30) -> List[Dict]:
-        """Get user growth statistics over time"""
-        start_date = datetime.utcnow() - timedelta(days=days)
+    async def _get_daily_series(self, days: int, **fields: str) -> List[Dict]:
+        """One dict per day of the last ``days`` days, oldest first, mapping
+        each keyword to a daily_stats column. Days not rolled up yet are 0."""
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=days - 1)
 
-        query = text(
-            """
-            WITH RECURSIVE dates AS (
-                SELECT date_trunc('day', now()) as date
-                UNION ALL
-                SELECT date - interval '1 day'
-                FROM dates
-                WHERE date > :start_date
-            ),
-            daily_stats AS (
-                SELECT 
-                    date_trunc('day', created_at) as date,
-                    COUNT(DISTINCT user_id) as new_users_count,
-                    SUM(COUNT(DISTINCT user_id)) OVER (
-                        ORDER BY date_trunc('day', created_at)
-                    ) as total_users
-                FROM users
-                WHERE created_at >= :start_date
-                GROUP BY date_trunc('day', created_at)
-            )
-            SELECT 
-                d.date,
-                COALESCE(ds.new_users_count, 0) as new_users_count,
-                COALESCE(ds.total_users, 0) as total_users
-            FROM dates d
-            LEFT JOIN daily_stats ds ON d.date = ds.date
-            WHERE d.date >= :start_date
-            ORDER BY d.date
-            LIMIT :days
-        """
+        columns = [getattr(DailyStats, column) for column in fields.values()]
+        result = await self.db.execute(
+            select(DailyStats.date, *columns).where(DailyStats.date >= start)
         )
+        rows = {row[0]: row[1:] for row in result.all()}
+
+        series = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            values = rows.get(day, (0,) * len(fields))
+            series.append(
+                {"date": datetime.combine(day, time.min), **dict(zip(fields, values))}
+            )
+        return series
 
-        result = await self.db.execute(query, {"start_date": start_date, "days": days})
-        return result.mappings().all()
+    async def get_user_growth_stats(self, days: int = 30) -> List[Dict]:
+        """Get user growth statistics over time"""
+        return await self._get_daily_series(
+            days, new_users_count="new_users", total_users="users_total"
+        )
 
     async def get_post_activity_stats(self, days: int = 30) -> List[Dict]:
-        """Get post activity statistics"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        query = text(
-            """
-            WITH RECURSIVE dates AS (
-                SELECT date_trunc('day', now()) as date
-                UNION ALL
-                SELECT date - interval '1 day'
-                FROM dates
-                WHERE date > :start_date
-            ),
-            daily_stats AS (
-                SELECT 
-                    date_trunc('day', p.created_at) as date,
-                    COUNT(DISTINCT p.post_id) as total_posts,
-                    COUNT(DISTINCT c.comment_id) as total_comments,
-                    COUNT(DISTINCT l.like_id) as total_likes
-                FROM posts p
-                LEFT JOIN comments c ON p.post_id = c.post_id 
-                    AND c.created_at >= :start_date
-                    AND c.created_at < date_trunc('day', now()) + interval '1 day'
-                LEFT JOIN likes l ON p.post_id = l.post_id
-                    AND l.created_at >= :start_date
-                    AND l.created_at < date_trunc('day', now()) + interval '1 day'
-                WHERE p.created_at >= :start_date
-                GROUP BY date_trunc('day', p.created_at)
-            )
-            SELECT 
-                d.date,
-                COALESCE(ds.total_posts, 0) as total_posts,
-                COALESCE(ds.total_comments, 0) as total_comments,
-                COALESCE(ds.total_likes, 0) as total_likes
-            FROM dates d
-            LEFT JOIN daily_stats ds ON d.date = ds.date
-            WHERE d.date >= :start_date
-            ORDER BY d.date
-            LIMIT :days
-        """
+        """Posts, comments and likes created each day"""
+        return await self._get_daily_series(
+            days, total_posts="posts", total_comments="comments", total_likes="likes"
         )
 
-        result = await self.db.execute(query, {"start_date": start_date, "days": days})
-        return result.mappings().all()
-
     async def get_interaction_stats(self, days: int = 30) -> List[Dict]:
         """Get interaction statistics
         - total_messages: Số tin nhắn được gửi trong ngày
         - active_conversations: Số cuộc hội thoại có tin nhắn trong ngày
         - total_notifications: Số thông báo được tạo trong ngày
         """
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        query = text(
-            """
-            WITH RECURSIVE dates AS (
-                SELECT date_trunc('day', now()) as date
-                UNION ALL
-                SELECT date - interval '1 day'
-                FROM dates
-                WHERE date > :start_date
-            ),
-            daily_messages AS (
-                SELECT 
-                    date_trunc('day', m.created_at) as date,
-                    COUNT(DISTINCT m.message_id) as total_messages,
-                    COUNT(DISTINCT m.conversation_id) as active_conversations
-                FROM messages m
-                WHERE m.created_at >= :start_date
-                GROUP BY date_trunc('day', m.created_at)
-            ),
-            daily_notifications AS (
-                SELECT 
-                    date_trunc('day', n.created_at) as date,
-                    COUNT(DISTINCT n.notification_id) as total_notifications
-                FROM notifications n
-                WHERE n.created_at >= :start_date
-                GROUP BY date_trunc('day', n.created_at)
-            )
-            SELECT 
-                d.date,
-                COALESCE(dm.total_messages, 0) as total_messages,
-                COALESCE(dm.active_conversations, 0) as active_conversations,
-                COALESCE(dn.total_notifications, 0) as total_notifications
-            FROM dates d
-            LEFT JOIN daily_messages dm ON d.date = dm.date
-            LEFT JOIN daily_notifications dn ON d.date = dn.date
-            WHERE d.date >= :start_date
-            ORDER BY d.date
-            LIMIT :days
-        """
+        return await self._get_daily_series(
+            days,
+            total_messages="messages",
+            active_conversations="active_conversations",
+            total_notifications="notifications",
         )
 
-        result = await self.db.execute(query, {"start_date": start_date, "days": days})
-        return result.mappings().all()
-
     async def get_user_engagement_stats(self) -> Dict:
         """Get user engagement statistics"""
-        # Tính toán tổng số lượng
-        total_users = await self.db.scalar(select(func.count(User.user_id)))
-        total_posts = await self.db.scalar(select(func.count(Post.post_id)))
-        total_comments = await self.db.scalar(select(func.count(Comment.comment_id)))
-        total_likes = await self.db.scalar(select(func.count(Like.like_id)))
+        # Tổng số lượng từ ngày được rollup gần nhất
+        totals = (
+            await self.db.execute(
+                select(
+                    DailyStats.users_total,
+                    DailyStats.posts_total,
+                    DailyStats.comments_total,
+                    DailyStats.likes_total,
+                )
+                .order_by(DailyStats.date.desc())
+                .limit(1)
+            )
+        ).one_or_none()
+        total_users, total_posts, total_comments, total_likes = totals or (0, 0, 0, 0)
 
         return {
             "avg_posts_per_user": total_posts / total_users if total_users > 0 else 0,
@@ -180,67 +101,110 @@ class StatisticsService:
 
         return await self.db.scalar(query)
 
+    async def _count(self, query: str, **params) -> int:
+        """Run one count on its own read session, so independent counts of a
+        metric can run concurrently"""
+        read_engine = await replica_set.pick()
+        async with ReadSessionLocal(read_engine=read_engine) as db:
+            return await db.scalar(text(query), params) or 0
+
     async def get_user_detail_stats(self) -> Dict:
         """Get detailed user statistics"""
+        return await stats_cache.get(
+            "users:details",
+            settings.STATS_USER_DETAIL_TTL,
+            self._compute_user_detail_stats,
+        )
+
+    async def _compute_user_detail_stats(self) -> Dict:
         start_date = datetime.utcnow() - timedelta(days=7)
 
-        query = text(
-            """
-            SELECT 
-                (SELECT COUNT(*) FROM users) as total_users,
-                (
-                    SELECT COUNT(DISTINCT user_id) 
-                    FROM user_sessions 
+        total_users, total_active_users, total_posts, total_followers = (
+            await asyncio.gather(
+                self._count("SELECT COUNT(*) FROM users"),
+                self._count(
+                    """
+                    SELECT COUNT(DISTINCT user_id)
+                    FROM user_sessions
                     WHERE created_at >= :start_date
-                ) as total_active_users,
-                (SELECT COUNT(*) FROM posts) as total_posts,
-                (SELECT COUNT(*) FROM follows) as total_followers
-        """
+                    """,
+                    start_date=start_date,
+                ),
+                self._count("SELECT COUNT(*) FROM posts"),
+                self._count("SELECT COUNT(*) FROM follows"),
+            )
         )
-
-        result = await self.db.execute(query, {"start_date": start_date})
-        return result.mappings().one()
+        return {
+            "total_users": total_users,
+            "total_active_users": total_active_users,
+            "total_posts": total_posts,
+            "total_followers": total_followers,
+        }
 
     async def get_post_detail_stats(self) -> Dict:
         """Get detailed post statistics"""
-        query = text(
-            """
-            SELECT 
-                COUNT(DISTINCT p.post_id) as total_posts,
-                COUNT(DISTINCT c.comment_id) as total_comments,
-                COUNT(DISTINCT l.like_id) as total_likes,
-                CAST(COUNT(DISTINCT c.comment_id) AS FLOAT) / 
-                    NULLIF(COUNT(DISTINCT p.post_id), 0) as avg_comments_per_post,
-                CAST(COUNT(DISTINCT l.like_id) AS FLOAT) / 
-                    NULLIF(COUNT(DISTINCT p.post_id), 0) as avg_likes_per_post
-            FROM posts p
-            LEFT JOIN comments c ON p.post_id = c.post_id
-            LEFT JOIN likes l ON p.post_id = l.post_id
-        """
+        return await stats_cache.get(
+            "posts:details",
+            settings.STATS_POST_DETAIL_TTL,
+            self._compute_post_detail_stats,
         )
 
-        result = await self.db.execute(query)
-        return result.mappings().one()
+    async def _compute_post_detail_stats(self) -> Dict:
+        # Đọc từ counter của posts thay vì JOIN posts x comments x likes
+        read_engine = await replica_set.pick()
+        async with ReadSessionLocal(read_engine=read_engine) as db:
+            result = await db.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(Post.comments_count), 0),
+                    func.coalesce(func.sum(Post.likes_count), 0),
+                )
+            )
+            total_posts, total_comments, total_likes = result.one()
+
+        return {
+            "total_posts": total_posts,
+            "total_comments": total_comments,
+            "total_likes": total_likes,
+            "avg_comments_per_post": (
+                total_comments / total_posts if total_posts > 0 else 0.0
+            ),
+            "avg_likes_per_post": total_likes / total_posts if total_posts > 0 else 0.0,
+        }
 
     async def get_message_detail_stats(self) -> Dict:
         """Get detailed message statistics"""
-        query = text(
-            """
-            SELECT 
-                COUNT(DISTINCT c.conversation_id) as total_conversations,
-                COUNT(DISTINCT m.message_id) as total_messages,
-                COUNT(DISTINCT p.participant_id) as total_participants,
-                COALESCE(
-                    CAST(COUNT(DISTINCT m.message_id) AS FLOAT) / 
-                    NULLIF(COUNT(DISTINCT c.conversation_id), 0),
-                    0.0
-                ) as avg_messages_per_conversation
-            FROM conversations c
-            LEFT JOIN messages m ON c.conversation_id = m.conversation_id
-            LEFT JOIN participants p ON c.conversation_id = p.conversation_id
-            WHERE c.deleted_at IS NULL
-        """
+        return await stats_cache.get(
+            "messages:details",
+            settings.STATS_MESSAGE_DETAIL_TTL,
+            self._compute_message_detail_stats,
         )
 
-        result = await self.db.execute(query)
-        return result.mappings().one()
+    async def _compute_message_detail_stats(self) -> Dict:
+        total_conversations, total_messages, total_participants = await asyncio.gather(
+            self._count("SELECT COUNT(*) FROM conversations WHERE deleted_at IS NULL"),
+            self._count(
+                """
+                SELECT COUNT(*)
+                FROM messages m
+                JOIN conversations c ON c.conversation_id = m.conversation_id
+                WHERE c.deleted_at IS NULL
+                """
+            ),
+            self._count(
+                """
+                SELECT COUNT(*)
+                FROM participants p
+                JOIN conversations c ON c.conversation_id = p.conversation_id
+                WHERE c.deleted_at IS NULL
+                """
+            ),
+        )
+        return {
+            "total_conversations": total_conversations,
+            "total_messages": total_messages,
+            "total_participants": total_participants,
+            "avg_messages_per_conversation": (
+                total_messages / total_conversations if total_conversations > 0 else 0.0
+            ),
+        }
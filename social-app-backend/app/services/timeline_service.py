@@ -0,0 +1,229 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import get_settings
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+from app.utils.pagination import decode_cursor
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+FAN_OUT_BATCH_SIZE = 500
+
+
+class TimelineService:
+    """Materialized home timelines stored as Redis sorted sets.
+
+    Posts are pushed into every follower's timeline by a Celery task after
+    the write. Authors with more followers than
+    ``TIMELINE_CELEBRITY_THRESHOLD`` are skipped during fan-out and their
+    new posts merged into the timeline at read time instead.
+    """
+
+    def __init__(self, db: AsyncSession, redis: Redis):
+        self.db = db
+        self.redis = redis
+        self.timeline_key_prefix = "timeline:user:"
+        self.ready_key_prefix = "timeline:ready:"
+        self.author_key_prefix = "timeline:author:"
+        self.celebrities_key = "timeline:celebrities"
+        self.max_length = settings.TIMELINE_MAX_LENGTH
+        self.celebrity_threshold = settings.TIMELINE_CELEBRITY_THRESHOLD
+        self.expiry = timedelta(days=settings.TIMELINE_TTL_DAYS)
+
+    @staticmethod
+    def _score(created_at: datetime) -> float:
+        # created_at is stored as a naive UTC timestamp
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at.timestamp()
+
+    def _timeline_key(self, user_id: str) -> str:
+        return f"{self.timeline_key_prefix}{user_id}"
+
+    def _ready_key(self, user_id: str) -> str:
+        return f"{self.ready_key_prefix}{user_id}"
+
+    def _author_key(self, author_id: str) -> str:
+        return f"{self.author_key_prefix}{author_id}"
+
+    def _add_to_sorted_set(self, pipe, key: str, mapping: Dict[str, float]) -> None:
+        pipe.zadd(key, mapping)
+        pipe.zremrangebyrank(key, 0, -(self.max_length + 1))
+        pipe.expire(key, self.expiry)
+
+    async def push_post(self, post_id: str, author_id: str, created_at: datetime):
+        """Add a new post to the author's own sets.
+
+        Followers' timelines are filled by ``fan_out_post`` in a Celery task.
+        """
+        mapping = {post_id: self._score(created_at)}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            self._add_to_sorted_set(pipe, self._author_key(author_id), mapping)
+            self._add_to_sorted_set(pipe, self._timeline_key(author_id), mapping)
+            await pipe.execute()
+
+    async def fan_out_post(self, post_id: str, author_id: str, created_at: datetime):
+        """Fan a new post out to the author's followers"""
+        mapping = {post_id: self._score(created_at)}
+
+        followers_count = await self.db.scalar(
+            select(User.followers_count).where(User.user_id == author_id)
+        )
+
+        if followers_count is None:
+            # Author deleted before the task ran
+            return
+
+        if followers_count > self.celebrity_threshold:
+            # Followers pull this author's posts at read time
+            await self.redis.sadd(self.celebrities_key, author_id)
+            return
+
+        await self.redis.srem(self.celebrities_key, author_id)
+
+        result = await self.db.execute(
+            select(Follow.user_id).where(Follow.following_id == author_id)
+        )
+        follower_ids = result.scalars().all()
+
+        for start in range(0, len(follower_ids), FAN_OUT_BATCH_SIZE):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for follower_id in follower_ids[start : start + FAN_OUT_BATCH_SIZE]:
+                    self._add_to_sorted_set(
+                        pipe, self._timeline_key(follower_id), mapping
+                    )
+                await pipe.execute()
+
+        logger.info(f"Fanned out post {post_id} to {len(follower_ids)} timelines")
+
+    async def remove_post(self, post_id: str, author_id: str):
+        """Remove a post from the author's sets.
+
+        Followers' timelines are cleaned lazily when the post fails to load.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self._author_key(author_id), post_id)
+            pipe.zrem(self._timeline_key(author_id), post_id)
+            await pipe.execute()
+
+    async def discard(self, user_id: str, post_ids: List[str]):
+        """Drop stale post IDs from a user's timeline"""
+        if post_ids:
+            await self.redis.zrem(self._timeline_key(user_id), *post_ids)
+
+    async def invalidate(self, user_id: str):
+        """Force a rebuild of the user's timeline on next read"""
+        await self.redis.delete(self._ready_key(user_id))
+
+    async def rebuild(self, user_id: str):
+        """Rebuild a cold timeline from the database.
+
+        Celebrities' posts are included too, their author sets only hold
+        posts made while the set was alive.
+        """
+        following_subquery = select(Follow.following_id).where(
+            Follow.user_id == user_id
+        )
+        stmt = (
+            select(Post.post_id, Post.created_at)
+            .where(or_(Post.user_id == user_id, Post.user_id.in_(following_subquery)))
+            .order_by(Post.created_at.desc())
+            .limit(self.max_length)
+        )
+
+        result = await self.db.execute(stmt)
+        mapping = {
+            post_id: self._score(created_at) for post_id, created_at in result.all()
+        }
+
+        key = self._timeline_key(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            if mapping:
+                pipe.zadd(key, mapping)
+                pipe.expire(key, self.expiry)
+            pipe.setex(self._ready_key(user_id), self.expiry, "1")
+            await pipe.execute()
+
+        logger.info(f"Rebuilt timeline for user {user_id} with {len(mapping)} posts")
+
+    async def _get_followed_celebrities(self, user_id: str) -> List[str]:
+        celebrity_ids = await self.redis.smembers(self.celebrities_key)
+        if not celebrity_ids:
+            return []
+
+        result = await self.db.execute(
+            select(Follow.following_id).where(
+                Follow.user_id == user_id, Follow.following_id.in_(celebrity_ids)
+            )
+        )
+        return result.scalars().all()
+
+    def can_serve(self, offset: int, limit: int) -> bool:
+        """Timelines are capped, deeper pages must be read from the database"""
+        return offset + limit <= self.max_length
+
+    async def get_page(
+        self, user_id: str, offset: int, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[str], int]:
+        """Return post IDs for one feed page and the approximate total.
+
+        With a cursor the page starts strictly after the cursor position,
+        using the same (created_at, post_id) descending order as the DB feed.
+        """
+        if not await self.redis.exists(self._ready_key(user_id)):
+            await self.rebuild(user_id)
+
+        celebrity_ids = await self._get_followed_celebrities(user_id)
+        keys = [self._timeline_key(user_id)] + [
+            self._author_key(celebrity_id) for celebrity_id in celebrity_ids
+        ]
+
+        if cursor:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+            cursor_score = self._score(cursor_created_at)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                if cursor:
+                    pipe.zrevrangebyscore(
+                        key,
+                        f"({cursor_score}",
+                        "-inf",
+                        start=0,
+                        num=limit,
+                        withscores=True,
+                    )
+                    # Posts sharing the cursor's timestamp
+                    pipe.zrangebyscore(key, cursor_score, cursor_score, withscores=True)
+                else:
+                    pipe.zrevrange(key, 0, offset + limit - 1, withscores=True)
+            for key in keys:
+                pipe.zcard(key)
+            results = await pipe.execute()
+
+        ranges = results[: len(results) - len(keys)]
+        entries = {}
+        for post_id, score in (item for items in ranges for item in items):
+            if cursor and score == cursor_score and post_id >= cursor_id:
+                continue
+            entries[post_id] = score
+
+        ordered = sorted(
+            entries.items(), key=lambda item: (item[1], item[0]), reverse=True
+        )
+        start = 0 if cursor else offset
+        post_ids = [post_id for post_id, _ in ordered[start : start + limit]]
+        total = sum(results[len(results) - len(keys) :])
+
+        return post_ids, total
@@ -0,0 +1,156 @@
+import json
+import logging
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_redis_client
+from app.core.settings import get_settings
+from app.models.user import User
+from app.utils.text import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+CARD_COLUMNS = (
+    User.user_id,
+    User.username,
+    User.full_name,
+    User.profile_picture_url,
+    User.followers_count,
+)
+
+
+class UserSearchIndex:
+    """Redis prefix index of usernames and full names for typeahead.
+
+    The normalized username, full name and each word of the full name are
+    stored as ``<token>\\0<user_id>`` members of one sorted set with equal
+    scores, so ZRANGEBYLEX returns the users having a token that starts
+    with the query. A hash keeps the card shown for each suggestion.
+    """
+
+    def __init__(self):
+        self.key = "search:users"
+        self.cards_key = "search:users:cards"
+        self.ready_key = "search:users:ready"
+        self.rebuild_lock_key = "search:users:rebuilding"
+
+    @staticmethod
+    def card(user) -> dict:
+        return {
+            "user_id": user.user_id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "profile_picture_url": user.profile_picture_url,
+            "followers_count": user.followers_count or 0,
+        }
+
+    @staticmethod
+    def _members(card: dict) -> List[str]:
+        username = normalize_search_text(card["username"])
+        full_name = normalize_search_text(card["full_name"] or "")
+        tokens = {username, full_name, *full_name.split()}
+        return [f"{token}\0{card['user_id']}" for token in tokens if token]
+
+    async def add(self, user: User) -> None:
+        """Index a new user or re-index one whose names changed.
+
+        Errors are only logged, the nightly rebuild repairs the index.
+        """
+        try:
+            redis = get_redis_client()
+            card = self.card(user)
+            previous = await redis.hget(self.cards_key, user.user_id)
+
+            async with redis.pipeline(transaction=True) as pipe:
+                if previous:
+                    pipe.zrem(self.key, *self._members(json.loads(previous)))
+                pipe.zadd(self.key, {member: 0 for member in self._members(card)})
+                pipe.hset(self.cards_key, user.user_id, json.dumps(card))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error indexing user {user.user_id}: {str(e)}")
+
+    async def remove(self, user_id: str) -> None:
+        try:
+            redis = get_redis_client()
+            previous = await redis.hget(self.cards_key, user_id)
+            if not previous:
+                return
+
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.key, *self._members(json.loads(previous)))
+                pipe.hdel(self.cards_key, user_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error removing user {user_id} from index: {str(e)}")
+
+    async def search(
+        self, query: str, limit: int = settings.TYPEAHEAD_CANDIDATES
+    ) -> Optional[List[dict]]:
+        """Cards of up to ``limit`` users with a name starting with the query.
+
+        Returns None while the index has not been built.
+        """
+        prefix = normalize_search_text(query).encode()
+        if not prefix:
+            return []
+
+        redis = get_redis_client()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.exists(self.ready_key)
+            # UTF-8 never contains 0xff, so it sorts after every continuation
+            pipe.zrangebylex(
+                self.key, b"[" + prefix, b"[" + prefix + b"\xff", start=0, num=limit
+            )
+            ready, members = await pipe.execute()
+        if not ready:
+            return None
+
+        user_ids = list(dict.fromkeys(member.rsplit("\0", 1)[1] for member in members))
+        if not user_ids:
+            return []
+        cards = await redis.hmget(self.cards_key, user_ids)
+        return [json.loads(card) for card in cards if card]
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Build the index from the users table and swap it in at once.
+
+        Also refreshes the follower counts used for ranking.
+        """
+        redis = get_redis_client()
+        building_key = f"{self.key}:building"
+        building_cards_key = f"{self.cards_key}:building"
+        await redis.delete(building_key, building_cards_key)
+
+        count = 0
+        result = await db.stream(
+            select(*CARD_COLUMNS).execution_options(yield_per=1000)
+        )
+        async for rows in result.partitions():
+            async with redis.pipeline(transaction=False) as pipe:
+                for row in rows:
+                    card = self.card(row)
+                    pipe.zadd(building_key, {m: 0 for m in self._members(card)})
+                    pipe.hset(building_cards_key, card["user_id"], json.dumps(card))
+                await pipe.execute()
+            count += len(rows)
+
+        async with redis.pipeline(transaction=True) as pipe:
+            if count:
+                pipe.rename(building_key, self.key)
+                pipe.rename(building_cards_key, self.cards_key)
+            else:
+                pipe.delete(self.key, self.cards_key)
+            pipe.set(self.ready_key, "1")
+            pipe.delete(self.rebuild_lock_key)
+            await pipe.execute()
+
+        logger.info(f"Indexed {count} users for typeahead")
+        return count
+
+
+user_search_index = UserSearchIndex()
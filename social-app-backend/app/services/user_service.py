@@ -1,28 +1,36 @@
-from typing import List, Optional, Tuple
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import and_, func, literal, or_, select
+from redis.asyncio import Redis
+from sqlalchemy import and_, func, literal, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from app.core.settings import get_settings
 from app.models.follow import Follow
 from app.models.post import Post
 from app.models.user import User
 from app.schemas.user import UserUpdate
+from app.services.presence_service import PresenceService
+from app.services.user_search_index import user_search_index
+from app.tasks.search_tasks import rebuild_user_search_index_task
+from app.utils.text import normalize_search_text
+
+settings = get_settings()
 
 
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, redis: Redis = None):
         self.db = db
+        self.redis = redis
+        self.following_key_prefix = "following:user:"
+        self.following_ready_prefix = "following:ready:"
+        self.following_expiry = timedelta(seconds=settings.FOLLOWING_CACHE_TTL)
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
-        stmt = (
-            select(User)
-            .options(joinedload(User.followers), joinedload(User.following))
-            .where(User.user_id == user_id)
-        )
+        stmt = select(User).where(User.user_id == user_id)
         result = await self.db.execute(stmt)
-        return result.unique().scalar_one_or_none()
+        return result.scalar_one_or_none()
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         stmt = select(User).where(User.email == email)
@@ -51,6 +59,7 @@ class UserService:
             self.db.add(user)
             await self.db.commit()
             await self.db.refresh(user)
+            await user_search_index.add(user)
             return user
         except Exception as e:
             await self.db.rollback()
@@ -103,15 +112,116 @@ class UserService:
 
         return following, total_count
 
+    async def _update_follow_counts(self, follow: Follow, delta: int) -> None:
+        await self.db.execute(
+            update(User)
+            .where(User.user_id == follow.user_id)
+            .values(following_count=User.following_count + delta)
+        )
+        await self.db.execute(
+            update(User)
+            .where(User.user_id == follow.following_id)
+            .values(followers_count=User.followers_count + delta)
+        )
+
     async def create_follow(self, follow: Follow) -> Follow:
         self.db.add(follow)
+        await self._update_follow_counts(follow, 1)
         await self.db.commit()
         await self.db.refresh(follow)
+        await self._invalidate_following_cache(follow)
         return follow
 
     async def delete_follow(self, follow: Follow) -> None:
         await self.db.delete(follow)
+        await self._update_follow_counts(follow, -1)
         await self.db.commit()
+        await self._invalidate_following_cache(follow)
+
+    async def _invalidate_following_cache(self, follow: Follow) -> None:
+        if self.redis:
+            await self.redis.delete(
+                f"{self.following_ready_prefix}{follow.user_id}",
+                f"{self.following_key_prefix}{follow.user_id}",
+            )
+            # Followers receive the followed user's presence
+            await PresenceService(self.db, self.redis).invalidate(follow.following_id)
+
+    async def _get_cached_following(
+        self, viewer_id: str, user_ids: List[str]
+    ) -> Optional[List[str]]:
+        """IDs in ``user_ids`` followed by the viewer, from the Redis set.
+
+        Returns None when Redis is not available or the viewer follows too
+        many accounts to cache, callers then fall back to the database.
+        """
+        if not self.redis:
+            return None
+
+        key = f"{self.following_key_prefix}{viewer_id}"
+        ready_key = f"{self.following_ready_prefix}{viewer_id}"
+
+        if not await self.redis.exists(ready_key):
+            result = await self.db.execute(
+                select(Follow.following_id)
+                .where(Follow.user_id == viewer_id)
+                .limit(settings.FOLLOWING_CACHE_MAX_SIZE + 1)
+            )
+            following_ids = result.scalars().all()
+            if len(following_ids) > settings.FOLLOWING_CACHE_MAX_SIZE:
+                return None
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if following_ids:
+                    pipe.sadd(key, *following_ids)
+                    pipe.expire(key, self.following_expiry)
+                pipe.setex(ready_key, self.following_expiry, "1")
+                await pipe.execute()
+
+            followed = set(following_ids)
+            return [user_id for user_id in user_ids if user_id in followed]
+
+        flags = await self.redis.smismember(key, user_ids)
+        return [user_id for user_id, flag in zip(user_ids, flags) if flag]
+
+    async def get_follow_states(
+        self, viewer_id: str, user_ids: List[str]
+    ) -> Dict[str, Dict[str, bool]]:
+        """Follow state between the viewer and every user of a page.
+
+        Costs at most one query regardless of the page size.
+        """
+        states = {
+            user_id: {"is_following": False, "is_followed_by": False}
+            for user_id in user_ids
+        }
+        if not user_ids:
+            return states
+
+        following_ids = await self._get_cached_following(viewer_id, user_ids)
+
+        conditions = [
+            and_(Follow.following_id == viewer_id, Follow.user_id.in_(user_ids))
+        ]
+        if following_ids is None:
+            conditions.append(
+                and_(Follow.user_id == viewer_id, Follow.following_id.in_(user_ids))
+            )
+        else:
+            for user_id in following_ids:
+                states[user_id]["is_following"] = True
+
+        result = await self.db.execute(
+            select(Follow.user_id, Follow.following_id).where(or_(*conditions))
+        )
+        for follower_id, followed_id in result.all():
+            if follower_id == viewer_id:
+                states[followed_id]["is_following"] = True
+            else:
+                states[follower_id]["is_followed_by"] = True
+
+        return states
 
     async def get_follow(self, user_id: str, following_id: str) -> Optional[Follow]:
         stmt = select(Follow).where(
@@ -122,51 +232,104 @@ class UserService:
 
     async def search_users(
         self, query: str, current_user_id: str, offset: int, limit: int
-    ) -> Tuple[List[User], int]:
-        """Search users by username or full name"""
-        search_term = f"%{query}%"
-
-        # Base condition for both queries
-        search_condition = and_(
-            or_(
-                User.username.ilike(search_term),
-                User.full_name.ilike(search_term),
-            ),
-            User.user_id != current_user_id,  # Exclude current user
+    ) -> Tuple[List[User], bool]:
+        """Search users by username or full name, ignoring case and accents.
+
+        Substring and fuzzy (trigram) matches are both served by the GIN
+        index on ``search_name``. Accounts the viewer follows come first,
+        then the closest matches, then the most followed. Returns the page
+        and whether more results exist instead of counting every match.
+        """
+        normalized = normalize_search_text(query)
+        if not normalized:
+            return [], False
+
+        escaped = (
+            normalized.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        viewer_follows = (
+            select(Follow.follow_id)
+            .where(
+                Follow.user_id == current_user_id, Follow.following_id == User.user_id
+            )
+            .exists()
         )
 
-        # Get users with pagination
-        stmt = select(User).where(search_condition).offset(offset).limit(limit)
-        result = await self.db.execute(stmt)
-        users = result.scalars().all()
-
-        # Get total count with the same condition
-        count_stmt = select(func.count(User.user_id)).where(search_condition)
-        total_count = await self.db.scalar(count_stmt)
+        stmt = (
+            select(User)
+            .where(
+                or_(
+                    User.search_name.like(f"%{escaped}%", escape="\\"),
+                    User.search_name.op("%")(normalized),
+                ),
+                User.user_id != current_user_id,  # Exclude current user
+            )
+            .order_by(
+                viewer_follows.desc(),
+                func.word_similarity(normalized, User.search_name).desc(),
+                User.followers_count.desc(),
+                User.user_id,
+            )
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        users = (await self.db.execute(stmt)).scalars().all()
+
+        # The extra row only tells whether another page exists
+        return users[:limit], len(users) > limit
+
+    async def typeahead_users(
+        self, query: str, viewer_id: str, limit: int
+    ) -> List[dict]:
+        """Suggestions for a partially typed name.
+
+        Served from the Redis prefix index: accounts the viewer follows
+        first, then the most followed. Falls back to the trigram search and
+        schedules a rebuild while the index does not exist yet.
+        """
+        candidates = await user_search_index.search(query)
+        if candidates is None:
+            if await self.redis.set(
+                user_search_index.rebuild_lock_key, "1", nx=True, ex=600
+            ):
+                rebuild_user_search_index_task.delay()
+            users, _ = await self.search_users(query, viewer_id, 0, limit)
+            candidates = [user_search_index.card(user) for user in users]
+
+        candidates = [c for c in candidates if c["user_id"] != viewer_id]
+        following = set(
+            await self._get_cached_following(
+                viewer_id, [c["user_id"] for c in candidates]
+            )
+            or []
+        )
+        candidates.sort(
+            key=lambda c: (c["user_id"] in following, c["followers_count"]),
+            reverse=True,
+        )
 
-        return users, total_count
+        return [
+            {
+                "user_id": c["user_id"],
+                "username": c["username"],
+                "full_name": c["full_name"],
+                "profile_picture_url": c["profile_picture_url"],
+                "is_following": c["user_id"] in following,
+            }
+            for c in candidates[:limit]
+        ]
 
     async def get_user_stats(self, user_id: str) -> dict:
         """Get user statistics (posts, followers, following counts)"""
-        # Get posts count
-        posts_count = await self.db.scalar(
-            select(func.count(Post.post_id)).where(Post.user_id == user_id)
-        )
-
-        # Get followers count
-        followers_count = await self.db.scalar(
-            select(func.count(Follow.follow_id)).where(Follow.following_id == user_id)
-        )
-
-        # Get following count
-        following_count = await self.db.scalar(
-            select(func.count(Follow.follow_id)).where(Follow.user_id == user_id)
-        )
+        stmt = select(
+            User.posts_count, User.followers_count, User.following_count
+        ).where(User.user_id == user_id)
+        stats = (await self.db.execute(stmt)).one_or_none()
 
         return {
-            "posts_count": posts_count,
-            "followers_count": followers_count,
-            "following_count": following_count,
+            "posts_count": stats.posts_count if stats else 0,
+            "followers_count": stats.followers_count if stats else 0,
+            "following_count": stats.following_count if stats else 0,
         }
 
     async def get_suggested_users(self, user_id: str, limit: int = 5) -> dict:
@@ -233,13 +396,6 @@ class UserService:
                     .scalar_subquery()
                 )
 
-                total_followers = (
-                    select(func.count(Follow.follow_id))
-                    .where(Follow.following_id == User.user_id)
-                    .correlate(User)
-                    .scalar_subquery()
-                )
-
                 # Get mutual connections and popular users
                 other_suggestions = (
                     select(
@@ -271,7 +427,7 @@ class UserService:
                         User.profile_picture_url,
                         Follow.user_id,
                     )
-                    .order_by(mutual_connections.desc(), total_followers.desc())
+                    .order_by(mutual_connections.desc(), User.followers_count.desc())
                     .limit(remaining_limit)
                 )
 
@@ -329,13 +485,8 @@ class UserService:
 
     async def check_follow_status(self, user_id: str, target_user_id: str) -> dict:
         """Check follow status between two users"""
-        # Check if user follows target
-        is_following = await self.get_follow(user_id, target_user_id) is not None
-
-        # Check if target follows user
-        is_followed_by = await self.get_follow(target_user_id, user_id) is not None
-
-        return {"is_following": is_following, "is_followed_by": is_followed_by}
+        states = await self.get_follow_states(user_id, [target_user_id])
+        return states[target_user_id]
 
     async def get_user_activity(
         self, user_id: str, offset: int, limit: int
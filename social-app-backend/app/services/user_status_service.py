@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import List
+from typing import Dict, List
 
 from redis.asyncio import Redis
 
@@ -18,6 +18,14 @@ class UserStatusService:
         key = f"{self.online_key_prefix}{user_id}"
         return bool(await self.redis.exists(key))
 
+    async def get_online_statuses(self, user_ids: List[str]) -> Dict[str, bool]:
+        """Presence of many users in a single MGET"""
+        if not user_ids:
+            return {}
+        keys = [f"{self.online_key_prefix}{user_id}" for user_id in user_ids]
+        values = await self.redis.mget(keys)
+        return {user_id: value is not None for user_id, value in zip(user_ids, values)}
+
     async def set_user_offline(self, user_id: str):
         key = f"{self.online_key_prefix}{user_id}"
         await self.redis.delete(key)
@@ -0,0 +1,84 @@
+import logging
+
+from sqlalchemy import text
+
+from app.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.tasks.utils import run_async
+
+logger = logging.getLogger(__name__)
+
+# Mỗi câu lệnh chỉ cập nhật những dòng có counter bị lệch
+RECONCILE_STATEMENTS = {
+    "posts.likes_count": """
+        UPDATE posts p SET likes_count = c.cnt
+        FROM (
+            SELECT p2.post_id, COUNT(l.like_id) AS cnt
+            FROM posts p2 LEFT JOIN likes l ON l.post_id = p2.post_id
+            GROUP BY p2.post_id
+        ) c
+        WHERE p.post_id = c.post_id AND p.likes_count <> c.cnt
+    """,
+    "posts.comments_count": """
+        UPDATE posts p SET comments_count = c.cnt
+        FROM (
+            SELECT p2.post_id, COUNT(cm.comment_id) AS cnt
+            FROM posts p2 LEFT JOIN comments cm ON cm.post_id = p2.post_id
+            GROUP BY p2.post_id
+        ) c
+        WHERE p.post_id = c.post_id AND p.comments_count <> c.cnt
+    """,
+    "users.posts_count": """
+        UPDATE users u SET posts_count = c.cnt
+        FROM (
+            SELECT u2.user_id, COUNT(p.post_id) AS cnt
+            FROM users u2 LEFT JOIN posts p ON p.user_id = u2.user_id
+            GROUP BY u2.user_id
+        ) c
+        WHERE u.user_id = c.user_id AND u.posts_count <> c.cnt
+    """,
+    "users.followers_count": """
+        UPDATE users u SET followers_count = c.cnt
+        FROM (
+            SELECT u2.user_id, COUNT(f.follow_id) AS cnt
+            FROM users u2 LEFT JOIN follows f ON f.following_id = u2.user_id
+            GROUP BY u2.user_id
+        ) c
+        WHERE u.user_id = c.user_id AND u.followers_count <> c.cnt
+    """,
+    "users.following_count": """
+        UPDATE users u SET following_count = c.cnt
+        FROM (
+            SELECT u2.user_id, COUNT(f.follow_id) AS cnt
+            FROM users u2 LEFT JOIN follows f ON f.user_id = u2.user_id
+            GROUP BY u2.user_id
+        ) c
+        WHERE u.user_id = c.user_id AND u.following_count <> c.cnt
+    """,
+}
+
+
+async def reconcile_counters() -> dict:
+    """Recompute stored counters and repair the rows that drifted"""
+    repaired = {}
+    async with SessionLocal() as db:
+        for counter, statement in RECONCILE_STATEMENTS.items():
+            result = await db.execute(text(statement))
+            repaired[counter] = result.rowcount
+        await db.commit()
+    return repaired
+
+
+@celery_app.task(name="app.tasks.counter_tasks.reconcile_counters")
+def reconcile_counters_task():
+    """Celery task sửa các counter bị lệch so với dữ liệu thật"""
+    try:
+        repaired = run_async(reconcile_counters())
+        if any(repaired.values()):
+            logger.warning(f"Repaired counter drift: {repaired}")
+        else:
+            logger.info("Counters are consistent")
+        return repaired
+    except Exception as e:
+        logger.error(f"Error reconciling counters: {str(e)}")
+        raise
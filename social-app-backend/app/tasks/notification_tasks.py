@@ -1,4 +1,3 @@
-import asyncio
 import json
 import logging
 from typing import Optional
@@ -11,16 +10,11 @@ from app.core.firebase import send_push_notification
 from app.models.device_token import DeviceToken
 from app.models.notification import Notification
 from app.models.notification_recipient import NotificationRecipient
+from app.tasks.utils import run_async
 
 logger = logging.getLogger(__name__)
 
 
-def run_async(coroutine):
-    """Helper function để chạy coroutine trong sync context"""
-    loop = asyncio.get_event_loop()
-    return loop.run_until_complete(coroutine)
-
-
 @celery_app.task(name="app.tasks.notification_tasks.create_bulk_notification")
 def create_bulk_notification_task(
     notification_data: dict, recipient_ids: list[str], sender_id: Optional[str] = None
@@ -46,6 +40,8 @@ def create_bulk_notification_task(
             NotificationRecipient(
                 notification_id=notification.notification_id,
                 recipient_id=recipient_id,
+                # Cùng partition với notification
+                created_at=notification.created_at,
             )
             for recipient_id in recipient_ids
         ]
@@ -106,6 +102,8 @@ def create_notification_task(notification_data: dict, sender_id: Optional[str] =
         recipient = NotificationRecipient(
             notification_id=notification.notification_id,
             recipient_id=notification_data["recipient_id"],
+            # Cùng partition với notification
+            created_at=notification.created_at,
         )
         db.add(recipient)
         run_async(db.commit())
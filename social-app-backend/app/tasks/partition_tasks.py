@@ -0,0 +1,22 @@
+import logging
+
+from app.celery_app import celery_app
+from app.core.partitions import maintain_partitions
+from app.tasks.utils import run_async
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.partition_tasks.maintain_partitions")
+def maintain_partitions_task():
+    """Celery task tạo partition cho các tháng tới và lưu trữ partition cũ"""
+    try:
+        report = run_async(maintain_partitions())
+        if report["created"]:
+            logger.info(f"Created partitions: {report['created']}")
+        if report["archived"]:
+            logger.warning(f"Archived expired partitions: {report['archived']}")
+        return report
+    except Exception as e:
+        logger.error(f"Error maintaining partitions: {str(e)}")
+        raise
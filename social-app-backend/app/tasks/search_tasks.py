@@ -0,0 +1,27 @@
+import logging
+
+from app.celery_app import celery_app
+from app.core.database import SessionLocal, close_redis, init_redis
+from app.services.user_search_index import user_search_index
+from app.tasks.utils import run_async
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_user_search_index() -> int:
+    await init_redis()
+    try:
+        async with SessionLocal() as db:
+            return await user_search_index.rebuild(db)
+    finally:
+        await close_redis()
+
+
+@celery_app.task(name="app.tasks.search_tasks.rebuild_user_search_index")
+def rebuild_user_search_index_task():
+    """Celery task dựng lại index tìm kiếm user cho typeahead"""
+    try:
+        return run_async(rebuild_user_search_index())
+    except Exception as e:
+        logger.error(f"Error rebuilding user search index: {str(e)}")
+        raise
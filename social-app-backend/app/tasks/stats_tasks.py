@@ -0,0 +1,185 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from app.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.core.settings import get_settings
+from app.models.daily_stats import DailyStats
+from app.models.user import User
+from app.tasks.utils import run_async
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# created_at columns are naive timestamps written by now() in the server's
+# TimeZone. Rows are bucketed by UTC day, the days StatisticsService reads.
+UTC_DAY = (
+    "CAST(created_at AT TIME ZONE current_setting('TimeZone') "
+    "AT TIME ZONE 'UTC' AS date)"
+)
+
+# Mỗi bảng nguồn được đếm riêng theo ngày, không JOIN chéo giữa các bảng.
+# Totals carry on from the previous day's row plus a running sum.
+ROLLUP_STATEMENT = text(
+    f"""
+    WITH bounds AS (
+        -- UTC midnights as server-local timestamps, so the created_at
+        -- indexes are used
+        SELECT
+            CAST(:start AS timestamp) AT TIME ZONE 'UTC'
+                AT TIME ZONE current_setting('TimeZone') AS lower,
+            (CAST(:end AS timestamp) + interval '1 day') AT TIME ZONE 'UTC'
+                AT TIME ZONE current_setting('TimeZone') AS upper
+    ),
+    days AS (
+        SELECT CAST(day AS date) AS date
+        FROM generate_series(
+            CAST(:start AS date), CAST(:end AS date), interval '1 day'
+        ) AS day
+    ),
+    previous AS (
+        SELECT users_total, posts_total, comments_total, likes_total
+        FROM daily_stats
+        WHERE date = CAST(:start AS date) - 1
+    ),
+    before_range AS (
+        -- The tables are only counted when there is no previous row, on
+        -- the first run. COALESCE skips the counts otherwise.
+        SELECT
+            COALESCE(
+                (SELECT users_total FROM previous),
+                (SELECT COUNT(*) FROM users, bounds
+                 WHERE created_at < bounds.lower)
+            ) AS users,
+            COALESCE(
+                (SELECT posts_total FROM previous),
+                (SELECT COUNT(*) FROM posts, bounds
+                 WHERE created_at < bounds.lower)
+            ) AS posts,
+            COALESCE(
+                (SELECT comments_total FROM previous),
+                (SELECT COUNT(*) FROM comments, bounds
+                 WHERE created_at < bounds.lower)
+            ) AS comments,
+            COALESCE(
+                (SELECT likes_total FROM previous),
+                (SELECT COUNT(*) FROM likes, bounds
+                 WHERE created_at < bounds.lower)
+            ) AS likes
+    ),
+    new_users AS (
+        SELECT {UTC_DAY} AS date, COUNT(*) AS n
+        FROM users, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    ),
+    new_posts AS (
+        SELECT {UTC_DAY} AS date, COUNT(*) AS n
+        FROM posts, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    ),
+    new_comments AS (
+        SELECT {UTC_DAY} AS date, COUNT(*) AS n
+        FROM comments, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    ),
+    new_likes AS (
+        SELECT {UTC_DAY} AS date, COUNT(*) AS n
+        FROM likes, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    ),
+    new_messages AS (
+        SELECT {UTC_DAY} AS date,
+               COUNT(*) AS n,
+               COUNT(DISTINCT conversation_id) AS conversations
+        FROM messages, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    ),
+    new_notifications AS (
+        SELECT {UTC_DAY} AS date, COUNT(*) AS n
+        FROM notifications, bounds
+        WHERE created_at >= bounds.lower AND created_at < bounds.upper
+        GROUP BY 1
+    )
+    INSERT INTO daily_stats (
+        date, new_users, users_total, posts, posts_total, comments,
+        comments_total, likes, likes_total, messages, active_conversations,
+        notifications, updated_at
+    )
+    SELECT
+        d.date,
+        COALESCE(u.n, 0),
+        b.users + SUM(COALESCE(u.n, 0)) OVER (ORDER BY d.date),
+        COALESCE(p.n, 0),
+        b.posts + SUM(COALESCE(p.n, 0)) OVER (ORDER BY d.date),
+        COALESCE(c.n, 0),
+        b.comments + SUM(COALESCE(c.n, 0)) OVER (ORDER BY d.date),
+        COALESCE(l.n, 0),
+        b.likes + SUM(COALESCE(l.n, 0)) OVER (ORDER BY d.date),
+        COALESCE(m.n, 0),
+        COALESCE(m.conversations, 0),
+        COALESCE(n.n, 0),
+        now()
+    FROM days d
+    CROSS JOIN before_range b
+    LEFT JOIN new_users u ON u.date = d.date
+    LEFT JOIN new_posts p ON p.date = d.date
+    LEFT JOIN new_comments c ON c.date = d.date
+    LEFT JOIN new_likes l ON l.date = d.date
+    LEFT JOIN new_messages m ON m.date = d.date
+    LEFT JOIN new_notifications n ON n.date = d.date
+    ON CONFLICT (date) DO UPDATE SET
+        new_users = EXCLUDED.new_users,
+        users_total = EXCLUDED.users_total,
+        posts = EXCLUDED.posts,
+        posts_total = EXCLUDED.posts_total,
+        comments = EXCLUDED.comments,
+        comments_total = EXCLUDED.comments_total,
+        likes = EXCLUDED.likes,
+        likes_total = EXCLUDED.likes_total,
+        messages = EXCLUDED.messages,
+        active_conversations = EXCLUDED.active_conversations,
+        notifications = EXCLUDED.notifications,
+        updated_at = EXCLUDED.updated_at
+    """
+)
+
+
+async def rollup_daily_stats(today: date = None) -> dict:
+    """Recompute today, the lookback window and any day missed since the
+    last run. The first run backfills from the first user's sign-up."""
+    today = today or datetime.utcnow().date()
+    async with SessionLocal() as db:
+        last_day = await db.scalar(select(func.max(DailyStats.date)))
+        if last_day is None:
+            first_signup = await db.scalar(
+                select(func.min(text(UTC_DAY))).select_from(User)
+            )
+            last_day = first_signup or today
+
+        start = min(
+            last_day, today - timedelta(days=settings.STATS_ROLLUP_LOOKBACK_DAYS)
+        )
+        result = await db.execute(ROLLUP_STATEMENT, {"start": start, "end": today})
+        await db.commit()
+
+    return {"start": str(start), "end": str(today), "days": result.rowcount}
+
+
+@celery_app.task(name="app.tasks.stats_tasks.rollup_daily_stats")
+def rollup_daily_stats_task():
+    """Celery task cập nhật bảng thống kê theo ngày"""
+    try:
+        summary = run_async(rollup_daily_stats())
+        logger.info(f"Rolled up daily stats: {summary}")
+        return summary
+    except Exception as e:
+        logger.error(f"Error rolling up daily stats: {str(e)}")
+        raise
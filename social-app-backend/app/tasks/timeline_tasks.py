@@ -0,0 +1,30 @@
+import logging
+from datetime import datetime
+
+from app.celery_app import celery_app
+from app.core.database import SessionLocal, close_redis, get_redis_client, init_redis
+from app.services.timeline_service import TimelineService
+from app.tasks.utils import run_async
+
+logger = logging.getLogger(__name__)
+
+
+async def fan_out_post(post_id: str, author_id: str, created_at: str) -> None:
+    await init_redis()
+    try:
+        async with SessionLocal() as db:
+            await TimelineService(db, get_redis_client()).fan_out_post(
+                post_id, author_id, datetime.fromisoformat(created_at)
+            )
+    finally:
+        await close_redis()
+
+
+@celery_app.task(name="app.tasks.timeline_tasks.fan_out_post")
+def fan_out_post_task(post_id: str, author_id: str, created_at: str):
+    """Celery task đẩy bài viết mới vào timeline của người theo dõi"""
+    try:
+        run_async(fan_out_post(post_id, author_id, created_at))
+    except Exception as e:
+        logger.error(f"Error fanning out post {post_id}: {str(e)}")
+        raise
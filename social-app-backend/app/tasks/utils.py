@@ -0,0 +1,7 @@
+import asyncio
+
+
+def run_async(coroutine):
+    """Helper function để chạy coroutine trong sync context"""
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(coroutine)
@@ -0,0 +1,46 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# Crockford base32, sorts the same way as the values it encodes
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+def new_ulid() -> str:
+    """26-char ULID: 48-bit millisecond timestamp followed by 80 random bits.
+
+    IDs created later sort after earlier ones, so inserts land on the right
+    edge of the primary key index instead of random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    chars = []
+    for _ in range(26):
+        value, index = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+def generate_id(prefix: str):
+    """Column default producing ``<prefix>-<ULID>`` IDs"""
+
+    def default() -> str:
+        return f"{prefix}-{new_ulid()}"
+
+    return default
+
+
+def id_timestamp(item_id: str) -> Optional[datetime]:
+    """UTC time encoded in a ``<prefix>-<ULID>`` ID, None for older UUID IDs"""
+    ulid = item_id.rsplit("-", 1)[-1]
+    if len(ulid) != 26:
+        return None
+    milliseconds = 0
+    for char in ulid[:10]:
+        index = CROCKFORD_ALPHABET.find(char)
+        if index < 0:
+            return None
+        milliseconds = milliseconds * 32 + index
+    # Naive like the TIMESTAMP columns it is compared with
+    created_at = datetime.fromtimestamp(milliseconds / 1000, tz=timezone.utc)
+    return created_at.replace(tzinfo=None)
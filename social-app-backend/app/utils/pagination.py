@@ -0,0 +1,42 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, tuple_
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Build an opaque cursor from the last item of a page"""
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, item_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), item_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_condition(created_at_column, id_column, cursor: str, descending=True):
+    """Seek condition for pages ordered by (created_at, id).
+
+    The plain bound on created_at is implied by the row comparison, but only
+    it lets Postgres skip partitions of tables partitioned by created_at.
+    """
+    created_at, item_id = decode_cursor(cursor)
+    if descending:
+        return and_(
+            created_at_column <= created_at,
+            tuple_(created_at_column, id_column) < tuple_(created_at, item_id),
+        )
+    return and_(
+        created_at_column >= created_at,
+        tuple_(created_at_column, id_column) > tuple_(created_at, item_id),
+    )
@@ -0,0 +1,11 @@
+import math
+from typing import Sequence
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile, 0.0 when there are no samples"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
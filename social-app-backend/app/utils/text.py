@@ -0,0 +1,13 @@
+import unicodedata
+
+
+def normalize_search_text(value: str) -> str:
+    """Lowercase and strip accents, as ``users.search_name`` does in SQL.
+
+    "Nguyễn Văn Đức" becomes "nguyen van duc".
+    """
+    # đ is a letter of its own, not d with a combining mark
+    value = value.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
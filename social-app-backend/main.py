@@ -1,15 +1,23 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import APIRouter, FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.auth_cache import auth_state_cache
+from app.core.backplane import create_backplane
+from app.core.database import close_redis, init_redis
 from app.core.exception_handler import (
     http_exception_handler,
     validation_exception_handler,
 )
 from app.core.logging import setup_logging
+from app.core.read_replicas import read_your_writes_middleware, replica_set
 from app.core.settings import get_settings
+from app.core.sql_budget import sql_budget_middleware
+from app.core.token_revocation import token_revocation_list
+from app.core.websocket import manager
 from app.routers import (
     admin_router,
     auth_router,
@@ -29,9 +37,24 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    redis = await init_redis()
+    await manager.start(create_backplane(redis))
+    await auth_state_cache.start(create_backplane(redis))
+    await token_revocation_list.start(create_backplane(redis))
+    yield
+    await manager.stop()
+    await auth_state_cache.stop()
+    await token_revocation_list.stop()
+    await replica_set.dispose()
+    await close_redis()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
+        lifespan=lifespan,
         version=settings.VERSION,
         docs_url=f"{settings.API_PREFIX}/docs",
         redoc_url=f"{settings.API_PREFIX}/redoc",
@@ -54,6 +77,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.middleware("http")(sql_budget_middleware)
+    app.middleware("http")(read_your_writes_middleware)
+
     app.add_exception_handler(HTTPException, http_exception_handler)
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
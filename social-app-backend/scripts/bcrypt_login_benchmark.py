@@ -0,0 +1,81 @@
+"""Measure event-loop lag during a concurrent login burst.
+
+Usage (from the backend directory):
+
+    python -m scripts.bcrypt_login_benchmark --logins 50
+
+Runs the same burst of password verifications twice, first calling
+passlib inline on the event loop as the handlers used to, then through the
+bcrypt thread pool. A ticker scheduled every ``--tick`` ms records how late
+it wakes up, which is the delay every WebSocket and request on the worker
+would see.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from app.core.security import password_hasher, pwd_context
+from app.utils.stats import percentile
+
+logger = logging.getLogger("app.scripts.bcrypt_login_benchmark")
+
+
+async def measure_lag(stop: asyncio.Event, interval: float, lags: list):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def inline_login(password: str, hashed: str):
+    # Old behaviour: bcrypt runs on the event loop
+    await asyncio.sleep(0)
+    return pwd_context.verify(password, hashed)
+
+
+async def pooled_login(password: str, hashed: str):
+    return await password_hasher.run(pwd_context.verify, password, hashed)
+
+
+async def run(login, logins: int, interval: float, hashed: str) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, interval, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login("perf-password", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    return {
+        "total_s": elapsed,
+        "lag_p50_ms": percentile(lags, 50),
+        "lag_p99_ms": percentile(lags, 99),
+        "lag_max_ms": max(lags, default=0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--tick", type=float, default=10, help="ticker interval, ms")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    hashed = pwd_context.hash("perf-password")
+
+    for name, login in (("inline", inline_login), ("thread pool", pooled_login)):
+        result = asyncio.run(run(login, args.logins, args.tick / 1000, hashed))
+        logger.info(
+            f"{name}: {args.logins} logins in {result['total_s']:.2f}s, "
+            f"loop lag p50 {result['lag_p50_ms']:.1f}ms, "
+            f"p99 {result['lag_p99_ms']:.1f}ms, max {result['lag_max_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
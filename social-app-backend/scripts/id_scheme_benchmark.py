@@ -0,0 +1,86 @@
+"""Compare primary key index size and insert throughput of the ID schemes.
+
+Usage (from the backend directory):
+
+    python -m scripts.id_scheme_benchmark --rows 1000000
+
+Inserts the same number of rows into two temporary tables, one keyed by the
+old ``post-<uuid4>`` IDs and one by the ``post-<ULID>`` IDs, and reports
+rows per second and the size of each primary key index. Nothing is written
+to the application tables.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.utils.ids import generate_id
+
+logger = logging.getLogger("app.scripts.id_scheme_benchmark")
+
+BATCH_SIZE = 10_000
+
+SCHEMES = {
+    "uuid4": lambda: f"post-{uuid4()}",
+    "ulid": generate_id("post"),
+}
+
+
+async def run_scheme(db, name: str, new_id, rows: int) -> dict:
+    table = f"id_bench_{name}"
+    await db.execute(
+        text(
+            f"CREATE TEMP TABLE {table} "
+            "(id varchar(50) PRIMARY KEY, created_at timestamp DEFAULT now())"
+        )
+    )
+
+    started = time.perf_counter()
+    for start in range(0, rows, BATCH_SIZE):
+        ids = [new_id() for _ in range(min(BATCH_SIZE, rows - start))]
+        await db.execute(
+            text(f"INSERT INTO {table} (id) SELECT unnest(CAST(:ids AS text[]))"),
+            {"ids": ids},
+        )
+    await db.commit()
+    elapsed = time.perf_counter() - started
+
+    index_size = await db.scalar(
+        text(f"SELECT pg_relation_size('{table}_pkey')"),
+    )
+    average_key = await db.scalar(text(f"SELECT avg(octet_length(id)) FROM {table}"))
+
+    return {
+        "scheme": name,
+        "rows_per_second": rows / elapsed,
+        "index_mb": index_size / 1024 / 1024,
+        "average_key_bytes": float(average_key),
+    }
+
+
+async def run(rows: int):
+    async with SessionLocal() as db:
+        for name, new_id in SCHEMES.items():
+            result = await run_scheme(db, name, new_id, rows)
+            logger.info(
+                "{scheme}: {rows_per_second:,.0f} rows/s, primary key index "
+                "{index_mb:.1f} MB, {average_key_bytes:.0f} bytes/key".format(**result)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
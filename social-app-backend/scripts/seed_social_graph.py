@@ -0,0 +1,133 @@
+"""Seed a synthetic social graph for performance runs.
+
+Usage (from the backend directory, after ``alembic upgrade head``):
+
+    python -m scripts.seed_social_graph --users 100000 --follows 1000000 --likes 5000000
+
+Rows are generated inside Postgres with ``generate_series``. Follow and like
+targets are skewed so a few accounts get most of the traffic, like on a
+real network. All generated IDs use a ``-perf-`` infix, and ``--clean``
+removes them again.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.tasks.counter_tasks import reconcile_counters
+
+logger = logging.getLogger("app.scripts.seed_social_graph")
+
+BATCH_SIZE = 200_000
+
+STATEMENTS = {
+    "users": """
+        INSERT INTO users (user_id, email, password, username, full_name,
+                           is_admin, is_banned, created_at)
+        SELECT 'user-perf-' || g, 'perf' || g || '@example.com', :password,
+               'perf_user_' || g, 'Perf User ' || g, false, false,
+               now() - random() * interval '365 days'
+        FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+        ON CONFLICT DO NOTHING
+    """,
+    "posts": """
+        INSERT INTO posts (post_id, user_id, content, created_at)
+        SELECT 'post-perf-' || g,
+               'user-perf-' || (1 + floor(random() * :users))::int,
+               'Synthetic post ' || g,
+               now() - random() * interval '365 days'
+        FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+        ON CONFLICT DO NOTHING
+    """,
+    "follows": """
+        INSERT INTO follows (follow_id, user_id, following_id)
+        SELECT 'follow-perf-' || g, 'user-perf-' || a, 'user-perf-' || b
+        FROM (
+            SELECT g,
+                   1 + floor(random() * :users)::int AS a,
+                   1 + floor(power(random(), 3) * :users)::int AS b
+            FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+        ) s
+        WHERE a <> b
+        ON CONFLICT DO NOTHING
+    """,
+    "likes": """
+        INSERT INTO likes (like_id, user_id, post_id)
+        SELECT 'like-perf-' || g,
+               'user-perf-' || (1 + floor(random() * :users))::int,
+               'post-perf-' || (1 + floor(power(random(), 2) * :posts))::int
+        FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+        ON CONFLICT DO NOTHING
+    """,
+    "comments": """
+        INSERT INTO comments (comment_id, post_id, user_id, content, created_at)
+        SELECT 'comment-perf-' || g,
+               'post-perf-' || (1 + floor(power(random(), 2) * :posts))::int,
+               'user-perf-' || (1 + floor(random() * :users))::int,
+               'Synthetic comment ' || g,
+               now() - random() * interval '365 days'
+        FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) g
+        ON CONFLICT DO NOTHING
+    """,
+}
+
+CLEAN_STATEMENT = "DELETE FROM users WHERE user_id LIKE 'user-perf-%'"
+
+
+async def seed(sizes: dict):
+    params = {
+        "password": await get_password_hash("perf-password"),
+        "users": sizes["users"],
+        "posts": sizes["posts"],
+    }
+
+    async with SessionLocal() as db:
+        for table, statement in STATEMENTS.items():
+            total = sizes[table]
+            started = time.perf_counter()
+            for start in range(1, total + 1, BATCH_SIZE):
+                stop = min(start + BATCH_SIZE - 1, total)
+                await db.execute(
+                    text(statement), {**params, "start": start, "stop": stop}
+                )
+                await db.commit()
+            logger.info(
+                f"Seeded {total} {table} in {time.perf_counter() - started:.1f}s"
+            )
+
+    repaired = await reconcile_counters()
+    logger.info(f"Counters recomputed: {repaired}")
+
+
+async def clean():
+    # Posts, follows, likes and comments cascade from the users
+    async with SessionLocal() as db:
+        await db.execute(text(CLEAN_STATEMENT))
+        await db.commit()
+    logger.info("Removed synthetic social graph")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=500_000)
+    parser.add_argument("--follows", type=int, default=1_000_000)
+    parser.add_argument("--likes", type=int, default=5_000_000)
+    parser.add_argument("--comments", type=int, default=1_000_000)
+    parser.add_argument("--clean", action="store_true", help="remove seeded rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.clean:
+        asyncio.run(clean())
+    else:
+        asyncio.run(seed(vars(args)))
+
+
+if __name__ == "__main__":
+    main()
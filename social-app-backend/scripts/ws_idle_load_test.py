@@ -0,0 +1,103 @@
+"""Check that idle WebSocket clients do not hold database connections.
+
+Usage (from the backend directory, against a running API and after
+``python -m scripts.seed_social_graph``):
+
+    python -m scripts.ws_idle_load_test --url ws://localhost:8000 --sockets 10000
+
+Opens ``--sockets`` idle connections as the seeded ``user-perf-*`` users,
+holds them for ``--hold`` seconds and samples the number of server
+connections to the database from ``pg_stat_activity``. The run fails when
+the peak grows past ``--max-db-connections``.
+
+Raise the open file limit (``ulimit -n``) on both sides before large runs.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+import websockets
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+
+logger = logging.getLogger("app.scripts.ws_idle_load_test")
+
+DB_CONNECTIONS_QUERY = """
+    SELECT count(*) FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+async def count_db_connections() -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(text(DB_CONNECTIONS_QUERY))
+
+
+async def open_socket(url: str, user_id: str, opened: asyncio.Event, hold: float):
+    token = create_access_token(user_id)
+    async with websockets.connect(f"{url}/ws/{token}"):
+        opened.set()
+        await asyncio.sleep(hold)
+
+
+async def run(url: str, sockets: int, users: int, hold: float, ramp: int) -> int:
+    baseline = await count_db_connections()
+    logger.info(f"Database connections before the run: {baseline}")
+
+    tasks = []
+    events = []
+    started = time.perf_counter()
+    for index in range(sockets):
+        event = asyncio.Event()
+        user_id = f"user-perf-{index % users + 1}"
+        tasks.append(asyncio.create_task(open_socket(url, user_id, event, hold)))
+        events.append(event)
+        if (index + 1) % ramp == 0:
+            await asyncio.sleep(1)
+
+    await asyncio.wait_for(
+        asyncio.gather(*(event.wait() for event in events)), timeout=hold
+    )
+    logger.info(
+        f"Opened {sockets} sockets in {time.perf_counter() - started:.1f}s, "
+        "sampling database connections"
+    )
+
+    peak = baseline
+    deadline = time.perf_counter() + hold / 2
+    while time.perf_counter() < deadline:
+        peak = max(peak, await count_db_connections())
+        await asyncio.sleep(1)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    logger.info(f"Peak database connections with {sockets} idle sockets: {peak}")
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000")
+    parser.add_argument("--sockets", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=10_000, help="seeded users")
+    parser.add_argument("--hold", type=float, default=120, help="seconds")
+    parser.add_argument("--ramp", type=int, default=500, help="sockets per second")
+    parser.add_argument("--max-db-connections", type=int, default=100)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    peak = asyncio.run(run(args.url, args.sockets, args.users, args.hold, args.ramp))
+    if peak > args.max_db_connections:
+        logger.error(f"Idle sockets hold {peak} database connections")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
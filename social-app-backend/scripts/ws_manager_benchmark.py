@@ -0,0 +1,125 @@
+"""Benchmark the WebSocket ConnectionManager with simulated connections.
+
+Usage (from the backend directory):
+
+    python -m scripts.ws_manager_benchmark --sizes 10000 50000 100000
+
+Sockets are in-memory fakes and the manager runs on a LocalBackplane, so
+the numbers only cover the manager's own bookkeeping: connect, join,
+broadcast and disconnect cost on the event loop, plus the memory held per
+connection.
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import time
+import tracemalloc
+
+from app.core.backplane import LocalBackplane
+from app.core.websocket import ConnectionManager
+
+logger = logging.getLogger("app.scripts.ws_manager_benchmark")
+
+
+class FakeWebSocket:
+    __slots__ = ("sent",)
+
+    def __init__(self):
+        self.sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def _per_op_us(elapsed: float, count: int) -> float:
+    return elapsed / max(count, 1) * 1_000_000
+
+
+async def run(size: int, members: int, contacts: int, broadcasts: int) -> dict:
+    manager = ConnectionManager()
+    await manager.start(LocalBackplane())
+
+    user_ids = [f"user-bench-{i}" for i in range(size)]
+    sockets = [FakeWebSocket() for _ in user_ids]
+    conversation_ids = [f"conv-bench-{i}" for i in range(max(size // members, 1))]
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    started = time.perf_counter()
+    for index, (user_id, websocket) in enumerate(zip(user_ids, sockets)):
+        contact_ids = [user_ids[(index + k) % size] for k in range(1, contacts + 1)]
+        await manager.connect(websocket, user_id, contact_ids)
+    connect_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for index, user_id in enumerate(user_ids):
+        conversation_id = conversation_ids[index // members % len(conversation_ids)]
+        await manager.join_conversation(conversation_id, user_id)
+    join_time = time.perf_counter() - started
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    message = {"type": "new_message", "data": {"content": "x" * 64}}
+    started = time.perf_counter()
+    for index in range(broadcasts):
+        conversation_id = conversation_ids[index % len(conversation_ids)]
+        await manager.broadcast_to_conversation(conversation_id, message)
+    broadcast_time = time.perf_counter() - started
+
+    # Let the writer tasks drain their queues
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    for user_id, websocket in zip(user_ids, sockets):
+        await manager.disconnect(websocket, user_id)
+    disconnect_time = time.perf_counter() - started
+
+    await manager.stop()
+
+    return {
+        "connections": size,
+        "connect_us": _per_op_us(connect_time, size),
+        "join_us": _per_op_us(join_time, size),
+        "broadcast_us": _per_op_us(broadcast_time, broadcasts),
+        "disconnect_us": _per_op_us(disconnect_time, size),
+        "bytes_per_connection": (after - before) / size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000]
+    )
+    parser.add_argument("--members", type=int, default=4, help="users per conversation")
+    parser.add_argument("--contacts", type=int, default=20, help="contacts per user")
+    parser.add_argument("--broadcasts", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # The manager logs every connect and join
+    logging.getLogger("app.core.websocket").setLevel(logging.WARNING)
+
+    for size in args.sizes:
+        result = asyncio.run(run(size, args.members, args.contacts, args.broadcasts))
+        logger.info(
+            "{connections} connections: connect {connect_us:.1f}us, "
+            "join {join_us:.1f}us, broadcast {broadcast_us:.1f}us, "
+            "disconnect {disconnect_us:.1f}us, "
+            "{bytes_per_connection:.0f} B/connection".format(**result)
+        )
+
+
+if __name__ == "__main__":
+    main()
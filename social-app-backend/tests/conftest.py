@@ -0,0 +1,153 @@
+"""Shared fixtures: a migrated Postgres database and a Redis DB for tests.
+
+Settings come from the environment as usual; the defaults below point at a
+local Postgres and Redis. The database is dropped and recreated on every
+run, so its name must end with ``_test``, and the Redis DB is flushed.
+"""
+
+import os
+from pathlib import Path
+
+TEST_ENVIRONMENT = {
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "social_test",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "",
+    "REDIS_DB": "15",
+    "JWT_SECRET_KEY": "test-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "REFRESH_TOKEN_EXPIRE_DAYS": "7",
+    "CLOUDINARY_CLOUD_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+    "MAIL_USERNAME": "test",
+    "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "test@example.com",
+    "MAIL_PORT": "587",
+    "MAIL_SERVER": "localhost",
+    "FIREBASE_CREDENTIALS_PATH": "app/core/firebase-credentials.json",
+}
+
+for name, value in TEST_ENVIRONMENT.items():
+    os.environ.setdefault(name, value)
+os.environ.setdefault(
+    "POSTGRES_URI",
+    "postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:"
+    "{POSTGRES_PORT}/{POSTGRES_DB}".format(**os.environ),
+)
+
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import URL  # noqa: E402
+
+from app.celery_app import celery_app  # noqa: E402
+from app.core.database import close_redis, init_redis  # noqa: E402
+from app.core.settings import get_settings  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+settings = get_settings()
+
+# Tasks enqueued by the app go to the test Redis DB, no worker consumes them
+TEST_REDIS_URL = (
+    f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:"
+    f"{settings.REDIS_PORT}/{settings.REDIS_DB}"
+)
+celery_app.conf.update(broker_url=TEST_REDIS_URL, result_backend=TEST_REDIS_URL)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("perf", "performance suite (tests/perf)")
+    group.addoption("--perf-users", type=int, default=1000)
+    group.addoption("--perf-posts", type=int, default=5000)
+    group.addoption("--perf-follows", type=int, default=10000)
+    group.addoption("--perf-likes", type=int, default=50000)
+    group.addoption("--perf-comments", type=int, default=10000)
+    group.addoption(
+        "--perf-requests",
+        type=int,
+        default=100,
+        help="timed requests per endpoint",
+    )
+    group.addoption(
+        "--perf-tolerance",
+        type=float,
+        default=1.0,
+        help="allowed latency and memory increase over the baselines",
+    )
+    group.addoption(
+        "--perf-latency-slack-ms",
+        type=float,
+        default=25.0,
+        help="latency allowed on top of the tolerance",
+    )
+    group.addoption(
+        "--update-perf-baselines",
+        action="store_true",
+        help="write the observed values to perf_baselines.json",
+    )
+
+
+def _server_url(database: str) -> URL:
+    return URL.create(
+        "postgresql",
+        username=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database=database,
+    )
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Recreate the test database and run the migrations"""
+    name = settings.POSTGRES_DB
+    if not name.endswith("_test"):
+        pytest.exit(f"POSTGRES_DB={name} is not a test database (*_test)")
+
+    server = create_engine(_server_url("postgres"), isolation_level="AUTOCOMMIT")
+    with server.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        connection.execute(text(f'CREATE DATABASE "{name}"'))
+    server.dispose()
+
+    # No alembic.ini, its logging config would disable the app loggers
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    url = _server_url(name).render_as_string(hide_password=False)
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(config, "head")
+
+    return name
+
+
+@pytest.fixture(scope="session")
+async def redis():
+    """Client on the flushed test Redis DB"""
+    client = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB,
+        decode_responses=True,
+    )
+    await client.flushdb()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def app_redis(redis):
+    """The app's pooled client of ``get_redis_client`` on the test Redis DB"""
+    await init_redis()
+    yield redis
+    await close_redis()
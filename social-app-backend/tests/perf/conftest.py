@@ -0,0 +1,180 @@
+"""Fixtures of the performance suite.
+
+``create_app()`` runs in process with its lifespan, behind an httpx client
+authenticated as an admin viewer. The synthetic social graph of
+``scripts.seed_social_graph`` is seeded once, sized with the ``--perf-*``
+options, plus the chats, replies, notifications and reports the remaining
+endpoints read.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, update
+
+from app.core.database import SessionLocal
+from app.core.endpoint_metrics import BASELINES_PATH, EndpointMetrics, load_baselines
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.core.sql_budget import count_statements
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.notification_recipient import NotificationRecipient
+from app.models.user import User
+from app.services.user_search_index import user_search_index
+from app.tasks.stats_tasks import rollup_daily_stats
+from main import create_app
+from scripts.seed_social_graph import STATEMENTS, seed
+
+settings = get_settings()
+
+# Follow targets are skewed towards low IDs, so both are well connected
+VIEWER_ID = "user-perf-1"
+TARGET_USER_ID = "user-perf-2"
+
+CONVERSATIONS = 5
+MESSAGES_PER_CONVERSATION = 40
+REPLIES = 20
+NOTIFICATIONS = 50
+
+
+@pytest.fixture(scope="package")
+async def app(database, redis):
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture(scope="package")
+async def client(app):
+    headers = {"Authorization": f"Bearer {create_access_token(VIEWER_ID)}"}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test", headers=headers
+    ) as client:
+        yield client
+
+
+async def _post(client: AsyncClient, url: str, body: dict) -> dict:
+    response = await client.post(url, json=body)
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+@pytest.fixture(scope="package")
+async def targets(request, client):
+    """Seed the data set and return the path parameters of the routes"""
+    await seed(
+        {table: request.config.getoption(f"--perf-{table}") for table in STATEMENTS}
+    )
+
+    async with SessionLocal() as db:
+        await db.execute(
+            update(User).where(User.user_id == VIEWER_ID).values(is_admin=True)
+        )
+        post_id = await db.scalar(
+            select(Comment.post_id)
+            .group_by(Comment.post_id)
+            .order_by(func.count().desc(), Comment.post_id)
+            .limit(1)
+        )
+        comment_id = await db.scalar(
+            select(Comment.comment_id)
+            .where(Comment.post_id == post_id)
+            .order_by(Comment.comment_id)
+            .limit(1)
+        )
+
+        for index in range(NOTIFICATIONS):
+            notification = Notification(
+                type="like",
+                title="New like",
+                body=f"Perf notification {index}",
+                sender_id=TARGET_USER_ID,
+                created_at=datetime.utcnow(),
+            )
+            db.add(notification)
+            await db.flush()
+            db.add(
+                NotificationRecipient(
+                    notification_id=notification.notification_id,
+                    recipient_id=VIEWER_ID,
+                    created_at=notification.created_at,
+                )
+            )
+        await db.commit()
+
+        await user_search_index.rebuild(db)
+    await rollup_daily_stats()
+
+    for index in range(REPLIES):
+        await _post(
+            client,
+            "/api/comments",
+            {"post_id": post_id, "parent_id": comment_id, "content": f"Reply {index}"},
+        )
+
+    for index in range(CONVERSATIONS):
+        conversation = await _post(
+            client,
+            "/api/chat/conversations",
+            {"participant_ids": [f"user-perf-{index + 2}"]},
+        )
+        for message in range(MESSAGES_PER_CONVERSATION):
+            await _post(
+                client,
+                "/api/chat/messages",
+                {
+                    "conversation_id": conversation["conversation_id"],
+                    "content": f"Message {message}",
+                    "message_type": "TEXT",
+                },
+            )
+
+    await _post(
+        client,
+        "/api/reports/reports",
+        {"type": "POST", "content_id": post_id, "reason": "Spam"},
+    )
+
+    return {
+        "viewer_id": VIEWER_ID,
+        "user_id": TARGET_USER_ID,
+        "target_user_id": TARGET_USER_ID,
+        "post_id": post_id,
+        "comment_id": comment_id,
+        "conversation_id": conversation["conversation_id"],
+    }
+
+
+@pytest.fixture
+def statement_counter():
+    """Counter of the SQL statements issued by the requests of one test"""
+    with count_statements(settings.SQL_STATEMENT_BUDGET) as counter:
+        yield counter
+
+
+@pytest.fixture(scope="package")
+def endpoint_metrics(request):
+    metrics = EndpointMetrics(
+        request.config.getoption("--perf-requests"),
+        load_baselines(),
+        request.config.getoption("--perf-tolerance"),
+        request.config.getoption("--perf-latency-slack-ms"),
+    )
+    yield metrics
+
+    if request.config.getoption("--update-perf-baselines"):
+        # Routes not run this time keep their baseline
+        baselines = dict(metrics.baselines)
+        for route, observed in metrics.snapshot().items():
+            baselines[route] = {
+                "sql_statements": observed["sql_statements_max"],
+                "latency_p50_ms": observed["latency_p50_ms"],
+                "latency_p99_ms": observed["latency_p99_ms"],
+                "peak_memory_kb": observed["peak_memory_kb"],
+            }
+        with open(BASELINES_PATH, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
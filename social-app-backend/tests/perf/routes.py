@@ -0,0 +1,50 @@
+# Endpoints measured by the suite: (method, route template, query params).
+# Templates match the app routes and key perf_baselines.json, path
+# parameters are filled from the ``targets`` fixture.
+ROUTES = [
+    ("GET", "/api/users/search", {"query": "perf user"}),
+    ("GET", "/api/users/typeahead", {"q": "perf_user_1"}),
+    ("GET", "/api/users/me", {}),
+    ("GET", "/api/users/suggested", {}),
+    ("GET", "/api/users/{user_id}", {}),
+    ("GET", "/api/users/{user_id}/followers", {}),
+    ("GET", "/api/users/{user_id}/following", {}),
+    ("GET", "/api/users/{user_id}/mutual-followers", {}),
+    ("GET", "/api/users/{user_id}/activity", {}),
+    ("GET", "/api/posts/feed", {}),
+    ("GET", "/api/posts/user/{target_user_id}", {}),
+    ("GET", "/api/posts/{post_id}", {}),
+    ("POST", "/api/posts/{post_id}/like", {}),
+    ("GET", "/api/comments/post/{post_id}", {}),
+    ("GET", "/api/comments/{comment_id}/replies", {}),
+    ("GET", "/api/comments/{comment_id}", {}),
+    ("GET", "/api/chat/conversations", {}),
+    ("GET", "/api/chat/conversations/{conversation_id}/messages", {}),
+    ("GET", "/api/notifications/", {}),
+    ("GET", "/api/notifications/counts", {}),
+    ("GET", "/api/notifications/devices", {}),
+    ("GET", "/api/statistics/dashboard", {}),
+    ("GET", "/api/statistics/users/growth", {}),
+    ("GET", "/api/statistics/posts/activity", {}),
+    ("GET", "/api/statistics/interactions", {}),
+    ("GET", "/api/statistics/users/details", {}),
+    ("GET", "/api/statistics/posts/details", {}),
+    ("GET", "/api/statistics/messages/details", {}),
+    ("GET", "/api/admin/users", {}),
+    ("GET", "/api/admin/metrics/db-pool", {}),
+    ("GET", "/api/admin/metrics/password-hashing", {}),
+    ("GET", "/api/admin/metrics/redis-pool", {}),
+    ("GET", "/api/reports/reports", {}),
+]
+
+ROUTE_IDS = [f"{method} {route}" for method, route, _ in ROUTES]
+
+# Routes only the owner may read, requested with the viewer as user_id
+OWN_ROUTES = {"/api/users/{user_id}/activity"}
+
+
+def route_url(route: str, targets: dict) -> str:
+    path_params = dict(targets)
+    if route in OWN_ROUTES:
+        path_params["user_id"] = targets["viewer_id"]
+    return route.format(**path_params)
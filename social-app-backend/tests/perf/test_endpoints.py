@@ -0,0 +1,65 @@
+"""SQL statement counts, latency and peak memory of every endpoint.
+
+Observed values are compared against ``perf_baselines.json``; run with
+``--update-perf-baselines`` to record them as the new baselines instead.
+"""
+
+import time
+import tracemalloc
+
+import pytest
+
+from tests.perf.routes import ROUTE_IDS, ROUTES, route_url
+
+WARMUP_REQUESTS = 3
+
+
+async def _peak_memory_kb(client, method: str, url: str, params: dict) -> float:
+    # Measured on a separate request, tracing slows down every allocation
+    tracemalloc.start()
+    try:
+        response = await client.request(method, url, params=params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert response.status_code == 200, response.text
+    return peak / 1024
+
+
+@pytest.mark.parametrize("method, route, params", ROUTES, ids=ROUTE_IDS)
+async def test_endpoint_performance(
+    request,
+    client,
+    targets,
+    statement_counter,
+    endpoint_metrics,
+    method,
+    route,
+    params,
+):
+    key = f"{method} {route}"
+    url = route_url(route, targets)
+
+    for _ in range(WARMUP_REQUESTS):
+        response = await client.request(method, url, params=params)
+        assert response.status_code == 200, response.text
+    peak_memory_kb = await _peak_memory_kb(client, method, url, params)
+
+    for _ in range(endpoint_metrics.sample_size):
+        statement_counter.count = 0
+        started = time.perf_counter()
+        response = await client.request(method, url, params=params)
+        latency_ms = (time.perf_counter() - started) * 1000
+        assert response.status_code == 200, response.text
+        endpoint_metrics.record(
+            key, latency_ms, statement_counter.count, peak_memory_kb
+        )
+
+    if request.config.getoption("--update-perf-baselines"):
+        return
+
+    assert (
+        key in endpoint_metrics.baselines
+    ), f"No baseline for {key}, record one with --update-perf-baselines"
+    regressions = [r for r in endpoint_metrics.regressions() if r["route"] == key]
+    assert not regressions, regressions
@@ -0,0 +1,24 @@
+"""Every endpoint stays within its SQL statement budget.
+
+The budget is ``SQL_STATEMENT_BUDGET`` unless the route lowers it with the
+``sql_budget`` dependency.
+"""
+
+import pytest
+
+from tests.perf.routes import ROUTE_IDS, ROUTES, route_url
+
+
+@pytest.mark.parametrize("method, route, params", ROUTES, ids=ROUTE_IDS)
+async def test_sql_budget(client, targets, statement_counter, method, route, params):
+    url = route_url(route, targets)
+
+    # The first request may miss the Redis caches
+    for _ in range(2):
+        statement_counter.count = 0
+        response = await client.request(method, url, params=params)
+        assert response.status_code == 200, response.text
+        assert not statement_counter.exceeded, (
+            f"{method} {route} issued {statement_counter.count} SQL statements "
+            f"(budget {statement_counter.budget})"
+        )
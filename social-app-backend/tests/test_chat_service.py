@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal
+from app.models.conversation import Conversation
+from app.models.message import Message, MessageType
+from app.models.user import User
+from app.services.chat_service import ChatService
+
+SENDER_ID = "user-chat-sender"
+
+
+@pytest.fixture
+async def conversation(database):
+    async with SessionLocal() as db:
+        db.add(
+            User(
+                user_id=SENDER_ID,
+                email=f"{SENDER_ID}@example.com",
+                password="x",
+                username=SENDER_ID,
+            )
+        )
+        await db.flush()
+        conversation = Conversation(creator_id=SENDER_ID)
+        db.add(conversation)
+        await db.commit()
+        await db.refresh(conversation)
+
+    yield conversation
+
+    async with SessionLocal() as db:
+        await db.execute(delete(User).where(User.user_id == SENDER_ID))
+        await db.commit()
+
+
+async def _add_message(redis, conversation: Conversation, content: str) -> Message:
+    async with SessionLocal() as db:
+        message = Message(
+            conversation_id=conversation.conversation_id,
+            sender_id=SENDER_ID,
+            message_type=MessageType.TEXT,
+            content=content,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        db.add(message)
+        await db.commit()
+        await db.refresh(message)
+        await ChatService(db, redis)._cache_new_message(message)
+    return message
+
+
+async def test_message_sent_during_cache_fill_is_not_lost(conversation, app_redis):
+    await _add_message(app_redis, conversation, "First")
+    since = conversation.created_at - timedelta(minutes=1)
+
+    async with SessionLocal() as db:
+        reader = ChatService(db, app_redis)
+        execute = db.execute
+
+        async def execute_then_send(*args, **kwargs):
+            # Committed and cached after the reader's query, before its fill
+            result = await execute(*args, **kwargs)
+            await _add_message(app_redis, conversation, "Second")
+            return result
+
+        db.execute = execute_then_send
+        first_read = await reader._get_recent_messages(
+            conversation.conversation_id, since
+        )
+        db.execute = execute
+
+        second_read = await reader._get_recent_messages(
+            conversation.conversation_id, since
+        )
+
+    assert [m["content"] for m in first_read] == ["First"]
+    assert [m["content"] for m in second_read] == ["Second", "First"]
@@ -0,0 +1,117 @@
+"""Statement routing between the primary and a read replica.
+
+Both engines point at the test database, each one counts the statements
+it executes.
+"""
+
+from collections import Counter
+
+import pytest
+from sqlalchemy import event, select
+from starlette.requests import Request
+
+from app.core import read_replicas
+from app.core.database import create_engine
+from app.core.read_replicas import STICKY_KEY_PREFIX, ReadSessionLocal, get_read_db
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.models.user import User
+
+settings = get_settings()
+
+USER_ID = "user-replica-1"
+
+
+@pytest.fixture
+async def engines(database):
+    executed = Counter()
+    engines = {"primary": create_engine(settings.POSTGRES_URI)}
+    engines["replica"] = create_engine(settings.POSTGRES_URI)
+    for name, engine in engines.items():
+
+        def count(*args, name=name):
+            executed[name] += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    yield engines, executed
+
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def _session(engines):
+    return ReadSessionLocal(bind=engines["primary"], read_engine=engines["replica"])
+
+
+def _request(user_id: str) -> Request:
+    token = create_access_token(user_id)
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        }
+    )
+
+
+async def test_select_goes_to_replica(engines):
+    engines, executed = engines
+    async with _session(engines) as db:
+        await db.scalar(select(User).limit(1))
+
+    assert executed == {"replica": 1}
+
+
+async def test_select_for_update_goes_to_primary(engines):
+    engines, executed = engines
+    async with _session(engines) as db:
+        await db.scalar(select(User).limit(1).with_for_update())
+
+    assert executed["primary"] > 0
+    assert executed["replica"] == 0
+
+
+async def test_flush_goes_to_primary(engines):
+    engines, executed = engines
+    async with _session(engines) as db:
+        db.add(
+            User(
+                user_id=USER_ID,
+                email="replica@example.com",
+                password="x",
+                username="replica",
+            )
+        )
+        await db.flush()
+        await db.rollback()
+
+    assert executed["primary"] > 0
+    assert executed["replica"] == 0
+
+
+@pytest.mark.parametrize("sticky", [False, True], ids=["replica", "sticky"])
+async def test_get_read_db_honours_sticky_key(engines, app_redis, monkeypatch, sticky):
+    engines, executed = engines
+    replica_set = read_replicas.replica_set
+    monkeypatch.setattr(replica_set, "engines", [engines["replica"]])
+    monkeypatch.setattr(replica_set, "lags", [None])
+    monkeypatch.setattr(replica_set, "checked_at", 0.0)
+    monkeypatch.setattr(ReadSessionLocal, "kw", {**ReadSessionLocal.kw})
+    ReadSessionLocal.configure(bind=engines["primary"])
+
+    key = f"{STICKY_KEY_PREFIX}{USER_ID}"
+    if sticky:
+        await app_redis.setex(key, settings.READ_YOUR_WRITES_WINDOW, "1")
+    try:
+        sessions = get_read_db(_request(USER_ID))
+        db = await anext(sessions)
+        # Lag checks run on the replica, only count the query itself
+        executed.clear()
+        await db.scalar(select(User).limit(1))
+        await sessions.aclose()
+    finally:
+        await app_redis.delete(key)
+
+    expected = "primary" if sticky else "replica"
+    assert executed == {expected: 1}
@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.core.database import SessionLocal
+from app.models.daily_stats import DailyStats
+from app.models.user import User
+from app.tasks.stats_tasks import ROLLUP_STATEMENT
+
+
+@pytest.fixture
+async def db(database):
+    async with SessionLocal() as db:
+        yield db
+        await db.rollback()
+
+
+async def _rollup(db, day: date) -> DailyStats:
+    await db.execute(ROLLUP_STATEMENT, {"start": day, "end": day})
+    return await db.scalar(
+        select(DailyStats)
+        .where(DailyStats.date == day)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def test_totals_carry_on_from_previous_row(db):
+    # No rows were created that day, the totals can only come from the row
+    day = date(2000, 1, 2)
+    db.add(
+        DailyStats(
+            date=day - timedelta(days=1),
+            users_total=1000,
+            posts_total=2000,
+            comments_total=3000,
+            likes_total=4000,
+        )
+    )
+    await db.flush()
+
+    stats = await _rollup(db, day)
+
+    assert (
+        stats.users_total,
+        stats.posts_total,
+        stats.comments_total,
+        stats.likes_total,
+    ) == (1000, 2000, 3000, 4000)
+
+
+async def test_first_run_counts_the_tables(db):
+    day = datetime.utcnow().date() + timedelta(days=1)
+    await db.execute(
+        delete(DailyStats).where(DailyStats.date >= day - timedelta(days=1))
+    )
+
+    stats = await _rollup(db, day)
+
+    assert stats.users_total == await db.scalar(select(func.count()).select_from(User))
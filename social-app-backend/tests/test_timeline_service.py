@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.user import User
+from app.services.timeline_service import TimelineService
+
+VIEWER_ID = "user-timeline-viewer"
+CELEBRITY_ID = "user-timeline-celebrity"
+
+
+@pytest.fixture
+async def db(database):
+    async with SessionLocal() as db:
+        yield db
+        await db.rollback()
+        await db.execute(
+            delete(User).where(User.user_id.in_([VIEWER_ID, CELEBRITY_ID]))
+        )
+        await db.commit()
+
+
+async def test_celebrity_without_author_set_stays_in_feed(db, app_redis):
+    for user_id in (VIEWER_ID, CELEBRITY_ID):
+        db.add(
+            User(
+                user_id=user_id,
+                email=f"{user_id}@example.com",
+                password="x",
+                username=user_id,
+            )
+        )
+    await db.flush()
+    db.add(Follow(user_id=VIEWER_ID, following_id=CELEBRITY_ID))
+    post = Post(
+        user_id=CELEBRITY_ID,
+        content="Posted before the deploy",
+        created_at=datetime.utcnow(),
+    )
+    db.add(post)
+    await db.commit()
+
+    timelines = TimelineService(db, app_redis)
+    # Marked by a later fan-out, its author set expired long ago
+    await app_redis.sadd(timelines.celebrities_key, CELEBRITY_ID)
+    await app_redis.delete(timelines._author_key(CELEBRITY_ID))
+
+    post_ids, _ = await timelines.get_page(VIEWER_ID, 0, 10)
+
+    assert post_ids == [post.post_id]
+
+
+async def test_fan_out_of_deleted_author_is_skipped(db, app_redis):
+    timelines = TimelineService(db, app_redis)
+
+    await timelines.fan_out_post("post-gone", "user-gone", datetime.utcnow())
+
+    assert not await app_redis.sismember(timelines.celebrities_key, "user-gone")
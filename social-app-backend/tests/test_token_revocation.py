@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from redis.asyncio import Redis
+
+from app.core import security
+from app.core.backplane import RedisBackplane
+from app.core.dependencies import verify_token
+from app.core.security import create_access_token, decode_access_token
+from app.core.settings import get_settings
+from app.core.token_revocation import TOKEN_REVOKED_CHANNEL, TokenRevocationList
+from tests.test_websocket_backplane import DELIVERY_TIMEOUT
+
+settings = get_settings()
+
+
+async def test_jti_revoked_during_rebuild_is_kept(app_redis):
+    revocations = TokenRevocationList()
+    await app_redis.setex(f"{revocations.key_prefix}stored", 60, "1")
+
+    rebuild = asyncio.create_task(revocations.rebuild())
+    await asyncio.sleep(0)
+    assert revocations.rebuilding is not None
+    # Published by another worker while this one scans Redis
+    await revocations._handle_revoked(TOKEN_REVOKED_CHANNEL, {"jti": "revoked"})
+    await rebuild
+
+    assert "stored" in revocations.bloom
+    assert "revoked" in revocations.bloom
+    assert revocations.rebuilding is None
+
+
+@pytest.fixture
+async def workers(app_redis, monkeypatch):
+    """Two started revocation lists, the first one used by verify_token"""
+    clients = [
+        Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        for _ in range(2)
+    ]
+    workers = [TokenRevocationList() for _ in clients]
+    for worker, client in zip(workers, clients):
+        await worker.start(RedisBackplane(client))
+    monkeypatch.setattr(security, "token_revocation_list", workers[0])
+
+    yield workers
+
+    for worker, client in zip(workers, clients):
+        await worker.stop()
+        await client.aclose()
+
+
+async def _wait_until_in_filter(revocations: TokenRevocationList, jti: str):
+    for _ in range(int(DELIVERY_TIMEOUT / 0.05)):
+        if jti in revocations.bloom:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"{jti} never reached the filter")
+
+
+async def _assert_rejected(token: str):
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_token(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), None
+        )
+    assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_token_revoked_on_this_worker_is_rejected(workers):
+    token = create_access_token("user-revoked-1")
+    payload = await decode_access_token(token)
+
+    await workers[0].revoke(payload["jti"], payload["exp"])
+
+    await _assert_rejected(token)
+
+
+async def test_token_revoked_on_other_worker_is_rejected(workers):
+    token = create_access_token("user-revoked-2")
+    payload = await decode_access_token(token)
+
+    await workers[1].revoke(payload["jti"], payload["exp"])
+
+    await _wait_until_in_filter(workers[0], payload["jti"])
+    await _assert_rejected(token)
+
+
+async def test_revocation_missed_while_disconnected_is_loaded(workers):
+    token = create_access_token("user-revoked-3")
+    payload = await decode_access_token(token)
+
+    # Stored by another worker, the message never reached this one
+    await TokenRevocationList().revoke(payload["jti"], payload["exp"])
+    assert payload["jti"] not in workers[0].bloom
+
+    await workers[0].backplane.pubsub.connection.disconnect()
+
+    await _wait_until_in_filter(workers[0], payload["jti"])
+    await _assert_rejected(token)
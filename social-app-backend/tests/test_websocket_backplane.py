@@ -0,0 +1,213 @@
+"""Two ConnectionManager nodes sharing one Redis through the backplane."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from redis.asyncio import Redis
+
+from app.core.backplane import PRESENCE_KEY_PREFIX, RedisBackplane
+from app.core.settings import get_settings
+from app.core.websocket import (
+    CONVERSATION_CHANNEL_PREFIX,
+    USER_CHANNEL_PREFIX,
+    ConnectionManager,
+)
+
+settings = get_settings()
+
+# Long enough for a pub/sub round trip through the listener task
+DELIVERY_TIMEOUT = 2.0
+SILENCE_WINDOW = 0.5
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await self.received.put(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+    async def receive(self) -> dict:
+        return await asyncio.wait_for(self.received.get(), DELIVERY_TIMEOUT)
+
+    async def assert_nothing_received(self):
+        await asyncio.sleep(SILENCE_WINDOW)
+        assert self.received.empty(), self.received.get_nowait()
+
+
+async def wait_for_subscribers(redis: Redis, channel: str, count: int):
+    """Wait until ``count`` nodes subscribed to ``channel``"""
+    for _ in range(int(DELIVERY_TIMEOUT / 0.05)):
+        [(_, subscribers)] = await redis.pubsub_numsub(channel)
+        if subscribers == count:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"{channel} has {subscribers} subscribers, not {count}")
+
+
+@pytest.fixture
+async def nodes(redis):
+    """Two nodes, each with its own Redis connection pool"""
+    clients = [
+        Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        for _ in range(2)
+    ]
+    managers = [ConnectionManager() for _ in clients]
+    for manager, client in zip(managers, clients):
+        await manager.start(RedisBackplane(client))
+
+    yield managers
+
+    for manager, client in zip(managers, clients):
+        for user_id, user in list(manager.users.items()):
+            for websocket in list(user.connections):
+                await manager.disconnect(websocket, user_id)
+        await manager.stop()
+        await client.aclose()
+
+
+async def connect(redis, node, user_id: str, contact_ids=None) -> FakeWebSocket:
+    websocket = FakeWebSocket()
+    await node.connect(websocket, user_id, contact_ids)
+    await wait_for_subscribers(redis, f"{USER_CHANNEL_PREFIX}{user_id}", 1)
+    return websocket
+
+
+async def test_personal_message_reaches_user_on_other_node(redis, nodes):
+    node_a, node_b = nodes
+    alice = await connect(redis, node_a, "alice")
+    bob = await connect(redis, node_b, "bob")
+
+    await node_a.send_personal_message({"type": "ping", "from": "alice"}, "bob")
+
+    assert await bob.receive() == {"type": "ping", "from": "alice"}
+    await alice.assert_nothing_received()
+
+
+async def test_conversation_broadcast_crosses_nodes(redis, nodes):
+    node_a, node_b = nodes
+    alice = await connect(redis, node_a, "alice")
+    bob = await connect(redis, node_b, "bob")
+    await node_a.join_conversation("c1", "alice")
+    await node_b.join_conversation("c1", "bob")
+    await wait_for_subscribers(redis, f"{CONVERSATION_CHANNEL_PREFIX}c1", 2)
+
+    await node_a.broadcast_to_conversation(
+        "c1", {"type": "new_message", "content": "hi"}, exclude_user="alice"
+    )
+    assert await bob.receive() == {"type": "new_message", "content": "hi"}
+    await alice.assert_nothing_received()
+
+    await node_b.broadcast_typing_status("c1", "bob", True)
+    assert await alice.receive() == {
+        "type": "typing_status",
+        "conversation_id": "c1",
+        "user_id": "bob",
+        "is_typing": True,
+    }
+    await bob.assert_nothing_received()
+
+
+async def test_no_delivery_after_leaving_and_disconnecting(redis, nodes):
+    node_a, node_b = nodes
+    await connect(redis, node_a, "alice")
+    bob = await connect(redis, node_b, "bob")
+    await node_a.join_conversation("c1", "alice")
+    await node_b.join_conversation("c1", "bob")
+    await wait_for_subscribers(redis, f"{CONVERSATION_CHANNEL_PREFIX}c1", 2)
+
+    # Last local member left, node B drops the conversation channel
+    await node_b.leave_conversation("c1", "bob")
+    await wait_for_subscribers(redis, f"{CONVERSATION_CHANNEL_PREFIX}c1", 1)
+    assert f"{CONVERSATION_CHANNEL_PREFIX}c1" not in node_b.backplane.channels
+
+    await node_a.broadcast_to_conversation("c1", {"type": "new_message"})
+    await bob.assert_nothing_received()
+
+    # Last socket closed, node B drops the user channel
+    await node_b.disconnect(bob, "bob")
+    await wait_for_subscribers(redis, f"{USER_CHANNEL_PREFIX}bob", 0)
+    assert "bob" not in node_b.users
+
+    await node_a.send_personal_message({"type": "ping"}, "bob")
+    await bob.assert_nothing_received()
+
+
+async def test_offline_only_broadcast_when_last_node_disconnects(
+    redis, nodes, monkeypatch
+):
+    monkeypatch.setattr(settings, "PRESENCE_FLAP_WINDOW", 0.1)
+    node_a, node_b = nodes
+    bob = await connect(redis, node_b, "bob")
+    alice_a = await connect(redis, node_a, "alice", ["bob"])
+    assert await bob.receive() == {
+        "type": "user_status",
+        "user_id": "alice",
+        "is_online": True,
+    }
+
+    # Already online through node A
+    alice_b = FakeWebSocket()
+    await node_b.connect(alice_b, "alice", ["bob"])
+    await bob.assert_nothing_received()
+
+    # Still connected to node B
+    await node_a.disconnect(alice_a, "alice")
+    await bob.assert_nothing_received()
+
+    await node_b.disconnect(alice_b, "alice")
+    assert await bob.receive() == {
+        "type": "user_status",
+        "user_id": "alice",
+        "is_online": False,
+    }
+
+
+async def test_presence_of_dead_node_expires(redis, nodes):
+    node_a, _ = nodes
+    await redis.zadd(
+        f"{PRESENCE_KEY_PREFIX}carol",
+        {"dead-node": time.time() - settings.PRESENCE_NODE_TTL - 1},
+    )
+    assert await node_a.backplane.presence_count("carol") == 0
+    assert await node_a.backplane.add_presence("carol") == 1
+
+
+async def test_reconnect_during_disconnect_cleanup(redis, nodes, monkeypatch):
+    node_a, node_b = nodes
+    alice = await connect(redis, node_a, "alice")
+    await node_a.join_conversation("c1", "alice")
+
+    unsubscribe = node_a.backplane.unsubscribe
+
+    async def slow_unsubscribe(channel: str):
+        await asyncio.sleep(0.1)
+        await unsubscribe(channel)
+
+    monkeypatch.setattr(node_a.backplane, "unsubscribe", slow_unsubscribe)
+    disconnecting = asyncio.create_task(node_a.disconnect(alice, "alice"))
+    await asyncio.sleep(0)
+    alice_again = FakeWebSocket()
+    await node_a.connect(alice_again, "alice")
+    await disconnecting
+
+    assert alice_again in node_a.users["alice"].connections
+    assert await node_a.backplane.presence_count("alice") == 1
+    await wait_for_subscribers(redis, f"{USER_CHANNEL_PREFIX}alice", 1)
+    await node_b.send_personal_message({"type": "ping"}, "alice")
+    assert await alice_again.receive() == {"type": "ping"}
@@ -0,0 +1,105 @@
+"""Two uvicorn processes sharing the test Redis through the backplane."""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+from websockets.asyncio.client import connect
+
+from app.core.security import create_access_token
+from app.core.websocket import CONVERSATION_CHANNEL_PREFIX
+from tests.conftest import BACKEND_DIR
+from tests.test_websocket_backplane import DELIVERY_TIMEOUT, wait_for_subscribers
+
+STARTUP_TIMEOUT = 30.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_serving(process: subprocess.Popen, url: str, log_path):
+    for _ in range(int(STARTUP_TIMEOUT / 0.2)):
+        if process.poll() is not None:
+            raise AssertionError(f"Worker exited:\n{log_path.read_text()}")
+        try:
+            async with connect(f"{url}/ws-test") as websocket:
+                await websocket.recv()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise AssertionError(f"Worker did not start:\n{log_path.read_text()}")
+
+
+@pytest.fixture
+async def workers(database, redis, tmp_path):
+    """Base URLs of two separate uvicorn processes"""
+    env = {**os.environ, "WEBSOCKET_BACKPLANE": "redis"}
+    processes, urls = [], []
+    try:
+        for index in range(2):
+            port = _free_port()
+            log_path = tmp_path / f"worker-{index}.log"
+            with open(log_path, "w") as log:
+                process = subprocess.Popen(
+                    [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+                    cwd=BACKEND_DIR,
+                    env=env,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                )
+            processes.append(process)
+            urls.append(f"ws://127.0.0.1:{port}")
+            await _wait_until_serving(process, urls[-1], log_path)
+
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+async def _receive(websocket) -> dict:
+    return json.loads(await asyncio.wait_for(websocket.recv(), DELIVERY_TIMEOUT))
+
+
+async def test_typing_reaches_socket_on_other_process(redis, workers):
+    url_a, url_b = workers
+    channel = f"{CONVERSATION_CHANNEL_PREFIX}conversation-workers"
+
+    async with connect(
+        f"{url_a}/ws/{create_access_token('user-worker-a')}"
+    ) as alice, connect(f"{url_b}/ws/{create_access_token('user-worker-b')}") as bob:
+        for websocket in (alice, bob):
+            await websocket.send(
+                json.dumps(
+                    {
+                        "type": "join_conversation",
+                        "conversation_id": "conversation-workers",
+                    }
+                )
+            )
+        await wait_for_subscribers(redis, channel, 2)
+
+        await alice.send(
+            json.dumps(
+                {
+                    "type": "typing",
+                    "conversation_id": "conversation-workers",
+                    "is_typing": True,
+                }
+            )
+        )
+
+        assert await _receive(bob) == {
+            "type": "typing",
+            "conversation_id": "conversation-workers",
+            "data": {"user_id": "user-worker-a", "is_typing": True},
+        }